@@ -1,3 +1,20 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import BlackoutDate, FieldSchedule, OpeningHours
+
+
+class OpeningHoursInline(admin.TabularInline):
+    model = OpeningHours
+    extra = 0
+
+
+@admin.register(FieldSchedule)
+class FieldScheduleAdmin(admin.ModelAdmin):
+    list_display = ("field", "slot_minutes", "updated_at")
+    inlines = [OpeningHoursInline]
+
+
+@admin.register(BlackoutDate)
+class BlackoutDateAdmin(admin.ModelAdmin):
+    list_display = ("field", "date", "reason")
+    list_filter = ("date",)
@@ -0,0 +1,234 @@
+import datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+from bookings.models import Booking, BookingHold, SlotOccupancy
+from bookings.schedule import get_schedules, slot_grid
+from matches.models import Match
+
+# Granularitas bitmap okupansi: satu bit per 30 menit (48 bit per hari, muat di BigIntegerField)
+SLOT_MINUTES = 30
+
+# Status match yang menempati slot
+ACTIVE_MATCH_STATUSES = ["Pending", "Confirmed"]
+
+MAX_DAYS_AHEAD = 30
+
+# (booked_mask, match_mask, hold_mask) untuk hari tanpa baris SlotOccupancy
+EMPTY_MASKS = (0, 0, 0)
+
+# Kode satu karakter per slot untuk encoding ringkas matriks availability
+STATUS_CODES = {"available": "0", "booked": "1", "match_created": "2", "past": "3", "held": "4"}
+
+
+def time_mask(start, end):
+    """
+    Bitmask untuk rentang waktu [start, end). end <= start dianggap sampai tengah malam.
+    """
+    first = (start.hour * 60 + start.minute) // SLOT_MINUTES
+    end_minutes = end.hour * 60 + end.minute
+    if end_minutes <= start.hour * 60 + start.minute:
+        end_minutes = 24 * 60
+    last = -(-end_minutes // SLOT_MINUTES)  # pembulatan ke atas
+    return ((1 << last) - 1) & ~((1 << first) - 1)
+
+
+def slot_cells(start, end):
+    """
+    Jam mulai tiap sel SLOT_MINUTES yang tercakup [start, end): bit yang sama dengan time_mask.
+    Dipakai sebagai key klaim slot (bookings/reservations.py).
+    """
+    mask = time_mask(start, end)
+    return [
+        datetime.time(*divmod(cell * SLOT_MINUTES, 60))
+        for cell in range(24 * 60 // SLOT_MINUTES) if mask >> cell & 1
+    ]
+
+
+def compute_masks(field_id, date):
+    """
+    Hitung ulang (booked_mask, match_mask, hold_mask) satu field pada satu hari
+    dari Booking, Match aktif dan BookingHold yang belum kedaluwarsa.
+    """
+    booked_mask = match_mask = hold_mask = 0
+    for start, end in Booking.objects.filter(field_id=field_id, booking_date=date).values_list("start_time", "end_time"):
+        booked_mask |= time_mask(start, end)
+    for start, end in Match.objects.filter(
+        field_id=field_id, match_date=date, status__in=ACTIVE_MATCH_STATUSES
+    ).values_list("start_time", "end_time"):
+        match_mask |= time_mask(start, end)
+    for start, end in BookingHold.objects.filter(
+        field_id=field_id, date=date, expires_at__gt=timezone.now()
+    ).values_list("start_time", "end_time"):
+        hold_mask |= time_mask(start, end)
+    return booked_mask, match_mask, hold_mask
+
+
+@transaction.atomic
+def refresh_occupancy(field_id, date):
+    """
+    Sinkronkan baris SlotOccupancy untuk (field, hari). Dipanggil oleh signal setiap
+    Booking/Match ditulis, sehingga pembacaan cukup satu lookup berdasarkan key.
+    Baris okupansi dikunci (select_for_update) sebelum mask dihitung ulang: penulis lain
+    untuk hari yang sama menunggu commit kita lalu menghitung dari data yang sudah
+    mencakup booking kita, jadi bit milik transaksi lain tidak tertimpa (READ COMMITTED).
+    """
+    occupancy, _ = SlotOccupancy.objects.select_for_update().get_or_create(field_id=field_id, date=date)
+    masks = compute_masks(field_id, date)
+    if any(masks):
+        occupancy.booked_mask, occupancy.match_mask, occupancy.hold_mask = masks
+        occupancy.save(update_fields=["booked_mask", "match_mask", "hold_mask"])
+    else:
+        occupancy.delete()
+
+
+@transaction.atomic
+def refresh_occupancy_days(field_id, dates):
+    """
+    Versi bulk refresh_occupancy untuk banyak hari satu field (mis. setelah bulk_create,
+    yang tidak memicu signal). Baris tiap hari dibuat bila belum ada lalu dikunci seperti
+    refresh_occupancy, baru kemudian dihitung ulang: tiga query baca + satu update + satu delete.
+    """
+    SlotOccupancy.objects.bulk_create(
+        [SlotOccupancy(field_id=field_id, date=date) for date in dates], ignore_conflicts=True,
+    )
+    rows = {
+        occupancy.date: occupancy
+        for occupancy in SlotOccupancy.objects.select_for_update().filter(field_id=field_id, date__in=dates)
+    }
+
+    masks = {date: [0, 0, 0] for date in dates}
+    for date, start, end in Booking.objects.filter(field_id=field_id, booking_date__in=dates).values_list(
+        "booking_date", "start_time", "end_time"
+    ):
+        masks[date][0] |= time_mask(start, end)
+    for date, start, end in Match.objects.filter(
+        field_id=field_id, match_date__in=dates, status__in=ACTIVE_MATCH_STATUSES
+    ).values_list("match_date", "start_time", "end_time"):
+        masks[date][1] |= time_mask(start, end)
+    for date, start, end in BookingHold.objects.filter(
+        field_id=field_id, date__in=dates, expires_at__gt=timezone.now()
+    ).values_list("date", "start_time", "end_time"):
+        masks[date][2] |= time_mask(start, end)
+
+    occupied = []
+    for date, (booked, match, hold) in masks.items():
+        if booked or match or hold:
+            occupancy = rows[date]
+            occupancy.booked_mask, occupancy.match_mask, occupancy.hold_mask = booked, match, hold
+            occupied.append(occupancy)
+    SlotOccupancy.objects.bulk_update(occupied, ["booked_mask", "match_mask", "hold_mask"])
+    empty = [date for date, day_masks in masks.items() if not any(day_masks)]
+    if empty:
+        SlotOccupancy.objects.filter(field_id=field_id, date__in=empty).delete()
+
+
+def rebuild_occupancy():
+    """
+    Bangun ulang seluruh tabel SlotOccupancy (untuk backfill atau perbaikan data).
+    Mengembalikan jumlah baris okupansi.
+    """
+    masks = {}
+    for field_id, date, start, end in Booking.objects.values_list("field_id", "booking_date", "start_time", "end_time"):
+        masks.setdefault((field_id, date), [0, 0, 0])[0] |= time_mask(start, end)
+    for field_id, date, start, end in Match.objects.filter(status__in=ACTIVE_MATCH_STATUSES).values_list(
+        "field_id", "match_date", "start_time", "end_time"
+    ):
+        masks.setdefault((field_id, date), [0, 0, 0])[1] |= time_mask(start, end)
+    for field_id, date, start, end in BookingHold.objects.filter(expires_at__gt=timezone.now()).values_list(
+        "field_id", "date", "start_time", "end_time"
+    ):
+        masks.setdefault((field_id, date), [0, 0, 0])[2] |= time_mask(start, end)
+
+    SlotOccupancy.objects.all().delete()
+    SlotOccupancy.objects.bulk_create([
+        SlotOccupancy(field_id=field_id, date=date, booked_mask=booked, match_mask=match, hold_mask=hold)
+        for (field_id, date), (booked, match, hold) in masks.items()
+    ], batch_size=1000)
+    return len(masks)
+
+
+def get_occupancy(field_ids, start_date, end_date, now=None):
+    """
+    {(field_id, date): (booked_mask, match_mask, hold_mask)} untuk banyak field dan rentang
+    hari, dalam satu query. Hari tanpa baris berarti kosong (EMPTY_MASKS).
+    hold_mask dihitung saat bitmap di-refresh, jadi bisa berisi hold yang sudah kedaluwarsa
+    tapi belum disapu expire_booking_holds: hari dengan hold_mask dicek ulang ke hold yang
+    masih aktif (satu query tambahan, hanya jika ada hold).
+    """
+    occupancy = {
+        (field_id, date): tuple(masks)
+        for field_id, date, *masks in SlotOccupancy.objects.filter(
+            field_id__in=field_ids, date__range=(start_date, end_date)
+        ).values_list("field_id", "date", "booked_mask", "match_mask", "hold_mask")
+    }
+    held = {key: 0 for key, (_, _, hold_mask) in occupancy.items() if hold_mask}
+    if held:
+        for field_id, date, start, end in BookingHold.objects.filter(
+            field_id__in={field_id for field_id, _ in held}, date__in={date for _, date in held},
+            expires_at__gt=now or timezone.now(),
+        ).values_list("field_id", "date", "start_time", "end_time"):
+            if (field_id, date) in held:
+                held[(field_id, date)] |= time_mask(start, end)
+        for key, hold_mask in held.items():
+            occupancy[key] = occupancy[key][:2] + (hold_mask,)
+    return occupancy
+
+
+def slot_statuses(date, booked_mask, match_mask, hold_mask, slots, now=None):
+    """
+    Status tiap slot grid (available / past / booked / match_created / held) dari bitmap satu hari.
+    """
+    now = timezone.localtime(now or timezone.now())
+    today, now_time = now.date(), now.time()
+
+    statuses = []
+    for start, end in slots:
+        mask = time_mask(start, end)
+        status = "available"
+        if date < today or (date == today and start < now_time):
+            status = "past"
+        elif booked_mask & mask:
+            status = "booked"
+        elif match_mask & mask:
+            status = "match_created"
+        elif hold_mask & mask:
+            status = "held"
+        statuses.append({"start": start.strftime("%H:%M"), "end": end.strftime("%H:%M"), "status": status})
+    return statuses
+
+
+def get_day_slots(field_id, date, now=None):
+    """
+    Status slot untuk satu field pada satu hari (satu lookup berdasarkan key unik).
+    """
+    masks = get_occupancy([field_id], date, date, now=now).get((field_id, date), EMPTY_MASKS)
+    return slot_statuses(date, *masks, slot_grid(field_id, date), now=now)
+
+
+def get_availability(field_ids, start_date, end_date, now=None):
+    """
+    Status slot untuk banyak field x banyak hari: {field_id: {date: [slot, ...]}}.
+    """
+    occupancy = get_occupancy(field_ids, start_date, end_date, now=now)
+    schedules = get_schedules(field_ids)
+    days = [start_date + datetime.timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    return {
+        field_id: {
+            date: slot_statuses(
+                date, *occupancy.get((field_id, date), EMPTY_MASKS),
+                slot_grid(field_id, date, schedules[field_id]), now=now,
+            )
+            for date in days
+        }
+        for field_id in field_ids
+    }
+
+
+def encode_day(slots):
+    """
+    Encoding ringkas status slot satu hari: satu karakter per slot (lihat STATUS_CODES),
+    mis. "0120" untuk available, booked, match_created, available.
+    """
+    return "".join(STATUS_CODES[slot["status"]] for slot in slots)
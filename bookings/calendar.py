@@ -0,0 +1,136 @@
+import datetime
+import hashlib
+
+from django.core import signing
+from django.core.cache import cache
+from django.utils import timezone
+
+from bookings.models import Booking
+from matches.models import MatchPlayer
+
+CALENDAR_CACHE_KEY = "bookings:calendar:{user_id}"
+# Di-invalidate oleh signal Booking/MatchPlayer/Match milik user (bookings/signals.py)
+CALENDAR_CACHE_TIMEOUT = 60 * 60 * 24
+CALENDAR_TOKEN_SALT = "bookings.calendar"
+# Event yang sudah lewat lebih dari ini tidak dimuat lagi, agar feed tidak tumbuh terus
+CALENDAR_PAST_DAYS = 90
+CALENDAR_PRODID = "-//MatchPlay//Bookings//EN"
+CALENDAR_UID_DOMAIN = "matchplay"
+
+MATCH_EVENT_STATUS = {
+    "Pending": "TENTATIVE",
+    "Confirmed": "CONFIRMED",
+    "Completed": "CONFIRMED",
+    "Cancelled": "CANCELLED",
+}
+
+
+def calendar_token(user):
+    """
+    Token feed per user. Aplikasi kalender tidak membawa session, jadi feed diautentikasi
+    dengan token bertanda tangan di URL.
+    """
+    return signing.Signer(salt=CALENDAR_TOKEN_SALT).sign(str(user.pk))
+
+
+def user_id_from_token(token):
+    """
+    Kebalikan calendar_token. Mengembalikan None jika token tidak valid.
+    """
+    try:
+        return int(signing.Signer(salt=CALENDAR_TOKEN_SALT).unsign(token))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def escape_text(value):
+    return (
+        str(value or "").replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    """
+    Pecah baris menjadi maksimal 75 oktet per baris (RFC 5545 3.1), diakhiri CRLF.
+    """
+    encoded = line.encode()
+    parts = []
+    while len(encoded) > 75:
+        cut = 75 if not parts else 74
+        # Jangan memotong di tengah karakter UTF-8
+        while cut and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+    parts.append(encoded.decode())
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_utc(date, time):
+    start = timezone.make_aware(datetime.datetime.combine(date, time))
+    return start.astimezone(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def event_lines(uid, date, start_time, end_time, summary, location, stamp, status):
+    end_date = date + datetime.timedelta(days=1) if end_time <= start_time else date
+    yield "BEGIN:VEVENT"
+    yield f"UID:{uid}@{CALENDAR_UID_DOMAIN}"
+    yield f"DTSTAMP:{stamp.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')}"
+    yield f"DTSTART:{format_utc(date, start_time)}"
+    yield f"DTEND:{format_utc(end_date, end_time)}"
+    yield f"SUMMARY:{escape_text(summary)}"
+    yield f"LOCATION:{escape_text(location)}"
+    yield f"STATUS:{status}"
+    yield "END:VEVENT"
+
+
+def iter_calendar(user_id, today=None):
+    """
+    Tulis feed iCalendar baris demi baris: booking user + match yang diikutinya.
+    Kedua query dibaca dengan iterator() sehingga event tidak dimuat sekaligus ke memori.
+    """
+    since = (today or timezone.localdate()) - datetime.timedelta(days=CALENDAR_PAST_DAYS)
+    yield fold("BEGIN:VCALENDAR")
+    yield fold("VERSION:2.0")
+    yield fold(f"PRODID:{CALENDAR_PRODID}")
+    yield fold("CALSCALE:GREGORIAN")
+    yield fold("X-WR-CALNAME:MatchPlay")
+
+    bookings = Booking.objects.filter(user_id=user_id, booking_date__gte=since).values_list(
+        "id", "booking_date", "start_time", "end_time", "created_at", "field__name", "field__location"
+    ).order_by("booking_date", "start_time", "id")
+    for booking_id, date, start, end, created_at, field_name, location in bookings.iterator():
+        for line in event_lines(
+            f"booking-{booking_id}", date, start, end, f"Booking: {field_name}", location, created_at, "CONFIRMED",
+        ):
+            yield fold(line)
+
+    joined = MatchPlayer.objects.filter(user_id=user_id, match__match_date__gte=since).values_list(
+        "match_id", "match__match_date", "match__start_time", "match__end_time", "match__status",
+        "match__sport", "joined_at", "match__field__name", "match__field__location",
+    ).order_by("match__match_date", "match__start_time", "match_id")
+    for match_id, date, start, end, status, sport, joined_at, field_name, location in joined.iterator():
+        for line in event_lines(
+            f"match-{match_id}", date, start, end, f"{sport} match at {field_name}", location, joined_at,
+            MATCH_EVENT_STATUS.get(status, "TENTATIVE"),
+        ):
+            yield fold(line)
+
+    yield fold("END:VCALENDAR")
+
+
+def get_calendar(user_id):
+    """
+    (body, etag) feed user dari cache; dibangun ulang hanya jika sudah di-invalidate.
+    """
+    key = CALENDAR_CACHE_KEY.format(user_id=user_id)
+    feed = cache.get(key)
+    if feed is None:
+        body = "".join(iter_calendar(user_id))
+        feed = (body, '"%s"' % hashlib.md5(body.encode()).hexdigest())
+        cache.set(key, feed, CALENDAR_CACHE_TIMEOUT)
+    return feed
+
+
+def invalidate_calendars(user_ids):
+    cache.delete_many([CALENDAR_CACHE_KEY.format(user_id=user_id) for user_id in user_ids])
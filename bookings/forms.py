@@ -1,14 +1,22 @@
 from django import forms
 from django.utils import timezone
 import datetime
+from .schedule import resolve_slot
 
-# bookable times
-SLOT_CHOICES = (
-    ("10:00-11:00", "10:00-11:00"),
-    ("11:00-12:00", "11:00-12:00"),
-    ("12:00-13:00", "12:00-13:00"),
-    ("13:00-14:00", "13:00-14:00"),
-)
+def clean_time_slot(form, field, date):
+    """
+    Validasi pilihan "HH:MM-HH:MM" terhadap grid slot field pada tanggal tsb
+    (lookup dict dari jadwal yang sudah dikompilasi) dan isi start_time/end_time.
+    """
+    label = form.cleaned_data.get("time_slot")
+    if not (field and date and label):
+        return
+
+    slot = resolve_slot(field.id, date, label)
+    if slot is None:
+        form.add_error("time_slot", "This time slot is not available for the selected date.")
+    else:
+        form.cleaned_data["start_time"], form.cleaned_data["end_time"] = slot
 
 class BookingForm(forms.Form):
     # fields for the form
@@ -24,9 +32,18 @@ class BookingForm(forms.Form):
         initial=timezone.now().date
     )
 
-    time_slot = forms.ChoiceField(
-        choices=SLOT_CHOICES,
+    # slot diisi lewat get_slots (grid per field), divalidasi di clean()
+    time_slot = forms.CharField(
         widget=forms.RadioSelect,
         label="Select Available Time Slot",
         required=True
     )
+
+    def __init__(self, *args, field=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.field = field
+
+    def clean(self):
+        cleaned_data = super().clean()
+        clean_time_slot(self, self.field, cleaned_data.get("booking_date"))
+        return cleaned_data
@@ -0,0 +1,120 @@
+import base64
+import datetime
+import json
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from bookings.models import Booking
+
+PAST_BOOKINGS_PER_PAGE = 20
+MAX_PAST_BOOKINGS_PER_PAGE = 100
+
+# Kolom untuk varian JSON (read path .values(), tanpa instance model)
+BOOKING_HISTORY_COLUMNS = [
+    "id", "field_id", "field__name", "field__location", "booking_date", "start_time", "end_time",
+]
+
+
+def split_point(now=None):
+    """
+    (tanggal, jam) lokal saat ini. Booking dengan (booking_date, end_time) >= titik ini
+    masih upcoming, sisanya past (sama seperti combine(booking_date, end_time) < now).
+    """
+    now = timezone.localtime(now or timezone.now())
+    return now.date(), now.time()
+
+
+def overnight_unfinished(today, now_time):
+    """
+    Booking dengan end_time <= start_time (mis. 23:00-00:00) berakhir keesokan harinya:
+    yang dimulai hari ini belum selesai, yang dimulai kemarin belum selesai jika
+    end_time-nya belum lewat.
+    """
+    yesterday = today - datetime.timedelta(days=1)
+    return (
+        Q(booking_date=today, end_time__lte=F("start_time"))
+        | Q(booking_date=yesterday, end_time__lte=F("start_time"), end_time__gte=now_time)
+    )
+
+
+def upcoming_bookings(user, now=None):
+    """
+    Booking yang belum selesai, range query di atas index (user, booking_date, end_time).
+    Urutan terbaru dulu, sama seperti halaman My Bookings sebelumnya.
+    """
+    today, now_time = split_point(now)
+    return Booking.objects.filter(user=user).filter(
+        Q(booking_date__gt=today) | Q(booking_date=today, end_time__gte=now_time)
+        | overnight_unfinished(today, now_time)
+    ).order_by("-booking_date", "-start_time")
+
+
+def past_bookings(user, now=None):
+    """
+    Booking yang sudah selesai, terbaru dulu. Urutan (booking_date, end_time, id) menurun
+    mengikuti index sehingga halaman berikutnya bisa diambil dengan keyset.
+    """
+    today, now_time = split_point(now)
+    return Booking.objects.filter(user=user).filter(
+        Q(booking_date__lt=today) | Q(booking_date=today, end_time__lt=now_time)
+    ).exclude(overnight_unfinished(today, now_time)).order_by("-booking_date", "-end_time", "-id")
+
+
+def encode_cursor(row):
+    """
+    Cursor keyset berisi (booking_date, end_time, id) dari baris terakhir di halaman.
+    Baris boleh berupa instance Booking atau dict hasil .values().
+    """
+    if isinstance(row, dict):
+        key = [row["booking_date"].isoformat(), row["end_time"].isoformat(), row["id"]]
+    else:
+        key = [row.booking_date.isoformat(), row.end_time.isoformat(), row.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Kebalikan encode_cursor. Mengembalikan None jika cursor tidak valid.
+    """
+    try:
+        date, end_time, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.date.fromisoformat(date), datetime.time.fromisoformat(end_time), int(pk)
+    except (ValueError, TypeError):
+        return None
+
+
+def get_page(queryset, cursor=None, per_page=PAST_BOOKINGS_PER_PAGE):
+    """
+    Satu halaman keyset dari queryset past_bookings(). Mengembalikan (rows, next_cursor);
+    next_cursor None jika ini halaman terakhir. Cursor yang tidak valid diabaikan
+    (halaman pertama), sama seperti list API fields.
+    """
+    key = decode_cursor(cursor) if cursor else None
+    if key:
+        date, end_time, pk = key
+        queryset = queryset.filter(
+            Q(booking_date__lt=date)
+            | Q(booking_date=date, end_time__lt=end_time)
+            | Q(booking_date=date, end_time=end_time, id__lt=pk)
+        )
+
+    # Ambil satu baris ekstra untuk tahu apakah masih ada halaman berikutnya
+    rows = list(queryset[:per_page + 1])
+    next_cursor = encode_cursor(rows[per_page - 1]) if len(rows) > per_page else None
+    return rows[:per_page], next_cursor
+
+
+def serialize_booking_rows(rows):
+    return [
+        {
+            "id": row["id"],
+            "field_id": row["field_id"],
+            "field_name": row["field__name"],
+            "field_location": row["field__location"],
+            "booking_date": row["booking_date"].isoformat(),
+            "start_time": row["start_time"].strftime("%H:%M"),
+            "end_time": row["end_time"].strftime("%H:%M"),
+        }
+        for row in rows
+    ]
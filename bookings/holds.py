@@ -0,0 +1,80 @@
+import datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+from bookings.models import Booking, BookingHold, SlotClaim
+from bookings.reservations import reserve
+
+# Lama slot ditahan selama checkout
+HOLD_TTL = datetime.timedelta(minutes=10)
+HOLD_SWEEP_BATCH_SIZE = 500
+
+
+class HoldExpired(Exception):
+    """
+    Hold tidak ditemukan (sudah dikonfirmasi/dibatalkan/disapu) atau sudah kedaluwarsa.
+    """
+
+
+def place_hold(user, field, date, start_time, end_time, now=None):
+    """
+    Tahan slot untuk checkout. Memakai klaim slot yang sama dengan booking & match,
+    jadi hold yang aktif memblokir reservasi lain. Raise SlotUnavailable jika slot terisi.
+    """
+    now = now or timezone.now()
+    hold = BookingHold(
+        user=user, field=field, date=date, start_time=start_time, end_time=end_time,
+        expires_at=now + HOLD_TTL,
+    )
+    return reserve(hold, "hold", date, start_time, end_time)
+
+
+@transaction.atomic
+def confirm_hold(hold_id, user, now=None):
+    """
+    Ubah hold menjadi Booking secara atomik: klaim slot dipindah dari hold ke booking,
+    lalu hold dihapus. Raise HoldExpired jika hold sudah tidak berlaku.
+    """
+    now = now or timezone.now()
+    hold = BookingHold.objects.select_for_update().filter(pk=hold_id, user=user).first()
+    # Hold kedaluwarsa yang belum disapu tetap ditolak; slotnya dilepas oleh sweeper
+    # atau oleh reservasi berikutnya (bookings/reservations.py)
+    if hold is None or hold.expires_at <= now:
+        raise HoldExpired()
+
+    booking = Booking(
+        user=user, field_id=hold.field_id, booking_date=hold.date,
+        start_time=hold.start_time, end_time=hold.end_time,
+    )
+    # Klaim sudah ada (milik hold), signal tidak perlu membuat klaim baru
+    booking._slot_claimed = True
+    booking.save()
+    SlotClaim.objects.filter(hold=hold).update(hold=None, booking=booking)
+    hold.delete()
+    return booking
+
+
+def release_hold(hold_id, user):
+    """
+    Batalkan checkout; klaim slot ikut terhapus (cascade).
+    """
+    BookingHold.objects.filter(pk=hold_id, user=user).delete()
+
+
+def expire_holds(now=None, batch_size=HOLD_SWEEP_BATCH_SIZE):
+    """
+    Sapu hold yang kedaluwarsa per batch (urut expires_at, memakai index-nya).
+    Menghapus hold juga menghapus klaimnya dan me-refresh bitmap okupansi lewat signal.
+    Mengembalikan jumlah hold yang dihapus.
+    """
+    now = now or timezone.now()
+    expired = 0
+    while True:
+        ids = list(
+            BookingHold.objects.filter(expires_at__lte=now).order_by("expires_at").values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return expired
+        BookingHold.objects.filter(id__in=ids).delete()
+        expired += len(ids)
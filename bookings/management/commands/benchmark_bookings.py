@@ -0,0 +1,230 @@
+import datetime
+import json
+import math
+import random
+import time
+from collections import Counter, defaultdict
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings.models import BookingHold
+from bookings.schedule import slot_grid, slot_label
+from fields.cache import bump_catalog_version
+from fields.models import Field
+from fields.stats import add_field
+
+# Campuran default: kebanyakan orang melihat slot, sebagian kecil booking
+DEFAULT_MIX = 'slots=70,book=15,history=15'
+OPERATIONS = ('slots', 'book', 'history')
+# Seed data benchmark memakai prefix ini; dihapus lewat prefix ini setelah run (kecuali --keep-data)
+SEED_PREFIX = 'bench'
+
+
+def parse_mix(value):
+    """
+    "slots=70,book=15,history=15" -> {"slots": 70, ...}. Raise ValueError jika tidak valid.
+    """
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f'Unknown operation "{name}", expected one of {", ".join(OPERATIONS)}')
+        mix[name] = int(weight)
+    if not any(mix.values()) or any(weight < 0 for weight in mix.values()):
+        raise ValueError('Operation weights must be >= 0 and not all zero')
+    return mix
+
+
+def percentile(sorted_values, pct):
+    """
+    Persentil nearest-rank dari list yang sudah terurut.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(samples):
+    latencies = sorted(latency for latency, _, _ in samples)
+    return {
+        'count': len(samples),
+        'mean_ms': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(latencies[-1], 3) if latencies else 0.0,
+        'queries_per_request': round(sum(queries for _, queries, _ in samples) / len(samples), 2) if samples else 0.0,
+        'status_codes': dict(sorted(Counter(str(status) for _, _, status in samples).items())),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed N fields and M users, replay a mix of get_slots_ajax / show_book (+ checkout) / '
+        'show_my_bookings through the test client and report p50/p95/p99 latency, queries per '
+        'request and throughput. Runs against the configured default database (SQLite or '
+        'PostgreSQL) in autocommit, so every request commits like in production; seeded data '
+        'is deleted afterwards unless --keep-data is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fields', type=int, default=20, help='Jumlah field yang di-seed')
+        parser.add_argument('--users', type=int, default=50, help='Jumlah user yang di-seed')
+        parser.add_argument('--requests', type=int, default=1000, help='Jumlah operasi yang diputar ulang')
+        parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Bobot operasi, default "{DEFAULT_MIX}"')
+        parser.add_argument('--days', type=int, default=14, help='Rentang tanggal booking dari besok')
+        parser.add_argument('--seed', type=int, default=0, help='Seed random agar run bisa dibandingkan')
+        parser.add_argument('--format', choices=['text', 'json'], default='text', help='Format output ke stdout')
+        parser.add_argument('--output', help='Tulis hasil JSON ke file ini')
+        parser.add_argument('--keep-data', action='store_true', help='Jangan hapus data seed setelah run')
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options['mix'])
+        except ValueError as error:
+            raise CommandError(str(error))
+        if min(options['fields'], options['users'], options['requests'], options['days']) < 1:
+            raise CommandError('--fields, --users, --requests and --days must be positive')
+
+        # Tanpa transaksi pembungkus: tiap request commit sendiri (fsync, lock dilepas,
+        # on_commit berjalan), jadi latency book/checkout sebanding dengan production
+        self.suffix = time.time_ns()
+        try:
+            report = self.run(mix, options)
+        finally:
+            if not options['keep_data']:
+                self.cleanup()
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+
+        if options['format'] == 'json':
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        for name, stats in report['operations'].items():
+            self.stdout.write(
+                f"{name:>10}: n={stats['count']:<6} p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms "
+                f"p99={stats['p99_ms']:.2f}ms queries/req={stats['queries_per_request']:.1f} status={stats['status_codes']}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Benchmarked {report['requests']} requests on {report['database']}: "
+            f"{report['throughput_rps']:.1f} req/s, p95 {report['overall']['p95_ms']:.2f}ms"
+        ))
+
+    def seed_url(self):
+        return f'https://example.com/{SEED_PREFIX}/{self.suffix}/'
+
+    def seed_username(self):
+        return f'{SEED_PREFIX}-{self.suffix}-'
+
+    def seed(self, options):
+        fields = [
+            Field(
+                name=f'{SEED_PREFIX} field {index}', image='https://example.com/field.jpg',
+                price=100000 + index * 1000, rating=4.0, location='Jakarta Selatan', sport='futsal',
+                url=f'{self.seed_url()}{index}',
+            )
+            for index in range(options['fields'])
+        ]
+        for field in fields:
+            field.assign_coordinates()
+        fields = Field.objects.bulk_create(fields)
+        # bulk_create tidak memicu signal Field: statistik & versi katalog diperbarui di sini,
+        # agar delete di cleanup() (yang memicu signal per field) mengurangi angka yang sama
+        for field in fields:
+            add_field(field.sport, field.price, field.rating)
+        bump_catalog_version()
+        users = User.objects.bulk_create([
+            User(username=f'{self.seed_username()}{index}') for index in range(options['users'])
+        ])
+        return fields, users
+
+    def cleanup(self):
+        """
+        Hapus data seed run ini. Booking, hold, klaim slot dan okupansinya ikut terhapus (cascade).
+        """
+        for client in getattr(self, 'clients', {}).values():
+            client.logout()
+        Field.objects.filter(url__startswith=self.seed_url()).delete()
+        User.objects.filter(username__startswith=self.seed_username()).delete()
+
+    def run(self, mix, options):
+        rng = random.Random(options['seed'])
+        fields, users = self.seed(options)
+        today = timezone.localdate()
+        dates = [today + datetime.timedelta(days=offset) for offset in range(1, options['days'] + 1)]
+
+        clients = self.clients = {}
+
+        def client_for(user):
+            # Login di luar pengukuran; satu client (session) per user
+            if user.pk not in clients:
+                client = Client(HTTP_HOST='localhost')
+                client.force_login(user)
+                clients[user.pk] = client
+            return clients[user.pk]
+
+        # Rencana operasi dibuat lebih dulu agar pengukuran hanya berisi request
+        names, weights = zip(*mix.items())
+        plan = []
+        for _ in range(options['requests']):
+            field, user, date = rng.choice(fields), rng.choice(users), rng.choice(dates)
+            grid = slot_grid(field.id, date)
+            label = slot_label(*rng.choice(grid)) if grid else None
+            plan.append((rng.choices(names, weights)[0], field, user, date, label))
+        for _, _, user, _, _ in plan:
+            client_for(user)
+
+        samples = defaultdict(list)
+
+        def measure(name, call):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = call()
+                elapsed = (time.perf_counter() - started) * 1000
+            samples[name].append((elapsed, len(queries), response.status_code))
+            return response
+
+        started = time.perf_counter()
+        for name, field, user, date, label in plan:
+            client = client_for(user)
+            if name == 'slots':
+                measure('slots', lambda: client.get(
+                    reverse('bookings:get_slots_ajax', args=[field.id]), {'date': date.isoformat()}
+                ))
+            elif name == 'history':
+                measure('history', lambda: client.get(reverse('bookings:show_my_bookings')))
+            elif label:
+                response = measure('book', lambda: client.post(
+                    reverse('bookings:show_book', args=[field.id]),
+                    {'booking_date': date.isoformat(), 'time_slot': label},
+                ))
+                # Slot berhasil ditahan -> konfirmasi seperti user menyelesaikan checkout
+                if response.status_code == 302 and '/checkout/' in response.url:
+                    measure('checkout', lambda: client.post(response.url, {'action': 'confirm'}))
+        duration = time.perf_counter() - started
+
+        all_samples = [sample for values in samples.values() for sample in values]
+        return {
+            'database': connection.vendor,
+            'fields': options['fields'],
+            'users': options['users'],
+            'requests': len(all_samples),
+            'mix': mix,
+            'seed': options['seed'],
+            'duration_s': round(duration, 3),
+            'throughput_rps': round(len(all_samples) / duration, 2) if duration else 0.0,
+            'holds_left': BookingHold.objects.filter(field__in=fields).count(),
+            'overall': summarize(all_samples),
+            'operations': {name: summarize(values) for name, values in sorted(samples.items())},
+        }
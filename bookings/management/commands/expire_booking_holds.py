@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+from bookings.holds import HOLD_SWEEP_BATCH_SIZE, expire_holds
+
+class Command(BaseCommand):
+    help = 'Expire booking holds past their TTL (run from cron, or with --loop as a background sweeper)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=HOLD_SWEEP_BATCH_SIZE, help='Jumlah hold yang dihapus per batch')
+        parser.add_argument('--loop', action='store_true', help='Jalan terus sebagai sweeper')
+        parser.add_argument('--interval', type=float, default=30, help='Jeda antar sapuan dalam detik (dengan --loop)')
+
+    def handle(self, *args, **options):
+        while True:
+            expired = expire_holds(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Successfully expired {expired} booking holds"))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from bookings.availability import rebuild_occupancy
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-field/day slot occupancy bitmaps from Booking and Match'
+
+    def handle(self, *args, **kwargs):
+        days = rebuild_occupancy()
+        self.stdout.write(self.style.SUCCESS(f"Successfully rebuilt slot occupancy: {days} field-days occupied"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from bookings.rollups import rollup_occupancy
+
+class Command(BaseCommand):
+    help = 'Roll up bookings and matches created since the last run into OccupancyRollup (run nightly from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Bangun ulang rollup dari awal (abaikan high-water mark)')
+
+    def handle(self, *args, **options):
+        processed = rollup_occupancy(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Successfully rolled up {processed['bookings']} bookings and {processed['matches']} matches"
+        ))
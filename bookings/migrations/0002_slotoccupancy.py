@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Salinan bookings.availability (ACTIVE_MATCH_STATUSES, time_mask) per 2026-10-18
+SLOT_MINUTES = 30
+ACTIVE_MATCH_STATUSES = ['Pending', 'Confirmed']
+
+
+def time_mask(start, end):
+    """
+    Bitmask untuk rentang waktu [start, end). end <= start dianggap sampai tengah malam.
+    """
+    first = (start.hour * 60 + start.minute) // SLOT_MINUTES
+    end_minutes = end.hour * 60 + end.minute
+    if end_minutes <= start.hour * 60 + start.minute:
+        end_minutes = 24 * 60
+    last = -(-end_minutes // SLOT_MINUTES)  # pembulatan ke atas
+    return ((1 << last) - 1) & ~((1 << first) - 1)
+
+
+def backfill_occupancy(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+    Match = apps.get_model('matches', 'Match')
+    SlotOccupancy = apps.get_model('bookings', 'SlotOccupancy')
+
+    masks = {}
+    for field_id, date, start, end in Booking.objects.values_list('field_id', 'booking_date', 'start_time', 'end_time'):
+        masks.setdefault((field_id, date), [0, 0])[0] |= time_mask(start, end)
+    for field_id, date, start, end in Match.objects.filter(status__in=ACTIVE_MATCH_STATUSES).values_list(
+        'field_id', 'match_date', 'start_time', 'end_time'
+    ):
+        masks.setdefault((field_id, date), [0, 0])[1] |= time_mask(start, end)
+
+    SlotOccupancy.objects.bulk_create([
+        SlotOccupancy(field_id=field_id, date=date, booked_mask=booked, match_mask=match)
+        for (field_id, date), (booked, match) in masks.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+        ('fields', '0007_updated_at'),
+        ('matches', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('booked_mask', models.BigIntegerField(default=0)),
+                ('match_mask', models.BigIntegerField(default=0)),
+                ('field', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='fields.field')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('field', 'date'), name='unique_occupancy_day')],
+            },
+        ),
+        migrations.RunPython(backfill_occupancy, migrations.RunPython.noop),
+    ]
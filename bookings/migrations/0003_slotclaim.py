@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Salinan bookings.availability.ACTIVE_MATCH_STATUSES per 2026-10-18
+ACTIVE_MATCH_STATUSES = ['Pending', 'Confirmed']
+
+
+def backfill_claims(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+    Match = apps.get_model('matches', 'Match')
+    SlotClaim = apps.get_model('bookings', 'SlotClaim')
+
+    # Booking lebih dulu; match aktif yang bentrok dengan slot yang sudah diklaim dilewati
+    claims = {}
+    for booking_id, field_id, date, start in Booking.objects.values_list('id', 'field_id', 'booking_date', 'start_time'):
+        claims.setdefault((field_id, date, start), {'booking_id': booking_id})
+    for match_id, field_id, date, start in Match.objects.filter(status__in=ACTIVE_MATCH_STATUSES).order_by('created_at').values_list(
+        'id', 'field_id', 'match_date', 'start_time'
+    ):
+        claims.setdefault((field_id, date, start), {'match_id': match_id})
+
+    SlotClaim.objects.bulk_create([
+        SlotClaim(field_id=field_id, date=date, start_time=start, **owner)
+        for (field_id, date, start), owner in claims.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_slotoccupancy'),
+        ('fields', '0007_updated_at'),
+        ('matches', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotClaim',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('booking', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='slot_claim', to='bookings.booking')),
+                ('field', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_claims', to='fields.field')),
+                ('match', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='slot_claim', to='matches.match')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('field', 'date', 'start_time'), name='unique_slot_claim')],
+            },
+        ),
+        migrations.RunPython(backfill_claims, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_slotclaim'),
+        ('fields', '0007_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FieldSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot_minutes', models.PositiveSmallIntegerField(choices=[(30, '30 minutes'), (60, '1 hour'), (90, '1.5 hours'), (120, '2 hours')], default=60)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('field', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='schedule', to='fields.field')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BlackoutDate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('reason', models.CharField(blank=True, max_length=255)),
+                ('field', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blackout_dates', to='fields.field')),
+            ],
+            options={
+                'ordering': ['date'],
+                'constraints': [models.UniqueConstraint(fields=('field', 'date'), name='unique_blackout_date')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OpeningHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('open_time', models.TimeField()),
+                ('close_time', models.TimeField()),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hours', to='bookings.fieldschedule')),
+            ],
+            options={
+                'ordering': ['weekday'],
+                'constraints': [models.UniqueConstraint(fields=('schedule', 'weekday'), name='unique_opening_weekday')],
+            },
+        ),
+    ]
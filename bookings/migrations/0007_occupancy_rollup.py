@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_booking_hold'),
+        ('fields', '0007_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccupancyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sport', models.CharField(choices=[('badminton', 'Badminton'), ('basketball', 'Basketball'), ('billiard', 'Billiard'), ('e-sport', 'E-Sport'), ('futsal', 'Futsal'), ('golf', 'Golf'), ('mini soccer', 'Mini Soccer'), ('padel', 'Padel'), ('pickleball', 'Pickleball'), ('sepak bola', 'Sepak Bola'), ('squash', 'Squash'), ('tenis meja', 'Tenis Meja'), ('tennis', 'Tennis')], max_length=20)),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('start_time', models.TimeField()),
+                ('booking_count', models.PositiveIntegerField(default=0)),
+                ('match_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50, unique=True)),
+                ('last_created_at', models.DateTimeField(blank=True, null=True)),
+                ('last_id', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['created_at', 'id'], name='booking_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='occupancyrollup',
+            name='field',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy_rollups', to='fields.field'),
+        ),
+        migrations.AddConstraint(
+            model_name='occupancyrollup',
+            constraint=models.UniqueConstraint(fields=('field', 'weekday', 'start_time'), name='unique_occupancy_rollup'),
+        ),
+    ]
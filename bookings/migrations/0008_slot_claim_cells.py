@@ -0,0 +1,68 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:51
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Salinan bookings.availability.slot_cells (sel 30 menit) per 2026-10-18
+SLOT_MINUTES = 30
+
+
+def slot_cells(start, end):
+    """
+    Jam mulai tiap sel 30 menit yang tercakup [start, end). end <= start dianggap sampai tengah malam.
+    """
+    first = (start.hour * 60 + start.minute) // SLOT_MINUTES
+    end_minutes = end.hour * 60 + end.minute
+    if end_minutes <= start.hour * 60 + start.minute:
+        end_minutes = 24 * 60
+    last = -(-end_minutes // SLOT_MINUTES)  # pembulatan ke atas
+    return [datetime.time(*divmod(cell * SLOT_MINUTES, 60)) for cell in range(first, last)]
+
+
+def claim_covered_cells(apps, schema_editor):
+    SlotClaim = apps.get_model('bookings', 'SlotClaim')
+
+    # Klaim lama hanya sel jam mulai; tambahkan sel lain yang dicakup [start, end).
+    # Sel yang sudah diklaim reservasi lain (data lama yang tumpang tindih) dilewati
+    cells = []
+    claims = SlotClaim.objects.select_related('booking', 'match', 'hold')
+    for claim in claims.iterator():
+        owner = claim.booking or claim.match or claim.hold
+        if owner is None:
+            continue
+        for start in slot_cells(owner.start_time, owner.end_time):
+            if start != claim.start_time:
+                cells.append(SlotClaim(
+                    field_id=claim.field_id, date=claim.date, start_time=start,
+                    booking_id=claim.booking_id, match_id=claim.match_id, hold_id=claim.hold_id,
+                ))
+    SlotClaim.objects.bulk_create(cells, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_occupancy_rollup'),
+        ('matches', '0004_match_waitlist'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='slotclaim',
+            name='booking',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='slot_claims', to='bookings.booking'),
+        ),
+        migrations.AlterField(
+            model_name='slotclaim',
+            name='hold',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='slot_claims', to='bookings.bookinghold'),
+        ),
+        migrations.AlterField(
+            model_name='slotclaim',
+            name='match',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='slot_claims', to='matches.match'),
+        ),
+        migrations.RunPython(claim_covered_cells, migrations.RunPython.noop),
+    ]
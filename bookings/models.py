@@ -14,7 +14,166 @@ class Booking(models.Model):
         constraints = [
             models.UniqueConstraint(fields=["field", "booking_date", "start_time"], name="unique_booking_slot")
         ]
+        indexes = [
+            # Riwayat per user: split upcoming/past + keyset past bookings (bookings/history.py)
+            models.Index(fields=["user", "booking_date", "end_time"], name="booking_user_history_idx"),
+            # Scan inkremental rollup okupansi dari high-water mark (bookings/rollups.py)
+            models.Index(fields=["created_at", "id"], name="booking_created_idx"),
+        ]
         ordering = ["booking_date", "start_time"] # Order bookings chronologically
 
     def __str__(self):
         return f"Booking for {self.field.name} by {self.user.username} on {self.booking_date} at {self.start_time.strftime('%H:%M')}"
+
+
+class SlotOccupancy(models.Model):
+    """
+    Bitmap okupansi per field per hari, dijaga oleh signal Booking/Match
+    (lihat bookings/availability.py). Bit ke-i = slot 30 menit mulai menit i * 30.
+    """
+    field = models.ForeignKey(Field, on_delete=models.CASCADE, related_name="occupancy")
+    date = models.DateField()
+    booked_mask = models.BigIntegerField(default=0)
+    match_mask = models.BigIntegerField(default=0)
+    hold_mask = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["field", "date"], name="unique_occupancy_day")
+        ]
+
+    def __str__(self):
+        return f"Occupancy for {self.field_id} on {self.date}"
+
+
+class SlotClaim(models.Model):
+    """
+    Klaim satu sel 30 menit (field, tanggal, jam mulai sel) yang dipakai bersama oleh Booking,
+    Match dan BookingHold. Reservasi mengklaim setiap sel yang dicakup [start, end), jadi slot
+    yang tumpang tindih (mis. 10:00-11:30 dan 10:30-11:30) bentrok di unique key ini.
+    Reservasi selalu insert klaim lebih dulu (lihat bookings/reservations.py), sehingga
+    request yang kalah balapan langsung gagal.
+    """
+    field = models.ForeignKey(Field, on_delete=models.CASCADE, related_name="slot_claims")
+    date = models.DateField()
+    start_time = models.TimeField()
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, null=True, blank=True, related_name="slot_claims")
+    match = models.ForeignKey("matches.Match", on_delete=models.CASCADE, null=True, blank=True, related_name="slot_claims")
+    hold = models.ForeignKey("BookingHold", on_delete=models.CASCADE, null=True, blank=True, related_name="slot_claims")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["field", "date", "start_time"], name="unique_slot_claim")
+        ]
+
+    def __str__(self):
+        return f"Slot claim for {self.field_id} on {self.date} at {self.start_time.strftime('%H:%M')}"
+
+
+class BookingHold(models.Model):
+    """
+    Slot yang ditahan selama user checkout (lihat bookings/holds.py). Selama belum
+    kedaluwarsa, slot dianggap terisi; dikonfirmasi menjadi Booking atau dihapus sweeper.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="booking_holds")
+    field = models.ForeignKey(Field, on_delete=models.CASCADE, related_name="holds")
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Hold for {self.field_id} on {self.date} at {self.start_time.strftime('%H:%M')} until {self.expires_at}"
+
+
+class FieldSchedule(models.Model):
+    """
+    Jadwal buka sebuah field: panjang slot + jam buka per hari (OpeningHours)
+    + tanggal tutup (BlackoutDate). Field tanpa jadwal memakai jam default
+    (lihat bookings/schedule.py).
+    """
+    SLOT_LENGTH_CHOICES = [(30, "30 minutes"), (60, "1 hour"), (90, "1.5 hours"), (120, "2 hours")]
+
+    field = models.OneToOneField(Field, on_delete=models.CASCADE, related_name="schedule")
+    slot_minutes = models.PositiveSmallIntegerField(choices=SLOT_LENGTH_CHOICES, default=60)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Schedule for {self.field.name}"
+
+
+class OpeningHours(models.Model):
+    WEEKDAY_CHOICES = [
+        (0, "Monday"),
+        (1, "Tuesday"),
+        (2, "Wednesday"),
+        (3, "Thursday"),
+        (4, "Friday"),
+        (5, "Saturday"),
+        (6, "Sunday"),
+    ]
+
+    schedule = models.ForeignKey(FieldSchedule, on_delete=models.CASCADE, related_name="hours")
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    open_time = models.TimeField()
+    close_time = models.TimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["schedule", "weekday"], name="unique_opening_weekday")
+        ]
+        ordering = ["weekday"]
+
+    def __str__(self):
+        return f"{self.get_weekday_display()} {self.open_time.strftime('%H:%M')}-{self.close_time.strftime('%H:%M')}"
+
+
+class BlackoutDate(models.Model):
+    field = models.ForeignKey(Field, on_delete=models.CASCADE, related_name="blackout_dates")
+    date = models.DateField()
+    reason = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["field", "date"], name="unique_blackout_date")
+        ]
+        ordering = ["date"]
+
+    def __str__(self):
+        return f"{self.field.name} closed on {self.date}"
+
+
+class OccupancyRollup(models.Model):
+    """
+    Ringkasan okupansi per field x weekday x jam mulai slot, diisi inkremental oleh
+    rollup_occupancy (bookings/rollups.py). Halaman analitik hanya membaca tabel ini.
+    """
+    field = models.ForeignKey(Field, on_delete=models.CASCADE, related_name="occupancy_rollups")
+    sport = models.CharField(max_length=20, choices=Field.SPORT_CATEGORY)
+    weekday = models.PositiveSmallIntegerField(choices=OpeningHours.WEEKDAY_CHOICES)
+    start_time = models.TimeField()
+    booking_count = models.PositiveIntegerField(default=0)
+    match_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["field", "weekday", "start_time"], name="unique_occupancy_rollup")
+        ]
+
+    def __str__(self):
+        return f"Rollup for {self.field_id} on {self.get_weekday_display()} at {self.start_time.strftime('%H:%M')}"
+
+
+class RollupWatermark(models.Model):
+    """
+    High-water mark (created_at, id) baris terakhir yang sudah masuk rollup, per sumber.
+    """
+    source = models.CharField(max_length=50, unique=True)
+    last_created_at = models.DateTimeField(null=True, blank=True)
+    last_id = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} rolled up through {self.last_created_at}"
@@ -0,0 +1,109 @@
+import datetime
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from bookings.availability import refresh_occupancy_days, slot_cells
+from bookings.calendar import invalidate_calendars
+from bookings.models import Booking, BookingHold, SlotClaim
+from bookings.reservations import SlotUnavailable
+from bookings.schedule import resolve_slot
+from matches.recommendations import invalidate_profile
+
+# Satu musim liga (mingguan) muat dalam batas ini
+MAX_RECURRING_OCCURRENCES = 40
+# Percobaan ulang jika ada reservasi lain yang masuk di antara cek konflik dan insert
+RECURRING_ATTEMPTS = 3
+
+
+def recurring_dates(start_date, end_date, weekday):
+    """
+    Semua tanggal dengan weekday tsb (0 = Senin) dalam [start_date, end_date].
+    """
+    first = start_date + datetime.timedelta(days=(weekday - start_date.weekday()) % 7)
+    if first > end_date:
+        return []
+    return [first + datetime.timedelta(weeks=week) for week in range((end_date - first).days // 7 + 1)]
+
+
+def book_recurring(user, field, label, weekday, start_date, end_date, now=None):
+    """
+    Booking slot `label` ("HH:MM-HH:MM") setiap `weekday` dari start_date s.d. end_date.
+    Konflik semua tanggal dicek dengan satu query ke SlotClaim (booking, match aktif, hold),
+    tanggal yang bebas di-insert dengan bulk_create dalam satu transaksi.
+    Mengembalikan laporan per tanggal: {"date", "status": "booked"/"skipped", "booking_id"/"reason"}.
+    """
+    dates = recurring_dates(start_date, end_date, weekday)
+    if not dates:
+        raise ValueError("The date range contains no occurrence of that weekday.")
+    if len(dates) > MAX_RECURRING_OCCURRENCES:
+        raise ValueError(f"At most {MAX_RECURRING_OCCURRENCES} occurrences per request.")
+
+    now = timezone.localtime(now or timezone.now())
+    report = {date: {"date": date.isoformat()} for date in dates}
+    candidates = {}
+    for date in dates:
+        slot = resolve_slot(field.id, date, label)
+        if slot is None:
+            report[date].update(status="skipped", reason="closed")
+        elif date < now.date() or (date == now.date() and slot[0] < now.time()):
+            report[date].update(status="skipped", reason="past")
+        else:
+            candidates[date] = slot
+
+    for _ in range(RECURRING_ATTEMPTS):
+        try:
+            booked = _book_free_dates(user, field, candidates, now)
+            break
+        except IntegrityError:
+            continue
+    else:
+        raise SlotUnavailable()
+
+    for date in candidates:
+        if date in booked:
+            report[date].update(status="booked", booking_id=booked[date])
+        else:
+            report[date].update(status="skipped", reason="taken")
+    return [report[date] for date in dates]
+
+
+@transaction.atomic
+def _book_free_dates(user, field, candidates, now):
+    if not candidates:
+        return {}
+    cells = {date: slot_cells(start, end) for date, (start, end) in candidates.items()}
+    all_cells = {start for day_cells in cells.values() for start in day_cells}
+
+    # Hold kedaluwarsa yang belum disapu tidak menghalangi
+    BookingHold.objects.filter(
+        field=field, date__in=candidates, expires_at__lte=now,
+        id__in=SlotClaim.objects.filter(field=field, date__in=candidates, start_time__in=all_cells).values("hold_id"),
+    ).delete()
+    # Satu query konflik untuk semua tanggal: tanggal bebas jika tidak ada sel yang sudah diklaim
+    taken = set(
+        SlotClaim.objects.filter(field=field, date__in=candidates, start_time__in=all_cells).values_list("date", "start_time")
+    )
+    free = {
+        date: slot for date, slot in candidates.items()
+        if not any((date, start) in taken for start in cells[date])
+    }
+    if not free:
+        return {}
+
+    bookings = Booking.objects.bulk_create([
+        Booking(user=user, field=field, booking_date=date, start_time=start, end_time=end)
+        for date, (start, end) in free.items()
+    ])
+    # Unique key klaim tetap menjadi penjaga terakhir: bentrok -> IntegrityError, semua di-rollback
+    SlotClaim.objects.bulk_create([
+        SlotClaim(field=field, date=booking.booking_date, start_time=start, booking=booking)
+        for booking in bookings
+        for start in cells[booking.booking_date]
+    ])
+    # bulk_create tidak memicu signal: bitmap okupansi diperbarui sekaligus, feed kalender
+    # dan profil rekomendasi user di-invalidate setelah commit
+    refresh_occupancy_days(field.id, list(free))
+    transaction.on_commit(lambda: invalidate_calendars([user.id]))
+    transaction.on_commit(lambda: invalidate_profile(user.id))
+    return {booking.booking_date: booking.id for booking in bookings}
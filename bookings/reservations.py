@@ -0,0 +1,154 @@
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from bookings.availability import ACTIVE_MATCH_STATUSES, slot_cells
+from bookings.models import Booking, BookingHold, SlotClaim
+from matches.models import Match, MatchPlayer
+
+
+class SlotUnavailable(Exception):
+    """
+    Slot sudah diklaim booking, match atau hold lain. `taken_by` berisi "booking" / "match" /
+    "hold" (None jika pemiliknya tidak diketahui).
+    """
+
+    def __init__(self, taken_by=None):
+        self.taken_by = taken_by
+        super().__init__(f"Slot already taken by {taken_by or 'another reservation'}")
+
+
+def claim_owner(field_id, date, cells):
+    claim = SlotClaim.objects.filter(field_id=field_id, date=date, start_time__in=cells).order_by("start_time").values(
+        "booking_id", "match_id", "hold_id"
+    ).first()
+    if not claim:
+        return None
+    if claim["match_id"]:
+        return "match"
+    return "hold" if claim["hold_id"] else "booking"
+
+
+def release_expired_holds(field_id, date, cells):
+    """
+    Hapus hold kedaluwarsa yang masih memegang klaim salah satu sel ini (belum disapu sweeper).
+    Mengembalikan True jika ada yang dilepas.
+    """
+    deleted, _ = BookingHold.objects.filter(
+        field_id=field_id, date=date, expires_at__lte=timezone.now(),
+        id__in=SlotClaim.objects.filter(field_id=field_id, date=date, start_time__in=cells).values("hold_id"),
+    ).delete()
+    return bool(deleted)
+
+
+def claim_cells(field_id, date, cells, **owner):
+    # Satu INSERT untuk semua sel; sel yang sudah diklaim -> IntegrityError dari unique_slot_claim
+    return SlotClaim.objects.bulk_create([
+        SlotClaim(field_id=field_id, date=date, start_time=start, **owner) for start in cells
+    ])
+
+
+def reserve(instance, kind, date, start_time, end_time, after_save=None):
+    """
+    Insert-first: klaim setiap sel 30 menit yang dicakup [start_time, end_time) dibuat sebelum
+    booking/match, dalam satu transaksi. Request yang kalah balapan atau yang slotnya tumpang
+    tindih gagal di unique_slot_claim (bukan di cek exists() yang bisa lolos bersamaan),
+    transaksinya di-rollback, lalu dilaporkan sebagai SlotUnavailable.
+    Jika pemegang klaim ternyata hold yang sudah kedaluwarsa, hold itu dilepas dan dicoba sekali lagi.
+    """
+    cells = slot_cells(start_time, end_time)
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                claims = claim_cells(instance.field_id, date, cells)
+                # Klaim sudah ada, signal tidak perlu menyinkronkan ulang
+                instance._slot_claimed = True
+                instance.save()
+                SlotClaim.objects.filter(pk__in=[claim.pk for claim in claims]).update(**{kind: instance})
+                if after_save:
+                    after_save(instance)
+            return instance
+        except IntegrityError:
+            instance.pk = None
+            if attempt or not release_expired_holds(instance.field_id, date, cells):
+                raise SlotUnavailable(claim_owner(instance.field_id, date, cells))
+
+
+def reserve_booking(user, field, booking_date, start_time, end_time):
+    booking = Booking(user=user, field=field, booking_date=booking_date, start_time=start_time, end_time=end_time)
+    return reserve(booking, "booking", booking_date, start_time, end_time)
+
+
+def reserve_match(organizer, field, match_date, start_time, end_time, **details):
+    """
+    Buat match beserta organizer sebagai pemain pertama, atomik dengan klaim slotnya.
+    """
+    match = Match(
+        organizer=organizer, field=field, match_date=match_date,
+        start_time=start_time, end_time=end_time, status="Pending", **details,
+    )
+    return reserve(
+        match, "match", match_date, start_time, end_time,
+        after_save=lambda match: MatchPlayer.objects.create(match=match, user=organizer),
+    )
+
+
+def slot_key(instance):
+    """
+    (kind, tanggal, sel) booking/match, atau None untuk match yang tidak menempati slot.
+    """
+    if isinstance(instance, Booking):
+        return "booking", instance.booking_date, slot_cells(instance.start_time, instance.end_time)
+    if instance.status not in ACTIVE_MATCH_STATUSES:
+        return None
+    return "match", instance.match_date, slot_cells(instance.start_time, instance.end_time)
+
+
+def taken_message(instance, date, cells):
+    return (
+        f"Slot {instance.start_time.strftime('%H:%M')}-{instance.end_time.strftime('%H:%M')} on {date} "
+        f"is already taken by {claim_owner(instance.field_id, date, cells) or 'another reservation'}."
+    )
+
+
+def check_slot_free(instance):
+    """
+    Dipanggil sebelum booking/match ditulis di luar reserve_*: tolak dengan ValidationError
+    jika jadwalnya menabrak klaim reservasi lain, sebelum barisnya sempat disimpan.
+    Unique key di sync_slot_claim tetap menjadi penjaga terakhir.
+    """
+    key = slot_key(instance)
+    if key is None:
+        return
+    kind, date, cells = key
+    conflicts = SlotClaim.objects.filter(field_id=instance.field_id, date=date, start_time__in=cells)
+    if instance.pk:
+        conflicts = conflicts.exclude(**{kind: instance})
+    if conflicts.exists():
+        raise ValidationError(taken_message(instance, date, cells))
+
+
+def sync_slot_claim(instance):
+    """
+    Jaga klaim untuk booking/match yang ditulis di luar reserve_* (admin, update status,
+    pindah jadwal). Match yang tidak aktif lagi melepas slotnya. Jika jadwal barunya
+    bertabrakan dengan klaim lain, raise ValidationError (bukan IntegrityError/500);
+    klaim lama tidak berubah.
+    """
+    kind = "booking" if isinstance(instance, Booking) else "match"
+    claims = SlotClaim.objects.filter(**{kind: instance})
+    key = slot_key(instance)
+    if key is None:
+        claims.delete()
+        return
+
+    _, date, cells = key
+    current = set(claims.values_list("field_id", "date", "start_time"))
+    if current == {(instance.field_id, date, start) for start in cells}:
+        return
+    try:
+        with transaction.atomic():
+            claims.delete()
+            claim_cells(instance.field_id, date, cells, **{kind: instance})
+    except IntegrityError:
+        raise ValidationError(taken_message(instance, date, cells))
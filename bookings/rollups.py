@@ -0,0 +1,205 @@
+import datetime
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, ExtractIsoWeekDay
+from django.utils import timezone
+
+from bookings.models import Booking, OccupancyRollup, OpeningHours, RollupWatermark
+from fields.models import Field
+from matches.models import Match
+
+# Baris yang dibuat dalam jendela ini belum diproses, agar transaksi yang belum commit
+# (created_at sudah terisi tapi belum terlihat) tidak terlewat oleh high-water mark
+ROLLUP_LAG = datetime.timedelta(minutes=5)
+
+# sumber -> (model, kolom tanggal, kolom counter di OccupancyRollup, filter tambahan)
+ROLLUP_SOURCES = {
+    "bookings": (Booking, "booking_date", "booking_count", Q()),
+    "matches": (Match, "match_date", "match_count", ~Q(status="Cancelled")),
+}
+
+# model -> sumber, untuk koreksi rollup dari signal (bookings/signals.py)
+ROLLUP_SOURCE_BY_MODEL = {model: source for source, (model, *_) in ROLLUP_SOURCES.items()}
+
+# Jumlah field per daftar pada laporan (paling jarang dipakai dulu)
+ROLLUP_REPORT_LIMIT = 50
+
+
+@transaction.atomic
+def rollup_occupancy(now=None, full=False):
+    """
+    Tambahkan Booking/Match yang dibuat sejak high-water mark (created_at, id) ke OccupancyRollup:
+    satu GROUP BY per sumber di atas index (created_at, id), lalu upsert counter.
+    Baris yang sudah di-rollup lalu dibatalkan/dipindah/dihapus dikoreksi oleh adjust_rollup
+    (signal). full=True membangun ulang dari awal. Mengembalikan {sumber: jumlah baris yang diproses}.
+    """
+    cutoff = (now or timezone.now()) - ROLLUP_LAG
+    if full:
+        OccupancyRollup.objects.all().delete()
+        RollupWatermark.objects.all().delete()
+
+    # (field_id, weekday, start_time) -> {"sport", "booking_count", "match_count"}
+    deltas = defaultdict(lambda: {"booking_count": 0, "match_count": 0})
+    processed = {}
+    for source, (model, date_column, counter, condition) in ROLLUP_SOURCES.items():
+        # Dikunci agar dua rollup bersamaan tidak menghitung baris yang sama dua kali
+        watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(source=source)
+        # Watermark maju melewati semua baris (juga yang tidak dihitung, mis. match Cancelled),
+        # agar adjust_rollup tahu baris itu sudah dilihat jika nanti diaktifkan lagi
+        rows = model.objects.filter(created_at__lte=cutoff)
+        if watermark.last_created_at:
+            rows = rows.filter(
+                Q(created_at__gt=watermark.last_created_at)
+                | Q(created_at=watermark.last_created_at, id__gt=watermark.last_id)
+            )
+
+        last = rows.order_by("-created_at", "-id").values_list("created_at", "id").first()
+        processed[source] = 0
+        if last is None:
+            continue
+        rows = rows.filter(Q(created_at__lt=last[0]) | Q(created_at=last[0], id__lte=last[1]))
+
+        groups = rows.filter(condition).annotate(weekday=ExtractIsoWeekDay(date_column)).values(
+            "field_id", "field__sport", "weekday", "start_time"
+        ).annotate(count=Count("id")).order_by()
+        for group in groups:
+            delta = deltas[(group["field_id"], group["weekday"] - 1, group["start_time"])]
+            delta["sport"] = group["field__sport"]
+            delta[counter] += group["count"]
+            processed[source] += group["count"]
+
+        watermark.last_created_at, watermark.last_id = last
+        watermark.save()
+
+    if deltas:
+        existing = {
+            (rollup.field_id, rollup.weekday, rollup.start_time): rollup
+            for rollup in OccupancyRollup.objects.filter(field_id__in={key[0] for key in deltas})
+        }
+        to_create, to_update = [], []
+        for (field_id, weekday, start_time), delta in deltas.items():
+            rollup = existing.get((field_id, weekday, start_time))
+            if rollup is None:
+                to_create.append(OccupancyRollup(field_id=field_id, weekday=weekday, start_time=start_time, **delta))
+            else:
+                rollup.sport = delta["sport"]
+                rollup.booking_count += delta["booking_count"]
+                rollup.match_count += delta["match_count"]
+                to_update.append(rollup)
+        OccupancyRollup.objects.bulk_create(to_create, batch_size=1000)
+        OccupancyRollup.objects.bulk_update(to_update, ["sport", "booking_count", "match_count"], batch_size=1000)
+    return processed
+
+
+# Kolom yang menentukan key rollup satu baris (Booking tidak punya status)
+ROLLUP_KEY_COLUMNS = {
+    Booking: ("field_id", "booking_date", "start_time"),
+    Match: ("field_id", "match_date", "start_time", "status"),
+}
+
+
+def rollup_key(model, field_id, date, start_time, status=None):
+    """
+    (field_id, tanggal, jam mulai) yang dihitung rollup untuk satu baris, atau None jika
+    baris itu tidak dihitung (match Cancelled).
+    """
+    if model is Match and status == "Cancelled":
+        return None
+    return field_id, date, start_time
+
+
+def instance_rollup_key(instance):
+    model = type(instance)
+    return rollup_key(model, *(getattr(instance, column) for column in ROLLUP_KEY_COLUMNS[model]))
+
+
+def stored_rollup_key(model, pk):
+    """
+    Key rollup baris seperti yang tersimpan di database (sebelum save), atau None.
+    """
+    values = model.objects.filter(pk=pk).values_list(*ROLLUP_KEY_COLUMNS[model]).first()
+    return rollup_key(model, *values) if values else None
+
+
+@transaction.atomic
+def adjust_rollup(instance, previous, current):
+    """
+    Koreksi OccupancyRollup untuk baris yang sudah masuk rollup lalu dibatalkan, dipindah
+    jadwalnya atau dihapus (termasuk cascade dari field): kurangi counter di key lama,
+    tambah di key baru. previous/current dari rollup_key (None = tidak dihitung).
+    Watermark dikunci seperti di rollup_occupancy, jadi koreksi dan rollup yang bersamaan
+    tidak saling melewatkan baris. Baris yang belum di-rollup tidak perlu dikoreksi.
+    """
+    if previous == current:
+        return
+    model = type(instance)
+    source = ROLLUP_SOURCE_BY_MODEL[model]
+    watermark = RollupWatermark.objects.select_for_update().filter(source=source).first()
+    if (
+        watermark is None or watermark.last_created_at is None
+        or (instance.created_at, instance.pk) > (watermark.last_created_at, watermark.last_id)
+    ):
+        return
+
+    counter = ROLLUP_SOURCES[source][2]
+    if previous:
+        field_id, date, start_time = previous
+        OccupancyRollup.objects.filter(
+            field_id=field_id, weekday=date.weekday(), start_time=start_time, **{f"{counter}__gt": 0}
+        ).update(**{counter: F(counter) - 1})
+    if current:
+        field_id, date, start_time = current
+        updated = OccupancyRollup.objects.filter(
+            field_id=field_id, weekday=date.weekday(), start_time=start_time
+        ).update(**{counter: F(counter) + 1})
+        if not updated:
+            sport = Field.objects.filter(pk=field_id).values_list("sport", flat=True).first()
+            if sport is not None:
+                OccupancyRollup.objects.create(
+                    field_id=field_id, weekday=date.weekday(), start_time=start_time, sport=sport, **{counter: 1}
+                )
+
+
+def occupancy_report(sport=None, limit=ROLLUP_REPORT_LIMIT):
+    """
+    Laporan utilisasi yang hanya membaca OccupancyRollup (+ nama field), tidak menyentuh
+    tabel Booking/Match:
+    - by_field: field paling jarang dipakai dulu (termasuk yang belum pernah dipakai)
+    - by_slot: total per weekday x jam mulai
+    - by_sport: total per sport
+    """
+    rollups = OccupancyRollup.objects.all()
+    fields = Field.objects.all()
+    if sport:
+        rollups = rollups.filter(sport=sport)
+        fields = fields.filter(sport=sport)
+
+    by_field = fields.annotate(
+        booking_total=Coalesce(Sum("occupancy_rollups__booking_count"), 0),
+        match_total=Coalesce(Sum("occupancy_rollups__match_count"), 0),
+    ).annotate(total=F("booking_total") + F("match_total")).order_by("total", "name", "id").values(
+        "id", "name", "sport", "booking_total", "match_total", "total"
+    )[:limit]
+
+    totals = {"booking_total": Sum("booking_count"), "match_total": Sum("match_count")}
+    by_slot = rollups.values("weekday", "start_time").annotate(**totals).order_by("weekday", "start_time")
+    by_sport = rollups.values("sport").annotate(**totals).order_by("sport")
+    weekday_names = dict(OpeningHours.WEEKDAY_CHOICES)
+
+    return {
+        "updated_through": {
+            source: last_created_at.isoformat() if last_created_at else None
+            for source, last_created_at in RollupWatermark.objects.values_list("source", "last_created_at")
+        },
+        "by_field": list(by_field),
+        "by_slot": [
+            {
+                **row, "weekday_name": weekday_names[row["weekday"]],
+                "start_time": row["start_time"].strftime("%H:%M"), "total": row["booking_total"] + row["match_total"],
+            }
+            for row in by_slot
+        ],
+        "by_sport": [{**row, "total": row["booking_total"] + row["match_total"]} for row in by_sport],
+    }
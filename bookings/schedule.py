@@ -0,0 +1,134 @@
+import datetime
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from bookings.models import BlackoutDate, FieldSchedule, OpeningHours
+
+# Field tanpa FieldSchedule: buka setiap hari 10:00-14:00, slot 1 jam (jadwal lama)
+DEFAULT_OPEN_TIME = datetime.time(10, 0)
+DEFAULT_CLOSE_TIME = datetime.time(14, 0)
+DEFAULT_SLOT_MINUTES = 60
+
+SCHEDULE_CACHE_KEY = "bookings:schedule:{field_id}"
+# Di-invalidate oleh signal setiap jadwal ditulis; timeout hanya jaring pengaman
+SCHEDULE_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def slot_label(start, end):
+    return f"{start.strftime('%H:%M')}-{end.strftime('%H:%M')}"
+
+
+def build_grid(open_time, close_time, slot_minutes):
+    """
+    Slot [(start, end), ...] dari jam buka sampai jam tutup. close_time <= open_time
+    dianggap tutup tengah malam; sisa waktu yang kurang dari satu slot diabaikan.
+    """
+    start = open_time.hour * 60 + open_time.minute
+    close = close_time.hour * 60 + close_time.minute
+    if close <= start:
+        close = 24 * 60
+
+    grid = []
+    while start + slot_minutes <= close:
+        end = start + slot_minutes
+        grid.append((
+            datetime.time(start // 60, start % 60),
+            datetime.time((end // 60) % 24, end % 60),
+        ))
+        start = end
+    return tuple(grid)
+
+
+def compile_schedules(field_ids):
+    """
+    Kompilasi jadwal banyak field sekaligus (tiga query, berapa pun jumlah field) menjadi
+    {field_id: {"slot_minutes", "grids", "slots", "blackouts"}}:
+    - grids: {weekday: ((start, end), ...)}
+    - slots: {weekday: {"HH:MM-HH:MM": (start, end)}} untuk validasi O(1)
+    - blackouts: frozenset tanggal tutup mulai hari ini
+    """
+    slot_minutes = dict(FieldSchedule.objects.filter(field_id__in=field_ids).values_list("field_id", "slot_minutes"))
+    hours = defaultdict(dict)
+    for field_id, weekday, open_time, close_time in OpeningHours.objects.filter(
+        schedule__field_id__in=field_ids
+    ).values_list("schedule__field_id", "weekday", "open_time", "close_time"):
+        hours[field_id][weekday] = (open_time, close_time)
+    blackouts = defaultdict(set)
+    for field_id, date in BlackoutDate.objects.filter(
+        field_id__in=field_ids, date__gte=timezone.now().date()
+    ).values_list("field_id", "date"):
+        blackouts[field_id].add(date)
+
+    default_grid = build_grid(DEFAULT_OPEN_TIME, DEFAULT_CLOSE_TIME, DEFAULT_SLOT_MINUTES)
+    compiled = {}
+    for field_id in field_ids:
+        if field_id in slot_minutes:
+            length = slot_minutes[field_id]
+            # Hari tanpa OpeningHours berarti tutup
+            grids = {
+                weekday: build_grid(open_time, close_time, length)
+                for weekday, (open_time, close_time) in hours[field_id].items()
+            }
+        else:
+            length = DEFAULT_SLOT_MINUTES
+            grids = dict.fromkeys(range(7), default_grid)
+        compiled[field_id] = {
+            "slot_minutes": length,
+            "grids": grids,
+            "slots": {
+                weekday: {slot_label(start, end): (start, end) for start, end in grid}
+                for weekday, grid in grids.items()
+            },
+            "blackouts": frozenset(blackouts[field_id]),
+        }
+    return compiled
+
+
+def get_schedules(field_ids):
+    """
+    Jadwal terkompilasi untuk banyak field: satu round trip cache, kompilasi hanya untuk yang miss.
+    """
+    keys = {SCHEDULE_CACHE_KEY.format(field_id=field_id): field_id for field_id in field_ids}
+    cached = cache.get_many(keys)
+    schedules = {keys[key]: schedule for key, schedule in cached.items()}
+
+    missing = [field_id for field_id in field_ids if field_id not in schedules]
+    if missing:
+        compiled = compile_schedules(missing)
+        cache.set_many(
+            {SCHEDULE_CACHE_KEY.format(field_id=field_id): schedule for field_id, schedule in compiled.items()},
+            SCHEDULE_CACHE_TIMEOUT,
+        )
+        schedules.update(compiled)
+    return schedules
+
+
+def get_schedule(field_id):
+    return get_schedules([field_id])[field_id]
+
+
+def invalidate_schedule(field_id):
+    cache.delete(SCHEDULE_CACHE_KEY.format(field_id=field_id))
+
+
+def slot_grid(field_id, date, schedule=None):
+    """
+    Slot yang bisa dipesan untuk satu field pada satu tanggal (kosong jika tutup).
+    """
+    schedule = schedule or get_schedule(field_id)
+    if date in schedule["blackouts"]:
+        return ()
+    return schedule["grids"].get(date.weekday(), ())
+
+
+def resolve_slot(field_id, date, label):
+    """
+    (start, end) untuk label "HH:MM-HH:MM" (atau "HH.MM-HH.MM") jika ada di grid
+    field pada tanggal tsb, selain itu None. Hanya lookup dict, tanpa strptime.
+    """
+    schedule = get_schedule(field_id)
+    if date in schedule["blackouts"]:
+        return None
+    return schedule["slots"].get(date.weekday(), {}).get(str(label).replace(".", ":"))
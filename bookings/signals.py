@@ -0,0 +1,141 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from bookings.availability import refresh_occupancy
+from bookings.calendar import invalidate_calendars
+from bookings.models import BlackoutDate, Booking, BookingHold, FieldSchedule, OpeningHours
+from bookings.reservations import check_slot_free, sync_slot_claim
+from bookings.rollups import adjust_rollup, instance_rollup_key, stored_rollup_key
+from bookings.schedule import invalidate_schedule
+from matches.models import Match, MatchPlayer
+
+# Kolom (field, tanggal) per model, untuk menemukan hari yang okupansinya berubah
+SLOT_DAY_COLUMNS = {
+    Booking: ("field_id", "booking_date"),
+    Match: ("field_id", "match_date"),
+    BookingHold: ("field_id", "date"),
+}
+
+
+def slot_day(instance):
+    field_column, date_column = SLOT_DAY_COLUMNS[type(instance)]
+    return getattr(instance, field_column), getattr(instance, date_column)
+
+
+@receiver(pre_save, sender=Booking)
+@receiver(pre_save, sender=Match)
+@receiver(pre_save, sender=BookingHold)
+def remember_previous_slot_day(sender, instance, raw=False, **kwargs):
+    # Jika booking/match dipindah ke hari atau field lain, hari lama juga perlu di-refresh
+    instance._previous_slot_day = None
+    if instance.pk and not raw:
+        instance._previous_slot_day = (
+            sender.objects.filter(pk=instance.pk).values_list(*SLOT_DAY_COLUMNS[sender]).first()
+        )
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_save, sender=Match)
+@receiver(post_save, sender=BookingHold)
+def refresh_occupancy_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    current = slot_day(instance)
+    refresh_occupancy(*current)
+    previous = getattr(instance, "_previous_slot_day", None)
+    if previous and previous != current:
+        refresh_occupancy(*previous)
+
+
+@receiver(pre_save, sender=Booking)
+@receiver(pre_save, sender=Match)
+def check_slot_claim_on_save(sender, instance, raw=False, **kwargs):
+    # Pindah jadwal ke slot yang sudah diklaim -> ValidationError sebelum baris ditulis
+    if raw or getattr(instance, "_slot_claimed", False):
+        return
+    check_slot_free(instance)
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_save, sender=Match)
+def sync_slot_claim_on_save(sender, instance, raw=False, **kwargs):
+    # Reservasi lewat bookings/reservations.py sudah membuat klaimnya sendiri
+    if raw:
+        return
+    if getattr(instance, "_slot_claimed", False):
+        instance._slot_claimed = False
+        return
+    sync_slot_claim(instance)
+
+
+@receiver(post_delete, sender=Booking)
+@receiver(post_delete, sender=Match)
+@receiver(post_delete, sender=BookingHold)
+def refresh_occupancy_on_delete(sender, instance, **kwargs):
+    refresh_occupancy(*slot_day(instance))
+
+
+# ===== ROLLUP OKUPANSI =====
+
+@receiver(pre_save, sender=Booking)
+@receiver(pre_save, sender=Match)
+def remember_previous_rollup_key(sender, instance, raw=False, **kwargs):
+    instance._previous_rollup_key = None
+    if instance.pk and not raw:
+        instance._previous_rollup_key = stored_rollup_key(sender, instance.pk)
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_save, sender=Match)
+def adjust_rollup_on_save(sender, instance, created=False, raw=False, **kwargs):
+    # Baris baru belum pernah di-rollup; yang lama dikoreksi jika dibatalkan/dipindah
+    if created or raw:
+        return
+    adjust_rollup(instance, getattr(instance, "_previous_rollup_key", None), instance_rollup_key(instance))
+
+
+@receiver(post_delete, sender=Booking)
+@receiver(post_delete, sender=Match)
+def adjust_rollup_on_delete(sender, instance, **kwargs):
+    adjust_rollup(instance, instance_rollup_key(instance), None)
+
+
+# ===== JADWAL FIELD =====
+
+@receiver(post_save, sender=FieldSchedule)
+@receiver(post_delete, sender=FieldSchedule)
+@receiver(post_save, sender=BlackoutDate)
+@receiver(post_delete, sender=BlackoutDate)
+def invalidate_schedule_on_write(sender, instance, **kwargs):
+    invalidate_schedule(instance.field_id)
+
+
+@receiver(post_save, sender=OpeningHours)
+@receiver(post_delete, sender=OpeningHours)
+def invalidate_schedule_on_hours_write(sender, instance, **kwargs):
+    # Jika jadwalnya ikut terhapus, signal FieldSchedule sendiri yang meng-invalidate
+    field_id = FieldSchedule.objects.filter(pk=instance.schedule_id).values_list("field_id", flat=True).first()
+    if field_id:
+        invalidate_schedule(field_id)
+
+
+# ===== FEED KALENDER =====
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+@receiver(post_save, sender=MatchPlayer)
+@receiver(post_delete, sender=MatchPlayer)
+def invalidate_calendar_on_write(sender, instance, **kwargs):
+    # Setelah commit: poll yang masuk sebelum commit akan meng-cache feed lama selama 24 jam
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_calendars([user_id]))
+
+
+@receiver(post_save, sender=Match)
+def invalidate_player_calendars_on_match_save(sender, instance, created=False, raw=False, **kwargs):
+    # Jadwal/status match berubah -> feed semua pemainnya ikut berubah
+    if created or raw:
+        return
+    user_ids = list(MatchPlayer.objects.filter(match=instance).values_list("user_id", flat=True))
+    transaction.on_commit(lambda: invalidate_calendars(user_ids))
@@ -0,0 +1,27 @@
+"""
+Helper data uji bersama untuk bookings/tests.py dan matches/tests.py.
+"""
+import datetime
+
+from fields.models import Field
+from matches.models import Match, MatchPlayer
+
+
+def make_field(name="Lapangan A"):
+    return Field.objects.create(
+        name=name, image="img.jpg", price=100000, rating=4.0,
+        location="Jakarta", sport="futsal", url=f"https://example.com/{name}",
+    )
+
+
+def make_match(user, field, date, hour, max_players=10, status="Pending"):
+    """
+    Match satu jam mulai pukul `hour`; organizer langsung tercatat sebagai pemain.
+    """
+    match = Match.objects.create(
+        organizer=user, field=field, match_date=date,
+        start_time=datetime.time(hour, 0), end_time=datetime.time(hour + 1, 0),
+        max_players=max_players, status=status,
+    )
+    MatchPlayer.objects.create(match=match, user=user)
+    return match
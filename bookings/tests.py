@@ -1,3 +1,838 @@
-from django.test import TestCase
+import datetime
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings.calendar import calendar_token, fold
+from bookings.availability import get_availability, get_day_slots, time_mask
+from bookings.models import (
+    BlackoutDate, Booking, BookingHold, FieldSchedule, OccupancyRollup, OpeningHours, RollupWatermark, SlotClaim,
+    SlotOccupancy,
+)
+from bookings.history import get_page, past_bookings, upcoming_bookings
+from bookings.holds import HOLD_TTL, HoldExpired, confirm_hold, expire_holds, place_hold
+from bookings.recurring import book_recurring, recurring_dates
+from bookings.reservations import SlotUnavailable, reserve_booking, reserve_match
+from bookings.rollups import ROLLUP_LAG, occupancy_report, rollup_occupancy
+from bookings.schedule import build_grid, get_schedule, get_schedules, resolve_slot, slot_grid
+from bookings.testing import make_field, make_match
+from fields.models import Field, FieldStats
+from fields.stats import get_catalog_stats
+from matches.models import Match, MatchPlayer
+
+
+def book(user, field, date, hour):
+    return Booking.objects.create(
+        user=user, field=field, booking_date=date,
+        start_time=datetime.time(hour, 0), end_time=datetime.time(hour + 1, 0),
+    )
+
+
+def statuses(slots):
+    return [slot["status"] for slot in slots]
+
+
+class AvailabilityEngineTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="user", password="password123")
+        self.field = make_field()
+        self.day = timezone.now().date() + datetime.timedelta(days=2)
+
+    def test_time_mask(self):
+        self.assertEqual(time_mask(datetime.time(10, 0), datetime.time(11, 0)), 0b11 << 20)
+        self.assertEqual(time_mask(datetime.time(10, 30), datetime.time(11, 15)), 0b11 << 21)
+        self.assertEqual(time_mask(datetime.time(23, 30), datetime.time(0, 0)), 1 << 47)
+
+    def test_bitmap_follows_booking_and_match_writes(self):
+        booking = book(self.user, self.field, self.day, 10)
+        match = make_match(self.user, self.field, self.day, 12)
+        self.assertEqual(
+            statuses(get_day_slots(self.field.id, self.day)),
+            ["booked", "available", "match_created", "available"],
+        )
+
+        # Match dibatalkan -> slot kembali tersedia
+        match.status = "Cancelled"
+        match.save()
+        # Booking dipindah ke hari lain -> hari lama ikut diperbarui
+        booking.booking_date = self.day + datetime.timedelta(days=1)
+        booking.save()
+
+        self.assertEqual(statuses(get_day_slots(self.field.id, self.day)), ["available"] * 4)
+        self.assertFalse(SlotOccupancy.objects.filter(field=self.field, date=self.day).exists())
+        self.assertEqual(statuses(get_day_slots(self.field.id, booking.booking_date))[0], "booked")
+
+        booking.delete()
+        self.assertFalse(SlotOccupancy.objects.exists())
+
+    def test_past_slots(self):
+        yesterday = timezone.now().date() - datetime.timedelta(days=1)
+        self.assertEqual(statuses(get_day_slots(self.field.id, yesterday)), ["past"] * 4)
+
+    def test_many_fields_and_days(self):
+        other = make_field("Lapangan B")
+        book(self.user, other, self.day, 13)
+        availability = get_availability([self.field.id, other.id], self.day, self.day + datetime.timedelta(days=1))
+        self.assertEqual(len(availability[self.field.id]), 2)
+        self.assertEqual(statuses(availability[other.id][self.day]), ["available"] * 3 + ["booked"])
+
+    def test_field_delete_cleans_up(self):
+        book(self.user, self.field, self.day, 10)
+        make_match(self.user, self.field, self.day, 11)
+        self.field.delete()
+        self.assertFalse(SlotOccupancy.objects.exists())
+
+    def test_rebuild_command(self):
+        book(self.user, self.field, self.day, 10)
+        SlotOccupancy.objects.all().delete()
+        call_command("rebuild_slot_occupancy", stdout=StringIO())
+        self.assertEqual(statuses(get_day_slots(self.field.id, self.day))[0], "booked")
+
+
+class SlotEndpointsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="user", password="password123")
+        self.field = make_field()
+        self.day = timezone.now().date() + datetime.timedelta(days=2)
+        book(self.user, self.field, self.day, 11)
+        make_match(self.user, self.field, self.day, 13)
+
+    def test_both_endpoints_share_engine(self):
+        expected = ["available", "booked", "available", "match_created"]
+        get_schedule(self.field.id)
+        for url in (
+            reverse("bookings:get_slots_ajax", args=[self.field.id]),
+            reverse("matches:get_match_slots_ajax", args=[self.field.id]),
+        ):
+            # Cek field + satu lookup bitmap (grid dari cache jadwal)
+            with self.assertNumQueries(2):
+                response = self.client.get(url, {"date": self.day.isoformat()})
+            self.assertEqual(statuses(response.json()["slots"]), expected)
+            self.assertEqual(response.json()["slots"][0], {"start": "10:00", "end": "11:00", "status": "available"})
+
+    def test_booking_window(self):
+        too_far = timezone.now().date() + datetime.timedelta(days=31)
+        response = self.client.get(
+            reverse("bookings:get_slots_ajax", args=[self.field.id]), {"date": too_far.isoformat()}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class AvailabilityMatrixTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="user", password="password123")
+        self.fields = [make_field("Lapangan A"), make_field("Lapangan B")]
+        self.today = timezone.now().date()
+        self.day = self.today + datetime.timedelta(days=2)
+        book(self.user, self.fields[0], self.day, 10)
+        make_match(self.user, self.fields[1], self.day, 12)
+        self.url = reverse("bookings:availability_ajax")
+
+    def get(self, **params):
+        params.setdefault("field_ids", ",".join(str(field.id) for field in self.fields))
+        return self.client.get(self.url, params)
+
+    def test_matrix_for_whole_window(self):
+        # validasi field + satu query okupansi untuk seluruh matriks (jadwal dari cache)
+        get_schedules([field.id for field in self.fields])
+        with self.assertNumQueries(2):
+            response = self.get()
+        data = response.json()
+        self.assertEqual(len(data["days"]), 31)
+        self.assertEqual(data["to"], (self.today + datetime.timedelta(days=30)).isoformat())
+        first, second = (data["fields"][str(field.id)] for field in self.fields)
+        self.assertEqual(first[self.day.isoformat()][0], {"start": "10:00", "end": "11:00", "status": "booked"})
+        self.assertEqual(statuses(first[self.day.isoformat()]), ["booked", "available", "available", "available"])
+        self.assertEqual(statuses(second[self.day.isoformat()]), ["available", "available", "match_created", "available"])
+
+    def test_compact_encoding(self):
+        response = self.get(**{"from": self.day.isoformat(), "to": (self.day + datetime.timedelta(days=1)).isoformat(), "encoding": "compact"})
+        data = response.json()
+        self.assertEqual(data["fields"][str(self.fields[0].id)]["days"], ["1000", "0000"])
+        self.assertEqual(data["fields"][str(self.fields[1].id)]["days"], ["0020", "0000"])
+        self.assertEqual(data["fields"][str(self.fields[0].id)]["grid"]["0"][0], "10:00-11:00")
+        self.assertEqual(data["codes"]["2"], "match_created")
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.get(field_ids="").status_code, 400)
+        self.assertEqual(self.get(field_ids="a,b").status_code, 400)
+        self.assertEqual(self.get(**{"to": (self.today + datetime.timedelta(days=31)).isoformat()}).status_code, 400)
+        self.assertEqual(self.get(**{"from": self.day.isoformat(), "to": self.today.isoformat()}).status_code, 400)
+        self.assertEqual(self.get(field_ids="999999").status_code, 404)
+
+
+class SlotClaimTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="user", password="password123")
+        self.field = make_field()
+        self.day = timezone.now().date() + datetime.timedelta(days=2)
+        self.client.login(username="user", password="password123")
+
+    def test_booking_and_match_share_slot_key(self):
+        reserve_booking(self.user, self.field, self.day, datetime.time(10, 0), datetime.time(11, 0))
+        with self.assertRaises(SlotUnavailable) as raised:
+            reserve_match(self.user, self.field, self.day, datetime.time(10, 0), datetime.time(11, 0), max_players=10)
+        self.assertEqual(raised.exception.taken_by, "booking")
+        self.assertEqual(Match.objects.count(), 0)
+
+        match = reserve_match(self.user, self.field, self.day, datetime.time(11, 0), datetime.time(12, 0), max_players=10)
+        self.assertEqual(match.matchplayer_set.count(), 1)
+        with self.assertRaises(SlotUnavailable) as raised:
+            reserve_booking(self.user, self.field, self.day, datetime.time(11, 0), datetime.time(12, 0))
+        self.assertEqual(raised.exception.taken_by, "match")
+
+    def test_cancelled_match_releases_slot(self):
+        match = reserve_match(self.user, self.field, self.day, datetime.time(10, 0), datetime.time(11, 0), max_players=10)
+        match.status = "Cancelled"
+        match.save()
+        self.assertFalse(SlotClaim.objects.exists())
+        reserve_booking(self.user, self.field, self.day, datetime.time(10, 0), datetime.time(11, 0))
+
+    def test_direct_writes_keep_claims(self):
+        booking = book(self.user, self.field, self.day, 10)
+        self.assertEqual(
+            list(booking.slot_claims.values_list("start_time", flat=True)), [datetime.time(10, 0), datetime.time(10, 30)]
+        )
+        booking.booking_date = self.day + datetime.timedelta(days=1)
+        booking.save()
+        self.assertEqual(set(SlotClaim.objects.values_list("date", flat=True)), {booking.booking_date})
+        booking.delete()
+        self.assertFalse(SlotClaim.objects.exists())
+
+    def test_overlapping_slots_conflict(self):
+        # Grid berbeda (mis. slot_minutes diubah): 10:00-11:30 dan 10:30-11:30 tumpang tindih
+        reserve_booking(self.user, self.field, self.day, datetime.time(10, 0), datetime.time(11, 30))
+        with self.assertRaises(SlotUnavailable) as raised:
+            reserve_match(self.user, self.field, self.day, datetime.time(10, 30), datetime.time(11, 30), max_players=10)
+        self.assertEqual(raised.exception.taken_by, "booking")
+        with self.assertRaises(SlotUnavailable):
+            reserve_booking(self.user, self.field, self.day, datetime.time(9, 0), datetime.time(10, 30))
+        reserve_booking(self.user, self.field, self.day, datetime.time(11, 30), datetime.time(12, 30))
+        self.assertEqual(SlotClaim.objects.count(), 5)
+
+    def test_moving_onto_claimed_slot_is_a_validation_error(self):
+        book(self.user, self.field, self.day, 10)
+        match = make_match(self.user, self.field, self.day, 12)
+        match.start_time, match.end_time = datetime.time(10, 30), datetime.time(11, 30)
+        with self.assertRaises(ValidationError):
+            match.save()
+        match.refresh_from_db()
+        self.assertEqual(match.start_time, datetime.time(12, 0))
+        self.assertEqual(SlotClaim.objects.filter(match=match).count(), 2)
+
+    def test_views_report_taken_slot(self):
+        book(self.user, self.field, self.day, 10)
+        response = self.client.post(
+            reverse("bookings:show_book", args=[self.field.id]),
+            {"booking_date": self.day.isoformat(), "time_slot": "10:00-11:00"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "this time slot was just booked")
+        self.assertEqual(Booking.objects.count(), 1)
+
+        response = self.client.post(reverse("matches:show_create_match"), {
+            "field": self.field.id, "match_date": self.day.isoformat(), "time_slot": "10:00-11:00",
+            "skill_level": "All Levels", "max_players": 10, "price_per_person": "0",
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Match.objects.count(), 0)
+
+
+# Session di cookie agar satu-satunya tulisan ke DB per request adalah reservasinya
+@override_settings(SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies")
+class SlotClaimLoadTest(TransactionTestCase):
+    """
+    Banyak request bersamaan untuk slot yang sama: tepat satu yang berhasil,
+    sisanya mendapat pesan slot terisi (tanpa 500 dan tanpa double booking).
+    """
+    CLAIMS = 200
+    WORKERS = 16
+
+    def test_concurrent_claims_on_one_slot(self):
+        cache.clear()
+        field = make_field()
+        day = timezone.now().date() + datetime.timedelta(days=3)
+        users = User.objects.bulk_create([User(username=f"user{index}") for index in range(self.CLAIMS)])
+        url = reverse("bookings:show_book", args=[field.id])
+        match_url = reverse("matches:show_create_match")
+        barrier = threading.Barrier(self.WORKERS)
+
+        def post(index):
+            client = Client()
+            client.force_login(users[index])
+            if index % 2:
+                return client.post(url, {"booking_date": day.isoformat(), "time_slot": "12:00-13:00"}).status_code
+            return client.post(match_url, {
+                "field": field.id, "match_date": day.isoformat(), "time_slot": "12:00-13:00",
+                "skill_level": "All Levels", "max_players": 10, "price_per_person": "0",
+            }).status_code
+
+        def claim(index):
+            if index < self.WORKERS:
+                barrier.wait()
+            try:
+                return post(index)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as executor:
+            codes = list(executor.map(claim, range(self.CLAIMS)))
+
+        self.assertNotIn(500, codes)
+        self.assertEqual(codes.count(302), 1)
+        # Booking lewat web menahan slot dulu (BookingHold) sebelum checkout
+        self.assertEqual(
+            BookingHold.objects.filter(field=field, date=day).count()
+            + Match.objects.filter(field=field, match_date=day).count(),
+            1,
+        )
+        self.assertEqual(SlotClaim.objects.filter(field=field, date=day).count(), 2)
+
+
+class FieldScheduleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="user", password="password123")
+        self.field = make_field()
+        self.client.login(username="user", password="password123")
+        # Cari hari Sabtu berikutnya agar jam per weekday bisa diuji
+        today = timezone.now().date()
+        self.saturday = today + datetime.timedelta(days=(5 - today.weekday()) % 7 or 7)
+        self.sunday = self.saturday + datetime.timedelta(days=1)
+
+        schedule = FieldSchedule.objects.create(field=self.field, slot_minutes=90)
+        OpeningHours.objects.create(schedule=schedule, weekday=5, open_time=datetime.time(8, 0), close_time=datetime.time(13, 0))
+
+    def test_build_grid(self):
+        self.assertEqual(
+            build_grid(datetime.time(8, 0), datetime.time(13, 0), 90),
+            (
+                (datetime.time(8, 0), datetime.time(9, 30)),
+                (datetime.time(9, 30), datetime.time(11, 0)),
+                (datetime.time(11, 0), datetime.time(12, 30)),
+            ),
+        )
+        self.assertEqual(build_grid(datetime.time(22, 0), datetime.time(0, 0), 60)[-1], (datetime.time(23, 0), datetime.time(0, 0)))
+
+    def test_grid_follows_schedule_and_is_cached(self):
+        self.assertEqual(len(slot_grid(self.field.id, self.saturday)), 3)
+        # Minggu tidak punya OpeningHours -> tutup
+        self.assertEqual(slot_grid(self.field.id, self.sunday), ())
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_slot(self.field.id, self.saturday, "09:30-11:00"), (datetime.time(9, 30), datetime.time(11, 0)))
+            self.assertEqual(resolve_slot(self.field.id, self.saturday, "09.30-11.00"), (datetime.time(9, 30), datetime.time(11, 0)))
+            self.assertIsNone(resolve_slot(self.field.id, self.saturday, "10:00-11:00"))
+
+        # Tulis jadwal -> cache di-invalidate
+        BlackoutDate.objects.create(field=self.field, date=self.saturday, reason="Turnamen")
+        self.assertEqual(slot_grid(self.field.id, self.saturday), ())
+
+    def test_default_schedule(self):
+        other = make_field("Lapangan B")
+        self.assertEqual(
+            list(get_schedule(other.id)["slots"][self.sunday.weekday()]),
+            ["10:00-11:00", "11:00-12:00", "12:00-13:00", "13:00-14:00"],
+        )
+
+    def test_slot_endpoint_and_booking_use_grid(self):
+        response = self.client.get(reverse("bookings:get_slots_ajax", args=[self.field.id]), {"date": self.saturday.isoformat()})
+        self.assertEqual([(slot["start"], slot["end"]) for slot in response.json()["slots"]],
+                         [("08:00", "09:30"), ("09:30", "11:00"), ("11:00", "12:30")])
+
+        url = reverse("bookings:show_book", args=[self.field.id])
+        response = self.client.post(url, {"booking_date": self.saturday.isoformat(), "time_slot": "10:00-11:00"})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Booking.objects.exists())
+
+        response = self.client.post(url, {"booking_date": self.saturday.isoformat(), "time_slot": "09:30-11:00"})
+        hold = BookingHold.objects.get()
+        self.assertRedirects(response, reverse("bookings:show_checkout", args=[hold.id]))
+        self.client.post(reverse("bookings:show_checkout", args=[hold.id]), {"action": "confirm"})
+        booking = Booking.objects.get()
+        self.assertEqual((booking.start_time, booking.end_time), (datetime.time(9, 30), datetime.time(11, 0)))
+
+    def test_match_form_rejects_closed_day(self):
+        response = self.client.post(reverse("matches:show_create_match"), {
+            "field": self.field.id, "match_date": self.sunday.isoformat(), "time_slot": "10:00-11:00",
+            "skill_level": "All Levels", "max_players": 10, "price_per_person": "0",
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "This time slot is not available for the selected date.")
+        self.assertEqual(Match.objects.count(), 0)
+
+
+class BookingHistoryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="user", password="password123")
+        self.client.login(username="user", password="password123")
+        self.fields = [make_field(f"Lapangan {index}") for index in range(3)]
+        self.today = timezone.now().date()
+        # 3 upcoming + 25 past (beberapa di tanggal yang sama agar keyset diuji pada end_time & id)
+        for offset in range(1, 4):
+            book(self.user, self.fields[0], self.today + datetime.timedelta(days=offset), 10)
+        for offset in range(1, 10):
+            for index, field in enumerate(self.fields):
+                if offset * 3 + index <= 27:
+                    book(self.user, field, self.today - datetime.timedelta(days=offset), 10 + index % 2)
+
+    def test_split_at_end_time(self):
+        now = timezone.make_aware(datetime.datetime.combine(self.today, datetime.time(11, 0)))
+        booking = book(self.user, self.fields[1], self.today, 10)
+        self.assertIn(booking, upcoming_bookings(self.user, now=now))
+        later = now + datetime.timedelta(minutes=1)
+        self.assertNotIn(booking, upcoming_bookings(self.user, now=later))
+        self.assertEqual(past_bookings(self.user, now=later).first(), booking)
+
+    def test_booking_ending_at_midnight(self):
+        booking = Booking.objects.create(
+            user=self.user, field=self.fields[2], booking_date=self.today,
+            start_time=datetime.time(23, 0), end_time=datetime.time(0, 0),
+        )
+        for hour, minute in ((9, 0), (23, 30)):
+            now = timezone.make_aware(datetime.datetime.combine(self.today, datetime.time(hour, minute)))
+            self.assertIn(booking, upcoming_bookings(self.user, now=now))
+            self.assertNotIn(booking, past_bookings(self.user, now=now))
+
+        # Selesai tepat tengah malam: masih upcoming di 00:00, past setelahnya
+        midnight = timezone.make_aware(datetime.datetime.combine(self.today + datetime.timedelta(days=1), datetime.time(0, 0)))
+        self.assertIn(booking, upcoming_bookings(self.user, now=midnight))
+        self.assertNotIn(booking, past_bookings(self.user, now=midnight))
+        later = midnight + datetime.timedelta(minutes=1)
+        self.assertNotIn(booking, upcoming_bookings(self.user, now=later))
+        self.assertIn(booking, past_bookings(self.user, now=later))
+
+    def test_keyset_pages_cover_past_bookings(self):
+        expected = list(past_bookings(self.user).values_list("id", flat=True))
+        self.assertEqual(len(expected), 25)
+
+        seen, cursor = [], None
+        while True:
+            rows, cursor = get_page(past_bookings(self.user), cursor, per_page=10)
+            seen.extend(row.id for row in rows)
+            if not cursor:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_my_bookings_page(self):
+        with self.assertNumQueries(4):  # session, user, upcoming, satu halaman past
+            response = self.client.get(reverse("bookings:show_my_bookings"))
+        self.assertEqual(len(response.context["upcoming_bookings"]), 3)
+        self.assertEqual(len(response.context["past_bookings"]), 20)
+        self.assertContains(response, "Older bookings")
+
+        response = self.client.get(reverse("bookings:show_my_bookings"), {"cursor": response.context["next_cursor"]})
+        self.assertEqual(len(response.context["past_bookings"]), 5)
+        self.assertIsNone(response.context["next_cursor"])
+
+    def test_json_pages(self):
+        url = reverse("bookings:my_bookings_json")
+        data = self.client.get(url, {"per_page": 20}).json()
+        self.assertEqual(len(data["upcoming"]), 3)
+        self.assertEqual(len(data["past"]), 20)
+        self.assertEqual(set(data["past"][0]), {
+            "id", "field_id", "field_name", "field_location", "booking_date", "start_time", "end_time",
+        })
+
+        data = self.client.get(url, {"per_page": 20, "cursor": data["next_cursor"]}).json()
+        self.assertNotIn("upcoming", data)
+        self.assertEqual(len(data["past"]), 5)
+        self.assertIsNone(data["next_cursor"])
+
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+
+class BookingHoldTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="user", password="password123")
+        self.other = User.objects.create_user(username="other", password="password123")
+        self.field = make_field()
+        self.day = timezone.now().date() + datetime.timedelta(days=2)
+        self.slot = (datetime.time(10, 0), datetime.time(11, 0))
+        self.client.login(username="user", password="password123")
+
+    def test_hold_occupies_slot(self):
+        place_hold(self.user, self.field, self.day, *self.slot)
+        self.assertEqual(statuses(get_day_slots(self.field.id, self.day))[0], "held")
+        with self.assertRaises(SlotUnavailable) as raised:
+            reserve_booking(self.other, self.field, self.day, *self.slot)
+        self.assertEqual(raised.exception.taken_by, "hold")
+
+    def test_confirm_turns_hold_into_booking(self):
+        hold = place_hold(self.user, self.field, self.day, *self.slot)
+        with self.assertRaises(HoldExpired):
+            confirm_hold(hold.id, self.other)
+
+        booking = confirm_hold(hold.id, self.user)
+        self.assertFalse(BookingHold.objects.exists())
+        self.assertEqual(
+            list(SlotClaim.objects.values_list("booking_id", "hold_id")), [(booking.id, None), (booking.id, None)]
+        )
+        self.assertEqual(statuses(get_day_slots(self.field.id, self.day))[0], "booked")
+
+        with self.assertRaises(HoldExpired):
+            confirm_hold(hold.id, self.user)
+
+    def test_expired_hold(self):
+        past = timezone.now() - HOLD_TTL - datetime.timedelta(minutes=1)
+        hold = place_hold(self.user, self.field, self.day, *self.slot, now=past)
+        with self.assertRaises(HoldExpired):
+            confirm_hold(hold.id, self.user)
+
+        # Slot bisa langsung diambil user lain tanpa menunggu sweeper
+        reserve_booking(self.other, self.field, self.day, *self.slot)
+        self.assertFalse(BookingHold.objects.exists())
+        self.assertEqual(Booking.objects.get().user, self.other)
+
+    def test_expired_hold_is_available_before_sweep(self):
+        place_hold(self.user, self.field, self.day, *self.slot)
+        # Kedaluwarsa tanpa penulisan yang me-refresh bitmap (sweeper belum berjalan)
+        BookingHold.objects.update(expires_at=timezone.now() - datetime.timedelta(seconds=1))
+        self.assertTrue(SlotOccupancy.objects.get().hold_mask)
+        self.assertEqual(statuses(get_day_slots(self.field.id, self.day))[0], "available")
+        availability = get_availability([self.field.id], self.day, self.day)
+        self.assertEqual(statuses(availability[self.field.id][self.day])[0], "available")
+
+    def test_sweeper_expires_in_batches(self):
+        past = timezone.now() - HOLD_TTL - datetime.timedelta(minutes=1)
+        for hour in (10, 11, 12):
+            place_hold(self.user, self.field, self.day, datetime.time(hour, 0), datetime.time(hour + 1, 0), now=past)
+        place_hold(self.user, self.field, self.day, datetime.time(13, 0), datetime.time(14, 0))
+
+        self.assertEqual(expire_holds(batch_size=2), 3)
+        self.assertEqual(SlotClaim.objects.count(), 2)
+        self.assertEqual(statuses(get_day_slots(self.field.id, self.day)), ["available"] * 3 + ["held"])
+
+        out = StringIO()
+        call_command("expire_booking_holds", stdout=out)
+        self.assertIn("Successfully expired 0 booking holds", out.getvalue())
+
+    def test_checkout_flow(self):
+        response = self.client.post(
+            reverse("bookings:show_book", args=[self.field.id]),
+            {"booking_date": self.day.isoformat(), "time_slot": "10:00-11:00"},
+        )
+        hold = BookingHold.objects.get()
+        checkout_url = reverse("bookings:show_checkout", args=[hold.id])
+        self.assertRedirects(response, checkout_url)
+        self.assertContains(self.client.get(checkout_url), "Confirm Booking")
+
+        response = self.client.post(checkout_url, {"action": "cancel"})
+        self.assertRedirects(response, reverse("bookings:show_book", args=[self.field.id]))
+        self.assertFalse(SlotClaim.objects.exists())
+
+        self.client.post(
+            reverse("bookings:show_book", args=[self.field.id]),
+            {"booking_date": self.day.isoformat(), "time_slot": "10:00-11:00"},
+        )
+        hold = BookingHold.objects.get()
+        response = self.client.post(reverse("bookings:show_checkout", args=[hold.id]), {"action": "confirm"})
+        self.assertRedirects(response, reverse("bookings:show_my_bookings"))
+        self.assertEqual(Booking.objects.get().user, self.user)
+
+
+class RecurringBookingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="user", password="password123")
+        self.field = make_field()
+        self.client.login(username="user", password="password123")
+        today = timezone.now().date()
+        self.first = today + datetime.timedelta(days=(2 - today.weekday()) % 7 or 7)  # Rabu berikutnya
+        self.url = reverse("bookings:recurring_booking_api")
+
+    def post(self, weeks, **overrides):
+        payload = {
+            "field_id": self.field.id, "time_slot": "10:00-11:00", "weekday": 2,
+            "start_date": self.first.isoformat(),
+            "end_date": (self.first + datetime.timedelta(weeks=weeks - 1)).isoformat(),
+            **overrides,
+        }
+        return self.client.post(self.url, json.dumps(payload), content_type="application/json")
+
+    def test_recurring_dates(self):
+        monday = datetime.date(2026, 10, 19)
+        self.assertEqual(
+            recurring_dates(monday, monday + datetime.timedelta(days=20), 2),
+            [datetime.date(2026, 10, 21), datetime.date(2026, 10, 28), datetime.date(2026, 11, 4)],
+        )
+        self.assertEqual(recurring_dates(monday, monday + datetime.timedelta(days=1), 2), [])
+
+    def test_books_free_dates_and_reports_skipped(self):
+        week2, week3 = self.first + datetime.timedelta(weeks=1), self.first + datetime.timedelta(weeks=2)
+        book(self.user, self.field, week2, 10)
+        make_match(self.user, self.field, week3, 10)
+        BlackoutDate.objects.create(field=self.field, date=self.first + datetime.timedelta(weeks=3))
+
+        response = self.post(weeks=6)
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual((data["booked"], data["skipped"]), (3, 3))
+        self.assertEqual(
+            [(result["status"], result.get("reason")) for result in data["results"]],
+            [("booked", None), ("skipped", "taken"), ("skipped", "taken"), ("skipped", "closed"), ("booked", None), ("booked", None)],
+        )
+        self.assertEqual(Booking.objects.filter(user=self.user).count(), 4)
+        # Dua sel 30 menit per slot satu jam
+        self.assertEqual(SlotClaim.objects.count(), 10)
+        self.assertEqual(statuses(get_day_slots(self.field.id, self.first))[0], "booked")
+
+    def test_query_count_is_independent_of_occurrences(self):
+        # session, user, field + satu transaksi: hold kedaluwarsa, cek konflik, 2 insert,
+        # bitmap dalam savepoint (insert + kunci baris + 3 baca + update)
+        get_schedule(self.field.id)
+        with self.assertNumQueries(17):
+            self.post(weeks=4)
+        with self.assertNumQueries(17):
+            self.post(weeks=12, start_date=(self.first + datetime.timedelta(weeks=4)).isoformat(),
+                      end_date=(self.first + datetime.timedelta(weeks=15)).isoformat())
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.post(weeks=2, weekday=9).status_code, 400)
+        self.assertEqual(self.post(weeks=41).status_code, 400)
+        self.assertEqual(self.post(weeks=2, field_id=999999).status_code, 404)
+        self.assertEqual(self.client.post(self.url, "not json", content_type="application/json").status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.post(weeks=2).status_code, 401)
+
+    def test_csrf_exempt_for_api_clients(self):
+        # Klien mobile tidak mengirim token CSRF, sama seperti endpoint matches_flutter
+        client = Client(enforce_csrf_checks=True)
+        client.login(username="user", password="password123")
+        payload = {
+            "field_id": self.field.id, "time_slot": "10:00-11:00", "weekday": 2,
+            "start_date": self.first.isoformat(), "end_date": self.first.isoformat(),
+        }
+        response = client.post(self.url, json.dumps(payload), content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+
+
+class BenchmarkBookingsCommandTest(TransactionTestCase):
+    def test_json_report_and_cleanup(self):
+        cache.clear()
+        out = StringIO()
+        call_command("benchmark_bookings", fields=2, users=3, requests=30, format="json", stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["database"], connection.vendor)
+        self.assertGreaterEqual(report["requests"], 30)
+        self.assertEqual(set(report["operations"]) - {"checkout"}, {"slots", "book", "history"})
+        for key in ("p50_ms", "p95_ms", "p99_ms", "queries_per_request", "status_codes"):
+            self.assertIn(key, report["overall"])
+        self.assertNotIn("500", report["overall"]["status_codes"])
+        # Data seed tidak tertinggal
+        self.assertFalse(Field.objects.exists())
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Booking.objects.exists())
+
+    def test_field_stats_unchanged_by_run(self):
+        cache.clear()
+        make_field("Lapangan Asli")
+        before = get_catalog_stats()
+        call_command("benchmark_bookings", fields=3, users=2, requests=10, stdout=StringIO())
+        self.assertEqual(get_catalog_stats(), before)
+        self.assertEqual(FieldStats.objects.get(sport="futsal").field_count, 1)
+
+    def test_keep_data(self):
+        cache.clear()
+        call_command("benchmark_bookings", fields=2, users=3, requests=10, keep_data=True, stdout=StringIO())
+        self.assertEqual(Field.objects.filter(name__startswith="bench field").count(), 2)
+        self.assertEqual(User.objects.filter(username__startswith="bench-").count(), 3)
+
+    def test_invalid_mix(self):
+        with self.assertRaises(CommandError):
+            call_command("benchmark_bookings", mix="slots=1,unknown=2", stdout=StringIO())
+
+
+class OccupancyRollupTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pw")
+        self.field = make_field()
+        self.idle = make_field("Lapangan Sepi")
+        # Senin depan
+        today = timezone.localdate()
+        self.monday = today + datetime.timedelta(days=7 - today.weekday())
+
+    def later(self):
+        return timezone.now() + ROLLUP_LAG + datetime.timedelta(seconds=1)
+
+    def counts(self):
+        return {
+            (rollup.field_id, rollup.weekday, rollup.start_time.hour): (rollup.booking_count, rollup.match_count)
+            for rollup in OccupancyRollup.objects.all()
+        }
+
+    def test_incremental_rollup_from_watermark(self):
+        book(self.user, self.field, self.monday, 10)
+        make_match(self.user, self.field, self.monday, 11)
+        make_match(self.user, self.field, self.monday, 12, status="Cancelled")
+        self.assertEqual(rollup_occupancy(now=self.later()), {"bookings": 1, "matches": 1})
+        self.assertEqual(self.counts(), {(self.field.id, 0, 10): (1, 0), (self.field.id, 0, 11): (0, 1)})
+
+        # Run berikutnya hanya memproses baris baru, counter ditambahkan
+        book(self.user, self.field, self.monday + datetime.timedelta(days=7), 10)
+        self.assertEqual(rollup_occupancy(now=self.later()), {"bookings": 1, "matches": 0})
+        self.assertEqual(self.counts()[(self.field.id, 0, 10)], (2, 0))
+        self.assertEqual(rollup_occupancy(now=self.later()), {"bookings": 0, "matches": 0})
+
+        watermark = RollupWatermark.objects.get(source="bookings")
+        self.assertEqual(watermark.last_id, Booking.objects.latest("id").id)
+
+    def test_later_changes_correct_rolled_up_rows(self):
+        booking = book(self.user, self.field, self.monday, 10)
+        match = make_match(self.user, self.field, self.monday, 11)
+        cancelled = make_match(self.user, self.field, self.monday, 12, status="Cancelled")
+        rollup_occupancy(now=self.later())
+
+        # Dibatalkan / diaktifkan lagi / dipindah setelah di-rollup
+        match.status = "Cancelled"
+        match.save()
+        cancelled.status = "Pending"
+        cancelled.save()
+        booking.start_time, booking.end_time = datetime.time(13, 0), datetime.time(14, 0)
+        booking.save()
+        self.assertEqual(self.counts(), {
+            (self.field.id, 0, 10): (0, 0), (self.field.id, 0, 11): (0, 0),
+            (self.field.id, 0, 12): (0, 1), (self.field.id, 0, 13): (1, 0),
+        })
+
+        booking.delete()
+        cancelled.delete()
+        self.assertFalse(any(any(counts) for counts in self.counts().values()))
+        # Tidak ada yang dihitung ulang oleh run berikutnya
+        self.assertEqual(rollup_occupancy(now=self.later()), {"bookings": 0, "matches": 0})
+
+    def test_recent_rows_wait_for_lag(self):
+        book(self.user, self.field, self.monday, 10)
+        self.assertEqual(rollup_occupancy(), {"bookings": 0, "matches": 0})
+        self.assertEqual(rollup_occupancy(now=self.later()), {"bookings": 1, "matches": 0})
+
+    def test_full_rebuild(self):
+        book(self.user, self.field, self.monday, 10)
+        rollup_occupancy(now=self.later())
+        rollup_occupancy(now=self.later(), full=True)
+        self.assertEqual(self.counts(), {(self.field.id, 0, 10): (1, 0)})
+
+    def test_report_reads_rollups_only(self):
+        book(self.user, self.field, self.monday, 10)
+        make_match(self.user, self.field, self.monday, 11)
+        rollup_occupancy(now=self.later())
+        with self.assertNumQueries(4):
+            report = occupancy_report()
+        self.assertEqual([row["id"] for row in report["by_field"]], [self.idle.id, self.field.id])
+        self.assertEqual(report["by_field"][1]["total"], 2)
+        self.assertEqual(report["by_slot"], [
+            {"weekday": 0, "weekday_name": "Monday", "start_time": "10:00", "booking_total": 1, "match_total": 0, "total": 1},
+            {"weekday": 0, "weekday_name": "Monday", "start_time": "11:00", "booking_total": 0, "match_total": 1, "total": 1},
+        ])
+        self.assertEqual(report["by_sport"], [{"sport": "futsal", "booking_total": 1, "match_total": 1, "total": 2}])
+        self.assertEqual(occupancy_report(sport="tennis")["by_field"], [])
+
+    def test_command(self):
+        out = StringIO()
+        call_command("rollup_occupancy", stdout=out)
+        self.assertIn("Successfully rolled up 0 bookings and 0 matches", out.getvalue())
+
+
+class CalendarFeedTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="player", password="pw")
+        self.other = User.objects.create_user(username="organizer", password="pw")
+        self.field = make_field()
+        self.date = timezone.localdate() + datetime.timedelta(days=3)
+        self.url = reverse("bookings:calendar_feed", args=[calendar_token(self.user)])
+
+    def get_feed(self, **headers):
+        return Client().get(self.url, **headers)
+
+    def test_feed_contains_bookings_and_joined_matches(self):
+        booking = book(self.user, self.field, self.date, 10)
+        match = make_match(self.other, self.field, self.date, 12)
+        MatchPlayer.objects.create(match=match, user=self.user)
+        book(self.other, self.field, self.date, 11)
+
+        response = self.get_feed()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        body = response.content.decode()
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertIn(f"UID:booking-{booking.id}@", body)
+        self.assertIn(f"UID:match-{match.id}@", body)
+        self.assertIn("STATUS:TENTATIVE", body)
+        self.assertIn(f"DTSTART:{self.date:%Y%m%d}T100000Z", body)
+        self.assertEqual(body.count("BEGIN:VEVENT"), 2)
+
+    def test_repeated_polls_hit_cache_and_etag(self):
+        book(self.user, self.field, self.date, 10)
+        etag = self.get_feed()["ETag"]
+        with self.assertNumQueries(0):
+            response = self.get_feed(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_feed().status_code, 200)
+
+    def test_only_own_writes_invalidate(self):
+        etag = self.get_feed()["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            book(self.other, self.field, self.date, 10)
+        self.assertEqual(self.get_feed(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            match = make_match(self.other, self.field, self.date, 12)
+            MatchPlayer.objects.create(match=match, user=self.user)
+        response = self.get_feed(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        # Match yang diikuti dibatalkan -> feed pemain ikut berubah
+        etag = response["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            match.status = "Cancelled"
+            match.save()
+        response = self.get_feed(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("STATUS:CANCELLED", response.content.decode())
+
+    def test_invalidated_only_after_commit(self):
+        etag = self.get_feed()["ETag"]
+        with self.captureOnCommitCallbacks() as callbacks:
+            book(self.user, self.field, self.date, 10)
+            # Poll sebelum commit masih mendapat feed lama, tapi tidak meng-cache ulang data baru
+            self.assertEqual(self.get_feed(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.get_feed(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_recurring_bookings_invalidate(self):
+        self.assertEqual(self.get_feed().content.decode().count("BEGIN:VEVENT"), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            booked = book_recurring(
+                self.user, self.field, "10:00-11:00", self.date.weekday(), self.date, self.date + datetime.timedelta(weeks=3),
+            )
+        self.assertEqual(len(booked), 4)
+        self.assertEqual(self.get_feed().content.decode().count("BEGIN:VEVENT"), 4)
+
+    def test_invalid_token(self):
+        response = Client().get(reverse("bookings:calendar_feed", args=[f"{self.user.pk}:forged"]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_long_lines_are_folded(self):
+        line = "SUMMARY:" + "é" * 60
+        folded = fold(line)
+        self.assertTrue(all(len(part.encode()) <= 75 for part in folded.rstrip("\r\n").split("\r\n")))
+        self.assertEqual(folded.replace("\r\n ", "").rstrip("\r\n"), line)
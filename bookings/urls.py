@@ -1,11 +1,16 @@
 from django.urls import path
-from bookings.views import get_slots_ajax, show_book, show_booking_detail, show_my_bookings
+from bookings.views import availability_ajax, calendar_feed, get_slots_ajax, my_bookings_json, recurring_booking_api, show_book, show_booking_detail, show_checkout, show_my_bookings
 
 app_name = "bookings"
 
 urlpatterns = [
     path("book/<int:field_id>/", show_book, name="show_book"),
+    path("checkout/<int:hold_id>/", show_checkout, name="show_checkout"),
     path("get_slots/<int:field_id>/", get_slots_ajax, name="get_slots_ajax"),
+    path("availability/", availability_ajax, name="availability_ajax"),
+    path("recurring/", recurring_booking_api, name="recurring_booking_api"),
     path("my_bookings/", show_my_bookings, name="show_my_bookings"),
+    path("my_bookings/json/", my_bookings_json, name="my_bookings_json"),
+    path("calendar/<str:token>.ics", calendar_feed, name="calendar_feed"),
     path("detail/<int:booking_id>/", show_booking_detail, name="show_booking_detail"),
 ]
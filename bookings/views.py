@@ -1,12 +1,26 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from fields.models import Field
-from matches.models import Match
-from .models import Booking
+from .models import Booking, BookingHold
 from .forms import BookingForm
+from .recurring import book_recurring
+from .holds import HoldExpired, confirm_hold, place_hold, release_hold
+from .reservations import SlotUnavailable
+from .schedule import get_schedules
+from .history import (
+    BOOKING_HISTORY_COLUMNS, MAX_PAST_BOOKINGS_PER_PAGE, PAST_BOOKINGS_PER_PAGE,
+    get_page, past_bookings, serialize_booking_rows, upcoming_bookings,
+)
+from .calendar import calendar_token, get_calendar, user_id_from_token
+from .availability import MAX_DAYS_AHEAD, STATUS_CODES, encode_day, get_availability, get_day_slots
 from django.contrib import messages
 import datetime
+import json
 from django.utils import timezone
 
 def get_slots_ajax(request, field_id):
@@ -20,79 +34,135 @@ def get_slots_ajax(request, field_id):
     today = timezone.now().date()
 
     # maximum booking time is one month after today
-    max_date = today + datetime.timedelta(days=30)
+    max_date = today + datetime.timedelta(days=MAX_DAYS_AHEAD)
 
     if booking_date > max_date:
         return JsonResponse({ "error": "Cannot check availability more than 30 days in advance.", "slots": [] }, status=400)
 
     Field.objects.get(pk=field_id)
 
-    # get booked times (unavailable times)
-    booked_times = set(
-        Booking.objects.filter(field_id=field_id, booking_date=booking_date).values_list("start_time", flat=True)
-    )
-
-    match_times = set(
-        Match.objects.filter(
-            field_id=field_id, 
-            match_date=booking_date, 
-            status__in=["Pending", "Confirmed"]
-        ).values_list("start_time", flat=True)
-    )
-    
-    unavailable_times = booked_times.union(match_times)
-
-    slots = [
-        (datetime.time(10, 0), datetime.time(11, 0)),
-        (datetime.time(11, 0), datetime.time(12, 0)),
-        (datetime.time(12, 0), datetime.time(13, 0)),
-        (datetime.time(13, 0), datetime.time(14, 0)),
-    ]
-
-    slots_with_status = []
-    
-    now_time = timezone.localtime(timezone.now()).time()
-
-    for start, end in slots:
-        is_unavailable = start in unavailable_times
-
-        is_booked = start in booked_times
-
-        is_past = (booking_date < today) or (booking_date == today and start < now_time)
+    # slot status from the precomputed occupancy bitmap (one key lookup)
+    return JsonResponse({ "slots": get_day_slots(field_id, booking_date) })
 
-        # assign status based on slot availability
-        status = "available"
+# Batas jumlah field per request matriks availability
+MAX_AVAILABILITY_FIELDS = 50
 
-        if is_past:
-            status = "past"
-        elif is_unavailable:
-            if start in booked_times:
-                status = "booked"
-            else:
-                status = "match_created"
-
-        slots_with_status.append({
-            "start": start.strftime("%H:%M"),
-            "end": end.strftime("%H:%M"),
-            "status": status
-        })
-
-    return JsonResponse({ "slots": slots_with_status })
+def availability_ajax(request):
+    """
+    Matriks status slot untuk banyak field x banyak hari (untuk tampilan kalender).
+    ?field_ids=1,2,3&from=YYYY-MM-DD&to=YYYY-MM-DD[&encoding=compact]
+    """
+    today = timezone.now().date()
+    max_date = today + datetime.timedelta(days=MAX_DAYS_AHEAD)
+
+    try:
+        field_ids = list(dict.fromkeys(int(value) for value in request.GET.get("field_ids", "").split(",") if value))
+        start_date = datetime.date.fromisoformat(request.GET["from"]) if request.GET.get("from") else today
+        end_date = datetime.date.fromisoformat(request.GET["to"]) if request.GET.get("to") else max_date
+    except ValueError:
+        return JsonResponse({ "error": "Invalid field_ids or date (expected YYYY-MM-DD)." }, status=400)
+
+    if not field_ids:
+        return JsonResponse({ "error": "field_ids is required." }, status=400)
+    if len(field_ids) > MAX_AVAILABILITY_FIELDS:
+        return JsonResponse({ "error": f"At most {MAX_AVAILABILITY_FIELDS} fields per request." }, status=400)
+    if end_date < start_date:
+        return JsonResponse({ "error": "to must not be before from." }, status=400)
+    if end_date > max_date:
+        return JsonResponse({ "error": "Cannot check availability more than 30 days in advance." }, status=400)
+    if (end_date - start_date).days > MAX_DAYS_AHEAD:
+        return JsonResponse({ "error": f"Date range is limited to {MAX_DAYS_AHEAD + 1} days." }, status=400)
+
+    missing = set(field_ids) - set(Field.objects.filter(pk__in=field_ids).values_list("id", flat=True))
+    if missing:
+        return JsonResponse({ "error": f"Field not found: {', '.join(map(str, sorted(missing)))}" }, status=404)
+
+    # seluruh matriks dari satu query range atas bitmap okupansi
+    availability = get_availability(field_ids, start_date, end_date)
+    days = list(availability[field_ids[0]])
+
+    data = {
+        "from": start_date.isoformat(),
+        "to": end_date.isoformat(),
+        "days": [day.isoformat() for day in days],
+    }
+    if request.GET.get("encoding") == "compact":
+        # grid slot per weekday (0 = Senin) + satu string per hari (urut sesuai "days"),
+        # satu karakter per slot grid hari itu; string kosong berarti tutup
+        schedules = get_schedules(field_ids)
+        data["encoding"] = "compact"
+        data["codes"] = { code: status for status, code in STATUS_CODES.items() }
+        data["fields"] = {
+            str(field_id): {
+                "grid": { str(weekday): list(slots) for weekday, slots in schedules[field_id]["slots"].items() },
+                "days": [encode_day(availability[field_id][day]) for day in days],
+            }
+            for field_id in field_ids
+        }
+    else:
+        data["fields"] = {
+            str(field_id): { day.isoformat(): availability[field_id][day] for day in days }
+            for field_id in field_ids
+        }
+    return JsonResponse(data)
+
+@csrf_exempt
+@require_POST
+def recurring_booking_api(request):
+    """
+    Booking berulang untuk liga: satu slot setiap minggu pada weekday tertentu.
+    Body JSON: {"field_id", "time_slot": "HH:MM-HH:MM", "weekday": 0-6 (0 = Senin),
+    "start_date", "end_date"}. Mengembalikan laporan per tanggal (booked/skipped).
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({ "status": "error", "message": "Authentication required" }, status=401)
+
+    try:
+        data = json.loads(request.body)
+        field_id = int(data["field_id"])
+        weekday = int(data["weekday"])
+        start_date = datetime.date.fromisoformat(data["start_date"])
+        end_date = datetime.date.fromisoformat(data["end_date"])
+        label = str(data["time_slot"])
+    except (ValueError, TypeError, KeyError):
+        return JsonResponse({
+            "status": "error",
+            "message": "field_id, time_slot, weekday (0-6), start_date and end_date (YYYY-MM-DD) are required.",
+        }, status=400)
+    if not 0 <= weekday <= 6 or end_date < start_date:
+        return JsonResponse({ "status": "error", "message": "Invalid weekday or date range." }, status=400)
+
+    field = Field.objects.filter(pk=field_id).first()
+    if field is None:
+        return JsonResponse({ "status": "error", "message": "Field not found" }, status=404)
+
+    try:
+        results = book_recurring(request.user, field, label, weekday, start_date, end_date)
+    except ValueError as error:
+        return JsonResponse({ "status": "error", "message": str(error) }, status=400)
+    except SlotUnavailable:
+        return JsonResponse({ "status": "error", "message": "Slots changed while booking, please try again." }, status=409)
+
+    booked = sum(result["status"] == "booked" for result in results)
+    return JsonResponse({
+        "status": "success",
+        "booked": booked,
+        "skipped": len(results) - booked,
+        "results": results,
+    }, status=201 if booked else 200)
 
 @login_required
 def show_book(request, field_id):
     field = get_object_or_404(Field, pk=field_id)
 
     if request.method == "POST":
-        form = BookingForm(request.POST)
+        form = BookingForm(request.POST, field=field)
 
         if form.is_valid():
             booking_date = form.cleaned_data["booking_date"]
-            time_slot_str = form.cleaned_data["time_slot"]
-
-            start_time_str, end_time_str = time_slot_str.split("-")
-            start_time = datetime.datetime.strptime(start_time_str, "%H:%M").time()
-            end_time = datetime.datetime.strptime(end_time_str, "%H:%M").time()
+            # sudah divalidasi terhadap grid slot field di form.clean()
+            start_time = form.cleaned_data["start_time"]
+            end_time = form.cleaned_data["end_time"]
 
             now = timezone.localtime(timezone.now())
 
@@ -102,28 +172,18 @@ def show_book(request, field_id):
 
             is_already_booked = False
 
-            if start_time and not is_already_booked:
-                is_already_booked = Booking.objects.filter(
-                    field=field,
-                    booking_date=booking_date,
-                    start_time=start_time
-                ).exists()
+            hold = None
 
-                # error message if slot is already booked
-                if is_already_booked:
+            if start_time and end_time:
+                # slot ditahan dulu selama checkout (insert-first, gagal di unique key jika sudah diambil)
+                try:
+                    hold = place_hold(request.user, field, booking_date, start_time, end_time)
+                except SlotUnavailable:
+                    is_already_booked = True
                     messages.error(request, "Sorry, this time slot was just booked. Please select another.")
 
-            if not is_already_booked and start_time and end_time:
-                Booking.objects.create(
-                    user=request.user,
-                    field=field,
-                    booking_date=booking_date,
-                    start_time=start_time,
-                    end_time=end_time
-                )
-                messages.success(request, "Successfully booked")
-
-                return redirect("bookings:show_my_bookings")
+            if not is_already_booked and hold:
+                return redirect("bookings:show_checkout", hold_id=hold.id)
                 
             else:
                 messages.error(request, "Booking failed. Please correct the errors below.")
@@ -133,7 +193,7 @@ def show_book(request, field_id):
     else:
         initial_date_str = request.GET.get("date", timezone.now().date().strftime("%Y-%m-%d"))
         initial_data = { "booking_date": initial_date_str }
-        form = BookingForm(initial=initial_data)
+        form = BookingForm(initial=initial_data, field=field)
 
     context = {
         "field": field,
@@ -143,29 +203,94 @@ def show_book(request, field_id):
     return render(request, "book.html", context)
 
 @login_required
-def show_my_bookings(request):
-    bookings = Booking.objects.filter(user=request.user).select_related('field').order_by("-booking_date", "-start_time")
-    
-    upcoming_bookings = []
-    past_bookings = []
+def show_checkout(request, hold_id):
+    hold = BookingHold.objects.filter(pk=hold_id, user=request.user).select_related("field").first()
+    # hold sudah dikonfirmasi/dibatalkan/disapu -> kembali ke halaman booking field (jika masih ada)
+    back_url = reverse("bookings:show_book", args=[hold.field_id]) if hold else reverse("bookings:show_my_bookings")
 
-    now = timezone.now()
-    for booking in bookings:
-        combined_end_dt = datetime.datetime.combine(booking.booking_date, booking.end_time)
-        booking_end_dt = timezone.make_aware(combined_end_dt) if timezone.is_naive(combined_end_dt) else combined_end_dt
-        is_past = booking_end_dt < now
+    if request.method == "POST":
+        if request.POST.get("action") == "cancel":
+            release_hold(hold_id, request.user)
+            messages.success(request, "Your held slot has been released.")
+            return redirect(back_url)
 
-        if is_past:
-            past_bookings.append(booking)
-        else:
-            upcoming_bookings.append(booking)
+        # konfirmasi: hold -> Booking secara atomik
+        try:
+            confirm_hold(hold_id, request.user)
+        except HoldExpired:
+            messages.error(request, "Your hold on this slot has expired. Please select a slot again.")
+            return redirect(back_url)
+
+        messages.success(request, "Successfully booked")
+        return redirect("bookings:show_my_bookings")
+
+    if hold is None or hold.expires_at <= timezone.now():
+        messages.error(request, "Your hold on this slot has expired. Please select a slot again.")
+        return redirect(back_url)
+
+    context = { "hold": hold }
+    return render(request, "checkout.html", context)
 
-        booking.is_past = is_past
+@login_required
+def show_my_bookings(request):
+    # upcoming/past dipisah di database; past dipaginasi dengan keyset (?cursor=)
+    upcoming = upcoming_bookings(request.user).select_related("field")
+    past, next_cursor = get_page(past_bookings(request.user).select_related("field"), request.GET.get("cursor"))
 
-    context = { "upcoming_bookings": upcoming_bookings, "past_bookings": past_bookings }
+    context = {
+        "upcoming_bookings": upcoming,
+        "past_bookings": past,
+        "next_cursor": next_cursor,
+        "calendar_url": request.build_absolute_uri(
+            reverse("bookings:calendar_feed", args=[calendar_token(request.user)])
+        ),
+    }
 
     return render(request, "my_bookings.html", context)
 
+def calendar_feed(request, token):
+    """
+    Feed iCalendar (.ics) booking + match yang diikuti user, untuk di-subscribe aplikasi kalender.
+    Poll berulang hanya membaca cache; If-None-Match yang cocok dijawab 304.
+    """
+    user_id = user_id_from_token(token)
+    if user_id is None:
+        return HttpResponse("Invalid calendar token", status=404, content_type="text/plain")
+
+    body, etag = get_calendar(user_id)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type="text/calendar; charset=utf-8")
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+def my_bookings_json(request):
+    """
+    Riwayat booking untuk aplikasi mobile. Halaman pertama berisi upcoming + halaman
+    pertama past; halaman berikutnya diambil dengan ?cursor=<next_cursor>.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({ "status": "error", "message": "Authentication required" }, status=401)
+
+    try:
+        per_page = min(max(int(request.GET.get("per_page", PAST_BOOKINGS_PER_PAGE)), 1), MAX_PAST_BOOKINGS_PER_PAGE)
+    except ValueError:
+        per_page = PAST_BOOKINGS_PER_PAGE
+
+    cursor = request.GET.get("cursor")
+    past, next_cursor = get_page(
+        past_bookings(request.user).values(*BOOKING_HISTORY_COLUMNS), cursor, per_page
+    )
+    data = {
+        "status": "success",
+        "past": serialize_booking_rows(past),
+        "next_cursor": next_cursor,
+    }
+    if not cursor:
+        data["upcoming"] = serialize_booking_rows(upcoming_bookings(request.user).values(*BOOKING_HISTORY_COLUMNS))
+    return JsonResponse(data)
+
 @login_required
 def show_booking_detail(request, booking_id):
     booking = get_object_or_404(Booking, pk=booking_id, user=request.user)
@@ -5,6 +5,8 @@ from django.urls import reverse
 from fields.models import Field, Facility
 from fields.forms import FieldForm
 import json
+from django.contrib.auth.models import User
+from django.core.cache import cache
 
 class DashboardViewTests(TestCase):
     def setUp(self):
@@ -184,3 +186,153 @@ class DashboardViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.content)
         self.assertIn('html', data)
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client.force_login(self.admin)
+        for i in range(30):
+            Field.objects.create(
+                name=f"Lapangan {i:02d}",
+                image="http://example.com/image.jpg",
+                price=10000 * (i + 1),
+                rating=4.0,
+                location="Jakarta",
+                sport="futsal",
+                url=f"http://example.com/{i}"
+            )
+
+    def test_stats_read_from_stats_table(self):
+        """Statistik dashboard dibaca dari FieldStats, bukan dengan memuat semua Field"""
+        # session + user + stats + count paginator + halaman
+        with self.assertNumQueries(5):
+            response = self.client.get(
+                reverse('dashboard:dashboard_home'),
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+            )
+        data = response.json()
+        self.assertEqual(data['total_fields'], 30)
+        self.assertEqual(data['avg_price'], 155000)
+        self.assertEqual(data['avg_rating'], 4.0)
+
+
+class DashboardFragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='admin', password='password123', is_staff=True)
+        self.client.force_login(self.admin)
+        self.fields = [
+            Field.objects.create(
+                name=f"Lapangan {i:02d}",
+                image="http://example.com/image.jpg",
+                price=10000 * (i + 1),
+                rating=4.0,
+                location="Jakarta",
+                sport="futsal",
+                url=f"http://example.com/{i}"
+            )
+            for i in range(3)
+        ]
+
+    def get_table(self, **params):
+        response = self.client.get(
+            reverse('dashboard:dashboard_home'), params, HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        return response.json()
+
+    def field_data(self, **extra):
+        data = {
+            'name': 'Lapangan Baru', 'sport': 'futsal', 'price': 75000, 'rating': 4.5,
+            'location': 'Jakarta', 'image': 'http://example.com/image.jpg', 'url': 'http://example.com/new',
+        }
+        data.update(extra)
+        return data
+
+    def test_partials_are_cached_per_filter_and_page(self):
+        self.get_table(page=1, per_page=2)
+        # Cache hit: hanya session + user, tanpa query statistik/paginasi
+        with self.assertNumQueries(2):
+            data = self.get_table(per_page=2, page=1)
+        self.assertIn('Lapangan 00', data['table_html'])
+        self.assertEqual(data['total_fields'], 3)
+
+        # Filter/halaman lain punya cache sendiri
+        self.assertIn('Lapangan 02', self.get_table(page=2, per_page=2)['table_html'])
+        self.assertNotIn('Lapangan 00', self.get_table(category='padel')['table_html'])
+
+    def test_field_write_invalidates_partials(self):
+        self.get_table()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fields[0].name = 'Lapangan Diubah'
+            self.fields[0].save()
+        with self.assertNumQueries(5):
+            data = self.get_table()
+        self.assertIn('Lapangan Diubah', data['table_html'])
+
+    def test_full_page_uses_cached_partials(self):
+        self.get_table()
+        response = self.client.get(reverse('dashboard:dashboard_home'))
+        self.assertContains(response, 'id="field-row-%d"' % self.fields[0].pk)
+
+    def test_add_returns_only_new_row(self):
+        response = self.client.post(
+            reverse('dashboard:add_field_ajax'), self.field_data(), HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        data = response.json()
+        field = Field.objects.get(name='Lapangan Baru')
+        self.assertTrue(data['success'])
+        self.assertEqual((data['action'], data['field_id']), ('create', field.pk))
+        self.assertIn('id="field-row-%d"' % field.pk, data['row_html'])
+        self.assertNotIn('<table', data['row_html'])
+        self.assertEqual(data['total_fields'], 4)
+
+    def test_edit_returns_only_changed_row(self):
+        field = self.fields[1]
+        response = self.client.post(
+            reverse('dashboard:edit_field_ajax', args=[field.pk]),
+            self.field_data(name='Lapangan Edit', url=field.url),
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        data = response.json()
+        self.assertEqual((data['action'], data['field_id']), ('update', field.pk))
+        self.assertIn('Lapangan Edit', data['row_html'])
+        self.assertNotIn('Lapangan 00', data['row_html'])
+
+    def test_delete_returns_removed_id(self):
+        field = self.fields[2]
+        response = self.client.post(
+            reverse('dashboard:delete_field_ajax', args=[field.pk]), HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        data = response.json()
+        self.assertEqual((data['action'], data['field_id'], data['row_html']), ('delete', field.pk, ''))
+        self.assertEqual(data['total_fields'], 2)
+
+
+class OccupancyReportViewTests(TestCase):
+    def setUp(self):
+        self.field = Field.objects.create(
+            name="Lapangan Futsal A", image="http://example.com/image.jpg", price=50000,
+            rating="4.5", location="Jakarta", sport="futsal", url="http://example.com",
+        )
+        self.admin = User.objects.create_user(username='admin', password='pw', is_staff=True)
+        self.client.force_login(self.admin)
+
+    def test_occupancy_page_renders(self):
+        response = self.client.get(reverse('dashboard:occupancy_report'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'dashboard/occupancy.html')
+        self.assertContains(response, "Lapangan Futsal A")
+
+    def test_occupancy_json(self):
+        response = self.client.get(reverse('dashboard:occupancy_report_json'), {'sport': 'futsal'})
+        data = response.json()
+        self.assertEqual(data['status'], 'success')
+        self.assertEqual(data['by_field'][0]['name'], "Lapangan Futsal A")
+        self.assertEqual(data['by_field'][0]['total'], 0)
+
+    def test_requires_staff(self):
+        self.client.logout()
+        self.client.force_login(User.objects.create_user(username='player', password='pw'))
+        response = self.client.get(reverse('dashboard:occupancy_report_json'))
+        self.assertEqual(response.status_code, 302)
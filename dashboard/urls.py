@@ -8,5 +8,7 @@ urlpatterns = [
     path('filter-panel/', views.filter_panel, name='filter_panel'),
     path('add_ajax/', views.add_field_ajax, name='add_field_ajax'),
     path('edit_ajax/<int:pk>/', views.edit_field_ajax, name='edit_field_ajax'),
-    path('delete_ajax/<int:pk>/', views.delete_field_ajax, name='delete_field_ajax')
+    path('delete_ajax/<int:pk>/', views.delete_field_ajax, name='delete_field_ajax'),
+    path('occupancy/', views.occupancy_report_view, name='occupancy_report'),
+    path('occupancy/data/', views.occupancy_report_json, name='occupancy_report_json'),
 ]
@@ -1,3 +1,7 @@
+import hashlib
+import json
+
+from django.core.cache import cache
 from django.core.paginator import Paginator
 from django.http import JsonResponse
 from django.shortcuts import render, redirect
@@ -6,73 +10,99 @@ from django.views.decorators.csrf import csrf_exempt
 
 from fields.models import Field
 from fields.forms import FieldForm
+from fields.views_api import apply_field_filters
+from fields.cache import get_catalog_version
+from fields.facets import get_facets, normalize_filters
+from fields.stats import get_catalog_stats
+from bookings.rollups import occupancy_report
 
 from authentication.decorators import admin_required
 
-@admin_required
-def dashboard_home(request):
-    field_list = Field.objects.all().order_by('name')
-
-    total_fields = field_list.count()
-    avg_price = round(sum(f.price for f in field_list) / total_fields, 2) if total_fields > 0 else 0
-    avg_rating = round(sum(f.rating for f in field_list) / total_fields, 2) if total_fields > 0 else 0
-
-    # ===== FILTERING =====
-    # === CATEGORY ===
-    # Parameter dari GET request: jenis kategori
-    selected_category = request.GET.get('category', '')
-
-    # Filter berdasarkan kategori (jika dipilih)
-    if selected_category:
-        field_list = field_list.filter(sport=selected_category)
-
-    # === PRICE ===
-    # Parameter dari GET request: min dan max price
-    min_price = request.GET.get('min_price')
-    max_price = request.GET.get('max_price')
+# Partial tabel di-cache per versi katalog + filter + halaman
+TABLE_FRAGMENTS_TIMEOUT = 60 * 10
+
+def table_fragments_cache_key(params, per_page):
+    key_data = {**normalize_filters(params), 'page': params.get('page', '1'), 'per_page': per_page}
+    digest = hashlib.md5(json.dumps(key_data, sort_keys=True).encode()).hexdigest()
+    return f'dashboard:fragments:{get_catalog_version()}:{digest}'
+
+def render_table_fragments(request, per_page):
+    """
+    Render partial tabel, paginasi, dan info halaman beserta statistik katalog.
+    Hasilnya di-cache; versi katalog naik pada setiap penulisan Field, sehingga
+    cache lama otomatis tidak terpakai lagi. Partial tidak memuat data per user
+    (mis. CSRF token), jadi aman dipakai bersama antar admin.
+    """
+    key = table_fragments_cache_key(request.GET, per_page)
+    fragments = cache.get(key)
+    if fragments is not None:
+        return fragments
+
+    # Statistik seluruh katalog dibaca dari tabel FieldStats (tanpa memuat semua Field)
+    catalog_stats = get_catalog_stats()
+
+    # Search (nama & lokasi), kategori, dan rentang harga memakai helper yang sama
+    # dengan API Flutter, sehingga search juga lewat index full-text
+    field_list = apply_field_filters(Field.objects.all().order_by('name'), request.GET)
 
-    # Filter berdasarkan harga
-    if min_price:
-        field_list = field_list.filter(price__gte=min_price)
-    if max_price:
-        field_list = field_list.filter(price__lte=max_price)
+    # Melakukan paging
+    paginator = Paginator(field_list, per_page)
+    page_obj = paginator.get_page(request.GET.get('page', 1))
+
+    context = {'page_obj': page_obj, 'current_per_page': per_page}
+    fragments = {
+        'table_html': render_to_string('dashboard/field_table.html', context, request=request),
+        'pagination_html': render_to_string('dashboard/pagination.html', context, request=request),
+        'page_info_html': render_to_string('dashboard/page_info.html', context, request=request),
+        'total_fields': catalog_stats['total'],
+        'avg_price': catalog_stats['avg_price'],
+        'avg_rating': round(catalog_stats['avg_rating'], 2),
+    }
+    cache.set(key, fragments, TABLE_FRAGMENTS_TIMEOUT)
+    return fragments
+
+def field_row_response(request, action, field_id, field=None):
+    """
+    Respons penulisan dari dashboard: hanya HTML baris yang berubah (kosong untuk delete)
+    dan statistik terbaru, bukan seluruh tabel.
+    """
+    catalog_stats = get_catalog_stats()
+    row_html = ''
+    if field is not None:
+        row_html = render_to_string('dashboard/field_row.html', {'field': field}, request=request)
+    return JsonResponse({
+        'success': True,
+        'action': action,
+        'field_id': field_id,
+        'row_html': row_html,
+        'total_fields': catalog_stats['total'],
+        'avg_price': catalog_stats['avg_price'],
+        'avg_rating': round(catalog_stats['avg_rating'], 2),
+    })
 
+@admin_required
+def dashboard_home(request):
     # ===== PAGING =====
     # Parameter dari GET request: jumlah row per page
     per_page = int(request.GET.get('per_page', 20))
 
-    # Melakukan paging
-    paginator = Paginator(field_list, per_page)
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
+    # ===== FILTERING + RENDER PARTIAL (di-cache) =====
+    fragments = render_table_fragments(request, per_page)
+
+    # Jika request AJAX, kembalikan partial HTML tabel
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse(fragments)
 
     context = {
-        'page_obj': page_obj,
-        'total_fields': total_fields,
-        'avg_price': avg_price,
-        'avg_rating': avg_rating,
+        **fragments,
         'per_page_choices': [5, 10, 20, 50, 100],
         'current_per_page': per_page,
         'sport_categories': [category[0] for category in Field.SPORT_CATEGORY],
-        'selected_category': selected_category,
-        'min_price': min_price,
-        'max_price': max_price
+        'search_query': request.GET.get('search', ''),
+        'selected_category': request.GET.get('category', ''),
+        'min_price': request.GET.get('min_price'),
+        'max_price': request.GET.get('max_price'),
     }
-
-    # Jika request AJAX, kembalikan partial HTML tabel
-    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        table_html = render_to_string('dashboard/field_table.html', context, request=request)
-        pagination_html = render_to_string('dashboard/pagination.html', context, request=request)
-        page_info_html = render_to_string('dashboard/page_info.html', context, request=request)
-        return JsonResponse({
-            'table_html': table_html,
-            'pagination_html': pagination_html,
-            'page_info_html': page_info_html,
-            'total_fields': total_fields,
-            'avg_price': avg_price,
-            'avg_rating': round(avg_rating, 2)
-        })
-    
     return render(request, 'dashboard/home.html', context)
 
 @admin_required
@@ -80,11 +110,9 @@ def add_field_ajax(request):
     if request.method == 'POST':
         form = FieldForm(request.POST)
         if form.is_valid():
-            form.save()
-            # Render partial tabel terbaru
-            field_list = Field.objects.all().order_by('name')[:20]  # sesuaikan per_page
-            table_html = render_to_string('dashboard/field_table.html', {'page_obj': field_list}, request=request)
-            return JsonResponse({'success': True, 'table_html': table_html})
+            field_obj = form.save()
+            # Kirim baris baru saja, client menyisipkannya ke tabel
+            return field_row_response(request, 'create', field_obj.pk, field_obj)
         else:
             # Kembalikan form beserta error
             form_html = render_to_string('dashboard/add_field_form.html', {'form': form}, request=request)
@@ -100,10 +128,8 @@ def edit_field_ajax(request, pk):
     if request.method == 'POST':
         form = FieldForm(request.POST, instance=field_obj)
         if form.is_valid():
-            form.save()
-            field_list = Field.objects.all().order_by('name')
-            table_html = render_to_string('dashboard/field_table.html', {'field_list': field_list}, request=request)
-            return JsonResponse({'success': True, 'table_html': table_html})
+            field_obj = form.save()
+            return field_row_response(request, 'update', field_obj.pk, field_obj)
         else:
             form_html = render_to_string('dashboard/add_field_form.html', {'form': form}, request=request)
             return JsonResponse({'success': False, 'form_html': form_html})
@@ -118,13 +144,30 @@ def delete_field_ajax(request, pk):
     if request.method == 'POST':
         field_obj = Field.objects.get(pk=pk)
         field_obj.delete()
-        field_list = Field.objects.all().order_by('name')
-        table_html = render_to_string('dashboard/field_table.html', {'field_list': field_list}, request=request)
-        return JsonResponse({'success': True, 'table_html': table_html})
+        return field_row_response(request, 'delete', pk)
 
 @admin_required
 def filter_panel(request):
+    # Pilihan filter beserta jumlah field untuk filter yang sedang aktif (di-cache)
+    facets = get_facets(request.GET)
     html = render_to_string('dashboard/filter_panel.html', {
         'sport_categories': Field.SPORT_CATEGORY,
+        'facets': facets,
+        'selected_facilities': request.GET.getlist('facility'),
+    }, request=request)
+    return JsonResponse({'html': html})
+
+
+@admin_required
+def occupancy_report_view(request):
+    # Analitik okupansi hanya membaca tabel rollup (bookings/rollups.py), bukan Booking/Match
+    report = occupancy_report(sport=request.GET.get('sport') or None)
+    return render(request, 'dashboard/occupancy.html', {
+        'report': report,
+        'sport_categories': Field.SPORT_CATEGORY,
+        'selected_sport': request.GET.get('sport', ''),
     })
-    return JsonResponse({'html': html})
\ No newline at end of file
+
+@admin_required
+def occupancy_report_json(request):
+    return JsonResponse({'status': 'success', **occupancy_report(sport=request.GET.get('sport') or None)})
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FieldsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'fields'
+
+    def ready(self):
+        # Daftarkan signal invalidasi cache katalog dan check trigger index pencarian
+        from fields import checks, signals  # noqa: F401
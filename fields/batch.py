@@ -0,0 +1,188 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from fields import stats
+from fields.cache import bump_catalog_version
+from fields.models import Field, Facility
+from fields.serializers import FieldBatchSerializer, FIELD_READ_COLUMNS, serialize_field_rows
+
+BATCH_MAX_OPERATIONS = 100
+BATCH_ACTIONS = ('create', 'update', 'delete')
+
+# Kolom yang ditulis ulang untuk operasi update (termasuk kolom turunan dari Field.save)
+BATCH_UPDATE_COLUMNS = [
+    'name', 'image', 'price', 'rating', 'location', 'sport', 'url',
+    'latitude', 'longitude', 'geo_cell', 'updated_at',
+]
+
+
+class BatchConflict(Exception):
+    """
+    Target update/delete hilang di antara validate() dan apply(). Transaksi batch
+    di-rollback; item yang hilang ditandai error di `FieldBatch.results`.
+    """
+
+
+class FieldBatch:
+    """
+    Create/update/delete banyak Field dalam satu request.
+    Semua operasi divalidasi dulu (satu query instance + satu query facility untuk
+    seluruh batch). Jika ada yang tidak valid, tidak ada yang ditulis. Jika semua valid,
+    operasi dijalankan dalam satu transaksi memakai bulk_create/bulk_update; jika target
+    ternyata sudah dihapus saat ditulis, apply() melempar BatchConflict dan tidak ada yang disimpan.
+    """
+
+    def __init__(self, operations):
+        self.operations = operations
+        # Hasil per operasi, urutannya sama dengan input
+        self.results = [{'index': index} for index in range(len(operations))]
+        self.valid = []
+
+    @property
+    def errors(self):
+        return [result for result in self.results if result.get('status') == 'error']
+
+    def fail(self, index, errors):
+        self.results[index].update({'status': 'error', 'errors': errors})
+
+    def validate(self):
+        """
+        Validasi seluruh operasi dalam satu pass. Mengembalikan True jika semua valid.
+        """
+        target_ids, facility_ids = set(), set()
+        for operation in self.operations:
+            if not isinstance(operation, dict):
+                continue
+            if isinstance(operation.get('id'), int):
+                target_ids.add(operation['id'])
+            data = operation.get('data')
+            if isinstance(data, dict) and isinstance(data.get('facilities'), list):
+                facility_ids.update(value for value in data['facilities'] if isinstance(value, int))
+
+        instances = Field.objects.in_bulk(target_ids) if target_ids else {}
+        # Satu lookup facility untuk seluruh batch
+        existing_facilities = Facility.objects.filter(id__in=facility_ids).values_list('id', flat=True)
+        context = {'facility_ids': set(existing_facilities) if facility_ids else set()}
+
+        seen_ids = set()
+        for index, operation in enumerate(self.operations):
+            action = operation.get('action') if isinstance(operation, dict) else None
+            if action not in BATCH_ACTIONS:
+                self.fail(index, {'action': [f"Action harus salah satu dari {', '.join(BATCH_ACTIONS)}."]})
+                continue
+            self.results[index]['action'] = action
+
+            instance = None
+            if action != 'create':
+                instance = instances.get(operation.get('id'))
+                if instance is None:
+                    self.fail(index, {'id': ["Field tidak ditemukan."]})
+                    continue
+                if instance.pk in seen_ids:
+                    self.fail(index, {'id': ["Field yang sama tidak boleh muncul dua kali dalam satu batch."]})
+                    continue
+                seen_ids.add(instance.pk)
+                self.results[index]['id'] = instance.pk
+
+            if action == 'delete':
+                self.valid.append((index, action, instance, None))
+                continue
+
+            serializer = FieldBatchSerializer(
+                instance, data=operation.get('data') or {}, partial=(action == 'update'), context=context
+            )
+            if serializer.is_valid():
+                self.valid.append((index, action, instance, serializer.validated_data))
+            else:
+                self.fail(index, serializer.errors)
+
+        return not self.errors
+
+    @transaction.atomic
+    def apply(self):
+        now = timezone.now()
+        to_create, to_update, to_delete, relink = [], [], [], []
+        # Selisih statistik per sport: [jumlah, total harga, total rating]
+        deltas = defaultdict(lambda: [0, 0, 0.0])
+        # Target update/delete dimuat ulang dan dikunci di dalam transaksi: salinan dari validate()
+        # bisa sudah basi, sedangkan bulk_update menulis ulang semua BATCH_UPDATE_COLUMNS
+        target_ids = [instance.pk for _, action, instance, _ in self.valid if action != 'create']
+        locked = Field.objects.select_for_update().in_bulk(target_ids) if target_ids else {}
+        for index, action, instance, _ in self.valid:
+            if action != 'create' and instance.pk not in locked:
+                # Dihapus oleh request lain setelah validasi
+                self.fail(index, {'id': ["Field tidak ditemukan."]})
+        if self.errors:
+            raise BatchConflict()
+
+        for index, action, instance, data in self.valid:
+            if action == 'delete':
+                to_delete.append(instance.pk)
+                continue
+            if action == 'update':
+                instance = locked[instance.pk]
+
+            data = dict(data)
+            facilities = data.pop('facilities', None)
+            if action == 'create':
+                instance = Field(**data)
+                to_create.append((index, instance))
+            else:
+                old = deltas[instance.sport]
+                old[0] -= 1
+                old[1] -= instance.price
+                old[2] -= instance.rating
+                for key, value in data.items():
+                    setattr(instance, key, value)
+                instance.updated_at = now
+                to_update.append((index, instance))
+
+            # bulk_create/bulk_update tidak memanggil Field.save(), jadi koordinat diisi di sini
+            instance.assign_coordinates()
+            new = deltas[instance.sport]
+            new[0] += 1
+            new[1] += instance.price
+            new[2] += instance.rating
+            if facilities is not None:
+                relink.append((instance, facilities, action == 'update'))
+
+        Field.objects.bulk_create([instance for _, instance in to_create])
+        if to_update:
+            Field.objects.bulk_update([instance for _, instance in to_update], BATCH_UPDATE_COLUMNS)
+
+        # Facilities yang dikirim menggantikan relasi lama (satu delete + satu insert)
+        if relink:
+            Through = Field.facilities.through
+            Through.objects.filter(
+                field_id__in=[instance.pk for instance, _, replace in relink if replace]
+            ).delete()
+            Through.objects.bulk_create([
+                Through(field_id=instance.pk, facility_id=facility_id)
+                for instance, facilities, _ in relink
+                for facility_id in facilities
+            ])
+
+        # Delete lewat queryset tetap memicu signal Field (statistik & versi katalog)
+        if to_delete:
+            Field.objects.filter(pk__in=to_delete).delete()
+
+        for sport, (count, price, rating) in deltas.items():
+            if count or price or rating:
+                stats.apply_delta(sport, count, price, rating)
+        # Versi dinaikkan setelah commit agar cache tidak terisi data sebelum batch tersimpan
+        transaction.on_commit(bump_catalog_version)
+
+        # Hasil per item: field yang dibuat/diubah dalam format list API
+        written = to_create + to_update
+        data_by_id = {}
+        if written:
+            rows = Field.objects.filter(pk__in=[instance.pk for _, instance in written]).values(*FIELD_READ_COLUMNS)
+            data_by_id = {item['id']: item for item in serialize_field_rows(list(rows))}
+        for index, instance in written:
+            self.results[index].update({'status': 'success', 'id': instance.pk, 'data': data_by_id[instance.pk]})
+        for index, action, _, _ in self.valid:
+            if action == 'delete':
+                self.results[index]['status'] = 'success'
+        return self.results
@@ -0,0 +1,56 @@
+import datetime
+import time
+
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = 'fields:catalog_version'
+CATALOG_MODIFIED_KEY = 'fields:catalog_modified'
+
+
+def get_version(key):
+    """
+    Versi saat ini untuk `key`. Dipakai sebagai bagian dari cache key, sehingga semua
+    cache turunannya otomatis basi ketika versi naik (lihat bump_version).
+    """
+    version = cache.get(key)
+    if version is None:
+        # Nilai awal berbasis waktu agar tidak bentrok dengan versi lama jika cache sempat dibuang
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key, time.time_ns())
+    return version
+
+
+def bump_version(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, None)
+        return version
+
+
+def get_catalog_version():
+    """
+    Versi katalog (Field & Facility) saat ini.
+    """
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    """
+    Naikkan versi katalog. Dipanggil setiap ada penulisan Field/Facility.
+    """
+    cache.set(CATALOG_MODIFIED_KEY, time.time(), None)
+    return bump_version(CATALOG_VERSION_KEY)
+
+
+def get_catalog_last_modified():
+    """
+    Waktu (UTC) penulisan katalog terakhir yang tercatat, untuk header Last-Modified.
+    Jika belum tercatat (mis. cache baru dibuang), dianggap berubah sekarang.
+    """
+    timestamp = cache.get(CATALOG_MODIFIED_KEY)
+    if timestamp is None:
+        cache.add(CATALOG_MODIFIED_KEY, time.time(), None)
+        timestamp = cache.get(CATALOG_MODIFIED_KEY, time.time())
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc)
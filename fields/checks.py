@@ -0,0 +1,32 @@
+from django.core.checks import Error, Tags, register
+from django.db import connections
+
+from fields.search import FTS_TABLE, FTS_TRIGGERS
+
+
+@register(Tags.database)
+def check_search_triggers(app_configs, databases=None, **kwargs):
+    """
+    Di SQLite, migrasi yang membuat ulang tabel fields_field (AlterField/AddField) ikut
+    menghapus trigger FTS5, dan index pencarian berhenti diperbarui tanpa error.
+    Dijalankan oleh `migrate`, `check --database` dan test runner.
+    """
+    errors = []
+    for alias in databases or []:
+        connection = connections[alias]
+        if connection.vendor != 'sqlite' or FTS_TABLE not in connection.introspection.table_names():
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'fields_field'"
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in FTS_TRIGGERS if name not in existing]
+        if missing:
+            errors.append(Error(
+                f"Trigger index pencarian hilang di database '{alias}': {', '.join(missing)}.",
+                hint="Tambahkan RunPython yang memasang ulang index (lihat fields/migrations/0007_updated_at.py) "
+                     "setelah migrasi yang membuat ulang tabel fields_field.",
+                id='fields.E001',
+            ))
+    return errors
@@ -0,0 +1,117 @@
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.http import QueryDict
+
+from fields.cache import get_catalog_version
+from fields.models import Field, Facility
+from fields.search import tokenize
+
+# Rentang harga histogram (min inklusif, max eksklusif; None = tanpa batas atas)
+PRICE_BUCKETS = [
+    (0, 50000),
+    (50000, 100000),
+    (100000, 200000),
+    (200000, 500000),
+    (500000, None),
+]
+
+FACETS_TIMEOUT = 60 * 10
+
+
+def normalize_filters(params):
+    """
+    Menyusun filter menjadi dict yang stabil, sehingga query yang ekuivalen
+    (urutan parameter, huruf besar/kecil, spasi) memakai cache key yang sama.
+    Parameter lain seperti page/per_page diabaikan.
+    """
+    filters = {}
+    if tokens := tokenize(params.get('search', '')):
+        filters['search'] = ' '.join(tokens)
+    if category := params.get('category', '').strip().lower():
+        filters['category'] = category
+    for key in ('min_price', 'max_price'):
+        if (value := params.get(key, '').strip()).isdigit():
+            filters[key] = str(int(value))
+    if facilities := sorted({int(value) for value in params.getlist('facility') if value.isdigit()}):
+        filters['facility'] = [str(value) for value in facilities]
+    return filters
+
+
+def facets_cache_key(filters):
+    digest = hashlib.md5(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+    return f'fields:facets:{get_catalog_version()}:{digest}'
+
+
+def filtered_queryset(filters, exclude=()):
+    # Import di sini untuk menghindari circular import dengan views_api
+    from fields.views_api import apply_field_filters
+
+    params = QueryDict(mutable=True)
+    for key, value in filters.items():
+        if key in exclude:
+            continue
+        if isinstance(value, list):
+            params.setlist(key, value)
+        else:
+            params[key] = value
+    # Urutan (termasuk rank search) tidak relevan untuk hitungan dan akan ikut GROUP BY
+    return apply_field_filters(Field.objects.all(), params).order_by()
+
+
+def compute_facets(filters):
+    """
+    Menghitung facet dalam tiga query grouped. Setiap facet mengabaikan filternya
+    sendiri (mis. hitungan per sport tidak dibatasi kategori yang sedang dipilih),
+    agar user tetap bisa melihat pilihan lain.
+    """
+    # 1. Jumlah field per sport
+    sport_counts = dict(
+        filtered_queryset(filters, exclude=('category',))
+        .values_list('sport')
+        .annotate(count=Count('id'))
+        .values_list('sport', 'count')
+    )
+
+    # 2. Histogram harga dengan conditional aggregation
+    bucket_filters = {
+        f'bucket_{index}': Q(price__gte=low) & (Q(price__lt=high) if high is not None else Q())
+        for index, (low, high) in enumerate(PRICE_BUCKETS)
+    }
+    bucket_counts = filtered_queryset(filters, exclude=('min_price', 'max_price')).aggregate(**{
+        key: Count('id', filter=condition) for key, condition in bucket_filters.items()
+    })
+
+    # 3. Jumlah field per facility
+    facility_queryset = filtered_queryset(filters, exclude=('facility',))
+    facilities = Facility.objects.order_by('name').annotate(
+        count=Count('field', filter=Q(field__in=facility_queryset.values('id')))
+    ).values('id', 'name', 'count')
+
+    return {
+        'sports': [
+            {'value': value, 'label': label, 'count': sport_counts.get(value, 0)}
+            for value, label in Field.SPORT_CATEGORY
+        ],
+        'price_buckets': [
+            {'min': low, 'max': high, 'count': bucket_counts[f'bucket_{index}']}
+            for index, (low, high) in enumerate(PRICE_BUCKETS)
+        ],
+        'facilities': list(facilities),
+    }
+
+
+def get_facets(params):
+    """
+    Facet untuk filter pada `params` (request.GET), di-cache per filter yang dinormalisasi.
+    Cache otomatis basi ketika versi katalog naik (setiap penulisan Field/Facility).
+    """
+    filters = normalize_filters(params)
+    key = facets_cache_key(filters)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(filters)
+        cache.set(key, facets, FACETS_TIMEOUT)
+    return facets
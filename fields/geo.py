@@ -0,0 +1,130 @@
+import json
+import math
+from functools import lru_cache
+from pathlib import Path
+
+CENTROIDS_PATH = Path(__file__).resolve().parent / 'data' / 'region_centroids.json'
+
+EARTH_RADIUS_KM = 6371.0
+
+# Grid spatial index: bumi dibagi menjadi sel 0.1° x 0.1° (~11 km di khatulistiwa).
+# Nomor sel disimpan di Field.geo_cell (kolom integer ber-index), sehingga pencarian
+# radius cukup memakai `geo_cell IN (...)` di SQLite maupun PostgreSQL tanpa PostGIS.
+CELL_SIZE_DEG = 0.1
+CELL_COLUMNS = round(360 / CELL_SIZE_DEG)
+
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 100
+
+
+@lru_cache(maxsize=1)
+def load_region_centroids():
+    """
+    Tabel wilayah (kota/kabupaten) -> (lat, lon) yang dibundel bersama aplikasi.
+    Key dinormalisasi menjadi huruf kecil.
+    """
+    with open(CENTROIDS_PATH, encoding='utf-8') as fp:
+        return {region.lower(): tuple(coords) for region, coords in json.load(fp).items()}
+
+
+def geocode_location(location):
+    """
+    Mengubah lokasi "Kota Depok, Jawa Barat" menjadi (lat, lon) titik tengah wilayahnya.
+    Mengembalikan None jika wilayah tidak ada di tabel.
+    """
+    region = (location or '').lstrip('·').split(',')[0].strip().lower()
+    return load_region_centroids().get(region)
+
+
+def cell_for(latitude, longitude):
+    row = math.floor((latitude + 90) / CELL_SIZE_DEG)
+    column = math.floor((longitude + 180) / CELL_SIZE_DEG) % CELL_COLUMNS
+    return row * CELL_COLUMNS + column
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    (min_lat, max_lat, min_lon, max_lon) yang memuat lingkaran radius_km
+    (rentang bujur dihitung eksak pada bola, bukan aproksimasi datar).
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    lat_delta = math.degrees(angular)
+    ratio = math.sin(angular) / max(math.cos(math.radians(latitude)), 1e-9)
+    # Lingkaran yang memuat kutub mencakup semua bujur
+    lon_delta = 180 if ratio >= 1 else math.degrees(math.asin(ratio))
+    return (
+        max(latitude - lat_delta, -90), min(latitude + lat_delta, 90),
+        longitude - lon_delta, longitude + lon_delta,
+    )
+
+
+def cells_within(latitude, longitude, radius_km):
+    """
+    Semua sel grid yang bersinggungan dengan bounding box lingkaran radius_km.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    min_row = math.floor((min_lat + 90) / CELL_SIZE_DEG)
+    max_row = math.floor((max_lat + 90) / CELL_SIZE_DEG)
+    min_column = math.floor((min_lon + 180) / CELL_SIZE_DEG)
+    max_column = math.floor((max_lon + 180) / CELL_SIZE_DEG)
+    columns = {column % CELL_COLUMNS for column in range(min_column, max_column + 1)}
+
+    return [row * CELL_COLUMNS + column for row in range(min_row, max_row + 1) for column in columns]
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def parse_near(near, radius_km=None):
+    """
+    Parsing parameter `near=lat,lon` dan `radius_km`.
+    Mengembalikan (lat, lon, radius_km) atau raise ValueError jika tidak valid.
+    """
+    try:
+        latitude, longitude = (float(value) for value in near.split(','))
+    except (AttributeError, ValueError):
+        raise ValueError("Parameter near harus berformat 'lat,lon'.")
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("Koordinat near di luar jangkauan.")
+
+    try:
+        radius = float(radius_km) if radius_km not in (None, '') else DEFAULT_RADIUS_KM
+    except ValueError:
+        raise ValueError("Parameter radius_km harus berupa angka.")
+    if not 0 < radius <= MAX_RADIUS_KM:
+        raise ValueError(f"Parameter radius_km harus antara 0 dan {MAX_RADIUS_KM}.")
+
+    return latitude, longitude, radius
+
+
+def nearby(queryset, latitude, longitude, radius_km, columns=()):
+    """
+    Field di dalam radius, terurut dari yang terdekat.
+    Kandidat diambil lewat index geo_cell (dipersempit dengan bounding box),
+    lalu jarak sebenarnya dihitung dengan haversine.
+    Mengembalikan list tuple (distance_km, id, *columns).
+    """
+    candidates = queryset.filter(
+        geo_cell__in=cells_within(latitude, longitude, radius_km)
+    ).order_by().values_list('id', 'latitude', 'longitude', *columns)
+
+    # Buang sudut sel di luar bounding box langsung di database (kecuali melewati antimeridian)
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    if -180 <= min_lon and max_lon <= 180:
+        candidates = candidates.filter(
+            latitude__range=(min_lat, max_lat), longitude__range=(min_lon, max_lon)
+        )
+
+    results = []
+    for field_id, field_lat, field_lon, *values in candidates:
+        distance = haversine_km(latitude, longitude, field_lat, field_lon)
+        if distance <= radius_km:
+            results.append((distance, field_id, *values))
+    results.sort(key=lambda row: row[:2])
+    return results
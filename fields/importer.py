@@ -0,0 +1,203 @@
+import json
+import re
+
+from django.db import transaction
+from django.utils import timezone
+
+from fields.cache import bump_catalog_version
+from fields.geo import cell_for, geocode_location
+from fields.models import Field, Facility
+from fields.stats import rebuild_field_stats
+
+# Kolom Field yang diisi dari feed (selain facilities), `url` adalah natural key
+FIELD_COLUMNS = [
+    'name', 'image', 'price', 'rating', 'location', 'sport', 'url',
+    'latitude', 'longitude', 'geo_cell',
+]
+UPDATE_COLUMNS = [column for column in FIELD_COLUMNS if column != 'url']
+
+WHITESPACE = re.compile(r'\s*')
+
+
+def iter_json_array(fp, chunk_size=64 * 1024):
+    """
+    Membaca array JSON (`[{...}, {...}]`) secara bertahap dari file object.
+    Hanya buffer sebesar beberapa chunk yang ditahan di memori, sehingga feed
+    berukuran besar tetap bisa diproses dengan memori yang terbatas.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    started = False
+    eof = False
+
+    while True:
+        pos = WHITESPACE.match(buffer, pos).end()
+
+        # Buffer habis (atau item terpotong): buang bagian yang sudah dibaca lalu isi ulang
+        if pos == len(buffer) and not eof:
+            buffer = fp.read(chunk_size)
+            pos = 0
+            eof = not buffer
+            continue
+
+        if not started:
+            if buffer[pos:pos + 1] != '[':
+                raise ValueError("Feed harus berupa array JSON.")
+            pos += 1
+            started = True
+            continue
+
+        char = buffer[pos:pos + 1]
+        if char == ']':
+            return
+        if char == ',':
+            pos += 1
+            continue
+        if not char:
+            raise ValueError("Feed JSON terpotong atau tidak valid.")
+
+        try:
+            item, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Item belum lengkap, baca chunk berikutnya
+            if eof:
+                raise ValueError("Feed JSON terpotong atau tidak valid.")
+            chunk = fp.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        yield item
+
+
+def normalize_row(item):
+    """
+    Mengubah satu item feed menjadi (atribut Field, list nama facility).
+    """
+    attrs = {
+        'name': item['name'],
+        'image': item['image'],
+        'price': int(item['price']),
+        'rating': float(item['rating']),
+        # Lokasi dari feed diawali separator "·"
+        'location': item['location'].lstrip('·').strip(),
+        'sport': item['sport'].strip().lower(),
+        'url': item['url'],
+    }
+    # Geocoding offline dari tabel centroid wilayah (bulk_create tidak memanggil Field.save)
+    coords = geocode_location(attrs['location'])
+    attrs['latitude'], attrs['longitude'] = coords or (None, None)
+    attrs['geo_cell'] = cell_for(*coords) if coords else None
+    return attrs, item.get('facilities', [])
+
+
+class FieldImporter:
+    """
+    Upsert Field secara batch dengan `url` sebagai natural key.
+    Setiap batch memakai sejumlah query yang tetap (tidak bergantung jumlah baris),
+    dan baris yang tidak berubah tidak ditulis ulang.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        # Map nama facility -> id, dimuat sekali di awal
+        self.facility_ids = dict(Facility.objects.values_list('name', 'id'))
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+
+    @property
+    def total(self):
+        return self.created + self.updated + self.unchanged
+
+    def run(self, items):
+        batch = {}
+        for item in items:
+            attrs, facilities = normalize_row(item)
+            # Baris dengan url yang sama di satu feed: yang terakhir menang
+            batch[attrs['url']] = (attrs, facilities)
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = {}
+        if batch:
+            self.flush(batch)
+
+        # bulk_create/bulk_update tidak memicu signal, jadi statistik dan cache katalog diperbarui manual
+        if self.created or self.updated:
+            rebuild_field_stats()
+            bump_catalog_version()
+        return self
+
+    def resolve_facilities(self, names):
+        missing = [name for name in names if name not in self.facility_ids]
+        if missing:
+            Facility.objects.bulk_create(
+                [Facility(name=name) for name in missing], ignore_conflicts=True
+            )
+            self.facility_ids.update(
+                Facility.objects.filter(name__in=missing).values_list('name', 'id')
+            )
+
+    @transaction.atomic
+    def flush(self, batch):
+        self.resolve_facilities({name for _, facilities in batch.values() for name in facilities})
+
+        # Ambil data field yang sudah ada; jika ada duplikat url, pakai id terkecil
+        existing = {}
+        for field_id, url, *values in (
+            Field.objects.filter(url__in=batch.keys())
+            .order_by('-id')
+            .values_list('id', 'url', *UPDATE_COLUMNS)
+        ):
+            existing[url] = (field_id, tuple(values))
+
+        Through = Field.facilities.through
+        current_facilities = {}
+        for field_id, facility_id in Through.objects.filter(
+            field_id__in=[field_id for field_id, _ in existing.values()]
+        ).values_list('field_id', 'facility_id'):
+            current_facilities.setdefault(field_id, set()).add(facility_id)
+
+        to_create, to_update, relink = [], [], []
+        now = timezone.now()
+        for url, (attrs, facilities) in batch.items():
+            facility_ids = {self.facility_ids[name] for name in facilities}
+            if url not in existing:
+                obj = Field(**attrs)
+                to_create.append(obj)
+                relink.append((obj, facility_ids))
+                continue
+
+            # Baris yang tidak berubah dilewati agar rerun feed yang sama tetap murah
+            field_id, values = existing[url]
+            obj = Field(id=field_id, updated_at=now, **attrs)
+            data_changed = values != tuple(attrs[column] for column in UPDATE_COLUMNS)
+            facilities_changed = current_facilities.get(field_id, set()) != facility_ids
+
+            if facilities_changed:
+                relink.append((obj, facility_ids))
+            if data_changed or facilities_changed:
+                to_update.append(obj)
+                self.updated += 1
+            else:
+                self.unchanged += 1
+
+        Field.objects.bulk_create(to_create)
+        if to_update:
+            # bulk_update tidak menjalankan auto_now, jadi updated_at ikut ditulis eksplisit
+            Field.objects.bulk_update(to_update, UPDATE_COLUMNS + ['updated_at'])
+
+        # Relasi facilities yang berubah diganti dengan satu delete + satu insert
+        if relink:
+            Through.objects.filter(
+                field_id__in=[obj.id for obj, _ in relink if obj.id in current_facilities]
+            ).delete()
+            Through.objects.bulk_create([
+                Through(field_id=obj.id, facility_id=facility_id)
+                for obj, facility_ids in relink
+                for facility_id in facility_ids
+            ], ignore_conflicts=True)
+
+        self.created += len(to_create)
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from fields.models import Field
+from fields.serializers import (
+    FieldSerializer, FIELD_READ_COLUMNS, parse_sparse_fields, serialize_field_rows,
+)
+
+class Command(BaseCommand):
+    help = 'Compare per-page serialization time of FieldSerializer and the lightweight list read path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--per-page', type=int, default=100, help='Jumlah field per halaman')
+        parser.add_argument('--repeat', type=int, default=20, help='Jumlah pengulangan per path')
+        parser.add_argument('--fields', default='', help='Sparse fieldset untuk read path, mis. name,image,price,rating')
+
+    def handle(self, *args, **options):
+        per_page, repeat = options['per_page'], options['repeat']
+        ids = list(Field.objects.order_by('name', 'id').values_list('id', flat=True)[:per_page])
+        if not ids:
+            raise CommandError('Tabel Field kosong, jalankan import_fields terlebih dahulu.')
+
+        fields = parse_sparse_fields(options['fields'])
+        columns = [name for name in FIELD_READ_COLUMNS if name in fields]
+
+        # Sama seperti list API sebelumnya: instance + prefetch facilities + ModelSerializer
+        def serializer_path():
+            queryset = Field.objects.filter(id__in=ids).order_by('name', 'id').prefetch_related('facilities')
+            return FieldSerializer(queryset, many=True).data
+
+        # Read path: .values() + map facilities
+        def read_path():
+            rows = Field.objects.filter(id__in=ids).order_by('name', 'id').values(*columns)
+            return serialize_field_rows(list(rows), fields)
+
+        results = {}
+        for label, path in (('FieldSerializer', serializer_path), ('read path', read_path)):
+            path()  # warm-up
+            started = time.perf_counter()
+            for _ in range(repeat):
+                path()
+            results[label] = (time.perf_counter() - started) / repeat * 1000
+            self.stdout.write(f'{label:>16}: {results[label]:.2f} ms/page')
+
+        speedup = results['FieldSerializer'] / results['read path'] if results['read path'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Benchmarked {len(ids)} fields/page x {repeat} runs: read path is {speedup:.1f}x faster'
+        ))
@@ -1,30 +1,28 @@
 # myapp/management/commands/import_fields.py
 from django.core.management.base import BaseCommand
-from fields.models import Field, Facility
-import json
+from fields.importer import FieldImporter, iter_json_array
+import time
 
 class Command(BaseCommand):
     help = 'Import fields data from JSON file'
 
-    def handle(self, *args, **kwargs):
-        with open('fields/data/fields.json', 'r') as f:
-            data = json.load(f)
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default='fields/data/fields.json', help='Path ke feed JSON venue')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Jumlah baris per batch insert/update')
 
-        for item in data:
-            # Buat field tanpa facilities
-            field_obj = Field.objects.create(
-                name = item['name'],
-                image = item['image'],
-                price = item['price'],
-                rating = float(item['rating']),
-                location = item['location'][2:],
-                sport = item['sport'].lower(),
-                url = item['url']
-            )
+    def handle(self, *args, **options):
+        started = time.perf_counter()
 
-            # Tambahkan facilities sebagai ManyToMany
-            for fac_name in item.get('facilities', []):
-                fac_obj, created = Facility.objects.get_or_create(name=fac_name)
-                field_obj.facilities.add(fac_obj)
+        # Feed dibaca bertahap dan di-upsert per batch berdasarkan url venue
+        with open(options['file'], 'r', encoding='utf-8') as f:
+            importer = FieldImporter(batch_size=options['batch_size'])
+            importer.run(iter_json_array(f))
 
-        self.stdout.write(self.style.SUCCESS('Successfully imported fields'))
+        elapsed = time.perf_counter() - started
+        rate = importer.total / elapsed if elapsed > 0 else 0
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully imported fields: {importer.created} created, {importer.updated} updated, '
+            f'{importer.unchanged} unchanged '
+            f'in {elapsed:.2f}s ({rate:,.0f} rows/sec)'
+        ))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from fields.stats import get_catalog_stats, rebuild_field_stats
+
+class Command(BaseCommand):
+    help = 'Rebuild materialized field statistics (FieldStats) from the Field table'
+
+    def handle(self, *args, **kwargs):
+        rebuild_field_stats()
+        catalog = get_catalog_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Successfully rebuilt field stats: {catalog['total']} fields in {len(catalog['sports'])} sports"
+        ))
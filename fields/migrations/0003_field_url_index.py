@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fields', '0002_facility_remove_field_facilities_alter_field_rating_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='field',
+            name='url',
+            field=models.CharField(db_index=True, max_length=200),
+        ),
+    ]
@@ -0,0 +1,87 @@
+from django.db import migrations
+
+# Lihat fields/search.py untuk backend yang memakai index ini
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE fields_field_fts USING fts5(
+        name, location,
+        content='fields_field', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER fields_field_fts_insert AFTER INSERT ON fields_field BEGIN
+        INSERT INTO fields_field_fts(rowid, name, location) VALUES (new.id, new.name, new.location);
+    END
+    """,
+    """
+    CREATE TRIGGER fields_field_fts_delete AFTER DELETE ON fields_field BEGIN
+        INSERT INTO fields_field_fts(fields_field_fts, rowid, name, location)
+        VALUES ('delete', old.id, old.name, old.location);
+    END
+    """,
+    """
+    CREATE TRIGGER fields_field_fts_update AFTER UPDATE OF name, location ON fields_field BEGIN
+        INSERT INTO fields_field_fts(fields_field_fts, rowid, name, location)
+        VALUES ('delete', old.id, old.name, old.location);
+        INSERT INTO fields_field_fts(rowid, name, location) VALUES (new.id, new.name, new.location);
+    END
+    """,
+    "INSERT INTO fields_field_fts(fields_field_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS fields_field_fts_insert",
+    "DROP TRIGGER IF EXISTS fields_field_fts_delete",
+    "DROP TRIGGER IF EXISTS fields_field_fts_update",
+    "DROP TABLE IF EXISTS fields_field_fts",
+]
+
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX fields_field_search_idx ON fields_field
+    USING gin (to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(location, '')))
+    """,
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS fields_field_search_idx",
+]
+
+
+def sqlite_has_fts5(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def run_statements(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        run_statements(schema_editor, POSTGRES_FORWARD)
+    elif vendor == 'sqlite' and sqlite_has_fts5(schema_editor):
+        run_statements(schema_editor, SQLITE_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        run_statements(schema_editor, POSTGRES_REVERSE)
+    elif vendor == 'sqlite':
+        run_statements(schema_editor, SQLITE_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fields', '0003_field_url_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:40
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_stats(apps, schema_editor):
+    Field = apps.get_model('fields', 'Field')
+    FieldStats = apps.get_model('fields', 'FieldStats')
+    rows = Field.objects.order_by().values('sport').annotate(
+        field_count=Count('id'), price_sum=Sum('price'), rating_sum=Sum('rating')
+    )
+    FieldStats.objects.bulk_create([FieldStats(**row) for row in rows])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fields', '0004_field_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FieldStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sport', models.CharField(max_length=20, unique=True)),
+                ('field_count', models.IntegerField(default=0)),
+                ('price_sum', models.BigIntegerField(default=0)),
+                ('rating_sum', models.FloatField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
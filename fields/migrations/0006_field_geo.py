@@ -0,0 +1,118 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:43
+
+import math
+
+from django.db import migrations, models
+
+# Salinan fields.geo (geocode_location, cell_for, data/region_centroids.json) per 2026-10-18
+CELL_SIZE_DEG = 0.1
+CELL_COLUMNS = round(360 / CELL_SIZE_DEG)
+
+REGION_CENTROIDS = {
+    'kota jakarta pusat': (-6.1805, 106.8284),
+    'kota jakarta selatan': (-6.2615, 106.8106),
+    'kota jakarta barat': (-6.1674, 106.7637),
+    'kota jakarta utara': (-6.1384, 106.8636),
+    'kota jakarta timur': (-6.225, 106.9004),
+    'kota tangerang': (-6.1783, 106.6319),
+    'kota tangerang selatan': (-6.2886, 106.7179),
+    'kabupaten tangerang': (-6.1872, 106.4877),
+    'kota serang': (-6.12, 106.1503),
+    'kabupaten serang': (-6.1392, 106.0418),
+    'kabupaten lebak': (-6.3594, 106.25),
+    'kota depok': (-6.4025, 106.7942),
+    'kota bekasi': (-6.2383, 106.9756),
+    'kabupaten bekasi': (-6.2474, 107.1485),
+    'kota bogor': (-6.5971, 106.806),
+    'kabupaten bogor': (-6.4815, 106.854),
+    'kabupaten karawang': (-6.3227, 107.3376),
+    'kabupaten subang': (-6.5715, 107.7587),
+    'kota bandung': (-6.9175, 107.6191),
+    'kabupaten bandung': (-7.0251, 107.5197),
+    'kabupaten bandung barat': (-6.8437, 107.5032),
+    'kota cimahi': (-6.8722, 107.5425),
+    'kabupaten cianjur': (-6.8168, 107.1425),
+    'kota sukabumi': (-6.9277, 106.93),
+    'kabupaten sukabumi': (-7.07, 106.7),
+    'kabupaten garut': (-7.2279, 107.9087),
+    'kota tasikmalaya': (-7.3274, 108.2207),
+    'kabupaten majalengka': (-6.8364, 108.2274),
+    'kota cirebon': (-6.732, 108.5523),
+    'kabupaten indramayu': (-6.3275, 108.3249),
+    'kota semarang': (-6.9667, 110.4167),
+    'kabupaten kendal': (-6.9204, 110.2036),
+    'kota salatiga': (-7.3305, 110.5084),
+    'kota pekalongan': (-6.8886, 109.6753),
+    'kabupaten tegal': (-6.9857, 109.1319),
+    'kabupaten wonosobo': (-7.3632, 109.9002),
+    'kabupaten magelang': (-7.5954, 110.2192),
+    'kabupaten boyolali': (-7.5323, 110.5958),
+    'kota surakarta': (-7.5755, 110.8243),
+    'kabupaten karanganyar': (-7.5966, 110.9497),
+    'kabupaten sukoharjo': (-7.6808, 110.8192),
+    'kota yogyakarta': (-7.7956, 110.3695),
+    'kabupaten bantul': (-7.8881, 110.3289),
+    'kota surabaya': (-7.2575, 112.7521),
+    'kabupaten sidoarjo': (-7.4478, 112.7183),
+    'kabupaten gresik': (-7.1539, 112.6561),
+    'kota malang': (-7.9666, 112.6326),
+    'kabupaten malang': (-8.1303, 112.5727),
+    'kota batu': (-7.8831, 112.5334),
+    'kota madiun': (-7.6298, 111.5239),
+    'kabupaten nganjuk': (-7.6051, 111.9035),
+    'kabupaten jombang': (-7.546, 112.233),
+    'kabupaten tulungagung': (-8.0657, 111.9021),
+    'kota bandar lampung': (-5.3971, 105.2668),
+    'kota palembang': (-2.9761, 104.7754),
+    'kota prabumulih': (-3.4329, 104.2356),
+    'kota jambi': (-1.6101, 103.6131),
+    'kota bengkulu': (-3.7928, 102.2608),
+    'kota balikpapan': (-1.2379, 116.8529),
+}
+
+
+def geocode_location(location):
+    region = (location or '').lstrip('·').split(',')[0].strip().lower()
+    return REGION_CENTROIDS.get(region)
+
+
+def cell_for(latitude, longitude):
+    row = math.floor((latitude + 90) / CELL_SIZE_DEG)
+    column = math.floor((longitude + 180) / CELL_SIZE_DEG) % CELL_COLUMNS
+    return row * CELL_COLUMNS + column
+
+
+def geocode_fields(apps, schema_editor):
+    # Satu UPDATE per lokasi unik (jauh lebih sedikit dari jumlah field)
+    Field = apps.get_model('fields', 'Field')
+    for location in Field.objects.order_by().values_list('location', flat=True).distinct():
+        if coords := geocode_location(location):
+            Field.objects.filter(location=location).update(
+                latitude=coords[0], longitude=coords[1], geo_cell=cell_for(*coords)
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fields', '0005_fieldstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='field',
+            name='geo_cell',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='field',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='field',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(geocode_fields, migrations.RunPython.noop),
+    ]
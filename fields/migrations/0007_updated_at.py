@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:47
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+search_index = import_module('fields.migrations.0004_field_search_index')
+
+
+def reinstall_sqlite_search_index(apps, schema_editor):
+    # Di SQLite, AddField dengan default membuat ulang tabel fields_field sehingga
+    # trigger FTS5 ikut terhapus. Pasang ulang index pencarian setelahnya.
+    if schema_editor.connection.vendor == 'sqlite':
+        search_index.drop_search_index(apps, schema_editor)
+        search_index.create_search_index(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fields', '0006_field_geo'),
+    ]
+
+    operations = [
+        # Saat rollback, operasi dijalankan terbalik: ini yang terakhir (setelah kolom dihapus)
+        migrations.RunPython(migrations.RunPython.noop, reinstall_sqlite_search_index),
+        migrations.AddField(
+            model_name='facility',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='field',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(reinstall_sqlite_search_index, migrations.RunPython.noop),
+    ]
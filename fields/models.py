@@ -1,13 +1,19 @@
 from django.db import models
+from django.db.models import DEFERRED
 from django.core.validators import MinValueValidator, MaxValueValidator
+from fields.geo import cell_for, geocode_location
 
 class Facility(models.Model):
     name = models.CharField(max_length=100, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
     
 class Field(models.Model):
+    # Di SQLite, index pencarian FTS5 (fields/search.py) dijaga trigger pada tabel ini.
+    # Migrasi yang membuat ulang tabel (AlterField/AddField) menghapus trigger tersebut:
+    # pasang ulang lewat RunPython seperti 0007_updated_at (dicek oleh fields/checks.py)
     SPORT_CATEGORY = [
         ('badminton', 'Badminton'),
         ('basketball', 'Basketball'),
@@ -33,7 +39,59 @@ class Field(models.Model):
     location = models.CharField(max_length=200)
     sport = models.CharField(max_length=20, choices=SPORT_CATEGORY)
     facilities = models.ManyToManyField(Facility, blank=True)
-    url = models.CharField(max_length=200)
+    url = models.CharField(max_length=200, db_index=True)
+
+    # Koordinat titik tengah wilayah dari `location` (lihat fields/geo.py)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    # Nomor sel grid untuk pencarian "near me", diisi otomatis dari koordinat
+    geo_cell = models.IntegerField(null=True, blank=True, db_index=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lokasi saat dimuat, untuk mendeteksi perubahan lokasi di assign_coordinates.
+        # Kolom yang di-defer (.only()/.defer()) ditandai DEFERRED dan dianggap tidak berubah
+        instance._loaded_location = instance.__dict__.get('location', DEFERRED)
+        return instance
+
+    def assign_coordinates(self):
+        """
+        Mengisi koordinat dari tabel centroid wilayah dan menghitung ulang geo_cell.
+        Lokasi tidak dikenal mempertahankan koordinat yang diisi manual, kecuali lokasinya
+        baru diubah: koordinat wilayah lama dikosongkan agar tidak muncul di "near me" yang salah.
+        """
+        if coords := geocode_location(self.location):
+            self.latitude, self.longitude = coords
+        elif getattr(self, '_loaded_location', DEFERRED) not in (DEFERRED, self.location):
+            self.latitude = self.longitude = None
+        if self.latitude is not None and self.longitude is not None:
+            self.geo_cell = cell_for(self.latitude, self.longitude)
+        else:
+            self.geo_cell = None
+
+    def save(self, *args, **kwargs):
+        self.assign_coordinates()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'location' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'latitude', 'longitude', 'geo_cell'}
+        super().save(*args, **kwargs)
+        self._loaded_location = self.location
+
+class FieldStats(models.Model):
+    """
+    Statistik katalog per sport (jumlah, total harga, total rating).
+    Dijaga oleh signal Field (lihat fields/stats.py) agar dashboard dan meta API
+    tidak perlu menghitung ulang dari seluruh tabel Field.
+    """
+    sport = models.CharField(max_length=20, unique=True)
+    field_count = models.IntegerField(default=0)
+    price_sum = models.BigIntegerField(default=0)
+    rating_sum = models.FloatField(default=0)
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return f"{self.sport}: {self.field_count} fields"
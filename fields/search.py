@@ -0,0 +1,152 @@
+import re
+from abc import ABC, abstractmethod
+
+from django.db import connections
+from django.db.models import BooleanField, F, FloatField, Func, Q, Value
+from django.db.models.expressions import RawSQL
+
+# Nama tabel/index yang dibuat oleh migration 0004_field_search_index
+FTS_TABLE = 'fields_field_fts'
+PG_INDEX = 'fields_field_search_idx'
+# Trigger yang menjaga FTS_TABLE tetap sinkron dengan fields_field (diperiksa fields/checks.py)
+FTS_TRIGGERS = ('fields_field_fts_insert', 'fields_field_fts_delete', 'fields_field_fts_update')
+
+# Batas jumlah kata agar query search tetap murah
+MAX_TOKENS = 8
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(query):
+    """
+    Memecah query menjadi kata-kata (huruf kecil). Karakter selain huruf/angka dibuang,
+    sehingga token aman dipakai di sintaks MATCH FTS5 / to_tsquery.
+    """
+    return TOKEN_RE.findall(query.lower())[:MAX_TOKENS]
+
+
+# ===== EKSPRESI SQL =====
+# Ditulis sebagai Func agar referensi kolom mengikuti alias tabel (mis. saat dipakai di subquery)
+
+class SearchDocument(Func):
+    """
+    to_tsvector('simple', name || ' ' || location), sama persis dengan ekspresi GIN index.
+    """
+    template = "to_tsvector('simple', coalesce(%(expressions)s, ''))"
+    arg_joiner = ", '') || ' ' || coalesce("
+
+    def __init__(self):
+        super().__init__(F('name'), F('location'))
+
+
+class SearchMatches(Func):
+    """
+    `document @@ to_tsquery('simple', query)`
+    """
+    template = "%(expressions)s"
+    arg_joiner = " @@ "
+    output_field = BooleanField()
+
+    def __init__(self, tsquery):
+        super().__init__(SearchDocument(), Func(Value(tsquery), template="to_tsquery('simple', %(expressions)s)"))
+
+
+class SearchRank(Func):
+    function = 'ts_rank'
+    output_field = FloatField()
+
+    def __init__(self, tsquery):
+        super().__init__(SearchDocument(), Func(Value(tsquery), template="to_tsquery('simple', %(expressions)s)"))
+
+
+class FTSMatchRank(Func):
+    """
+    Skor bm25 baris ini terhadap query FTS5 (dinegasikan, makin besar makin relevan).
+    """
+    template = f"(SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %(expressions)s)"
+    arg_joiner = " AND rowid = "
+    output_field = FloatField()
+
+    def __init__(self, match):
+        super().__init__(Value(match), F('id'))
+
+
+# ===== BACKEND =====
+
+class BaseSearchBackend(ABC):
+    """
+    Backend search untuk Field (nama & lokasi). Semua kata harus cocok dan setiap kata
+    dicocokkan sebagai prefix, sehingga cocok untuk pencarian as-you-type.
+    Hasil diurutkan berdasarkan relevansi (`search_rank`, makin besar makin relevan), lalu nama.
+    """
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset
+        return self.filter(queryset, tokens).order_by('-search_rank', 'name')
+
+    @abstractmethod
+    def filter(self, queryset, tokens):
+        """
+        Saring queryset dengan semua token dan anotasikan `search_rank`.
+        """
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Full-text search PostgreSQL. Ekspresi tsvector sama persis dengan GIN index
+    `fields_field_search_idx`, sehingga index selalu up to date tanpa kolom tambahan.
+    """
+
+    def filter(self, queryset, tokens):
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        return queryset.filter(SearchMatches(tsquery)).annotate(search_rank=SearchRank(tsquery))
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    Full-text search SQLite memakai virtual table FTS5 `fields_field_fts`
+    (external content, dijaga oleh trigger insert/update/delete pada fields_field).
+    """
+
+    def filter(self, queryset, tokens):
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        ).annotate(search_rank=FTSMatchRank(match))
+
+
+class IContainsSearchBackend(BaseSearchBackend):
+    """
+    Fallback jika index full-text tidak tersedia (mis. SQLite tanpa FTS5).
+    """
+
+    def filter(self, queryset, tokens):
+        for token in tokens:
+            queryset = queryset.filter(Q(name__icontains=token) | Q(location__icontains=token))
+        return queryset.annotate(search_rank=RawSQL('0', [], output_field=FloatField()))
+
+
+_backends = {}
+
+
+def get_search_backend(using='default'):
+    """
+    Memilih backend sesuai database yang dipakai (hasilnya di-cache per alias).
+    """
+    if using not in _backends:
+        connection = connections[using]
+        if connection.vendor == 'postgresql':
+            _backends[using] = PostgresSearchBackend()
+        elif connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names():
+            _backends[using] = SQLiteSearchBackend()
+        else:
+            _backends[using] = IContainsSearchBackend()
+    return _backends[using]
+
+
+def search_fields(queryset, query):
+    """
+    Shortcut: cari Field pada queryset dengan backend default.
+    """
+    return get_search_backend(queryset.db).search(queryset, query)
@@ -10,7 +10,10 @@ class FieldSerializer(serializers.ModelSerializer):
     # Digunakan default untuk validasi input (menerima ID: [1, 2])
     class Meta:
         model = Field
-        fields = '__all__'
+        # geo_cell hanya dipakai internal untuk index pencarian "near me"
+        exclude = ['geo_cell']
+        # Koordinat diisi otomatis dari lokasi (lihat Field.assign_coordinates)
+        read_only_fields = ['latitude', 'longitude']
 
     # Mengubah output JSON saat data dikirim ke Flutter (GET)
     def to_representation(self, instance):
@@ -18,4 +21,72 @@ class FieldSerializer(serializers.ModelSerializer):
         
         # Ganti list ID dengan list Object lengkap khusus untuk tampilan
         response['facilities'] = FacilitySerializer(instance.facilities.all(), many=True).data
-        return response
\ No newline at end of file
+        return response
+
+class FieldBatchSerializer(FieldSerializer):
+    """
+    Validasi satu operasi di batch endpoint. Facilities dicek terhadap set id yang
+    dimuat sekali untuk seluruh batch (context['facility_ids']), bukan query per item.
+    """
+    facilities = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    def validate_facilities(self, value):
+        missing = sorted(set(value) - self.context['facility_ids'])
+        if missing:
+            raise serializers.ValidationError(f"Facility tidak ditemukan: {missing}")
+        return sorted(set(value))
+
+
+# ===== READ PATH UNTUK LIST ENDPOINT =====
+# FieldSerializer tetap dipakai untuk validasi POST dan detail. Untuk list, dict dibangun
+# langsung dari .values() + map facility agar tidak melewati mesin field DRF per baris.
+
+# Kolom output dengan urutan yang sama seperti FieldSerializer
+FIELD_READ_COLUMNS = [
+    'id', 'name', 'image', 'price', 'rating', 'location', 'sport', 'url', 'latitude', 'longitude', 'updated_at',
+]
+FIELD_READ_FIELDS = FIELD_READ_COLUMNS + ['facilities']
+
+
+def parse_sparse_fields(value):
+    """
+    Parsing parameter `?fields=name,image,price` menjadi list field output.
+    `id` selalu disertakan, nama yang tidak dikenal diabaikan.
+    Tanpa parameter (atau tidak ada nama yang valid) -> semua field.
+    """
+    requested = {name.strip() for name in (value or '').split(',')} & set(FIELD_READ_FIELDS)
+    if not requested:
+        return FIELD_READ_FIELDS
+    return [name for name in FIELD_READ_FIELDS if name == 'id' or name in requested]
+
+
+def get_facility_map(field_ids):
+    """
+    {field_id: [{"id", "name"}, ...]} untuk sekumpulan field dalam satu query.
+    """
+    facility_map = {}
+    Through = Field.facilities.through
+    for field_id, facility_id, facility_name in (
+        Through.objects.filter(field_id__in=field_ids)
+        .order_by('facility_id')
+        .values_list('field_id', 'facility_id', 'facility__name')
+    ):
+        facility_map.setdefault(field_id, []).append({'id': facility_id, 'name': facility_name})
+    return facility_map
+
+
+def serialize_field_rows(rows, fields=FIELD_READ_FIELDS):
+    """
+    Mengubah dict hasil .values(*FIELD_READ_COLUMNS) menjadi output JSON list API.
+    Facilities hanya di-query jika diminta.
+    """
+    facility_map = get_facility_map([row['id'] for row in rows]) if 'facilities' in fields else {}
+    columns = [name for name in fields if name != 'facilities']
+
+    data = []
+    for row in rows:
+        item = {name: row[name] for name in columns}
+        if 'facilities' in fields:
+            item['facilities'] = facility_map.get(row['id'], [])
+        data.append(item)
+    return data
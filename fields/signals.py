@@ -0,0 +1,50 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from fields import stats
+from fields.cache import bump_catalog_version
+from fields.models import Facility, Field
+
+
+@receiver(post_save, sender=Field)
+@receiver(post_delete, sender=Field)
+@receiver(post_save, sender=Facility)
+@receiver(post_delete, sender=Facility)
+def invalidate_catalog_on_write(sender, **kwargs):
+    # Versi dinaikkan setelah commit agar pembaca yang bersamaan tidak meng-cache data
+    # sebelum commit di versi baru (sama seperti fields/batch.py)
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(m2m_changed, sender=Field.facilities.through)
+def invalidate_catalog_on_facilities_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(bump_catalog_version)
+
+
+# ===== STATISTIK KATALOG =====
+
+@receiver(pre_save, sender=Field)
+def remember_previous_stats(sender, instance, raw=False, **kwargs):
+    # Simpan nilai lama agar post_save bisa menghitung selisihnya
+    instance._previous_stats = None
+    if instance.pk and not raw:
+        instance._previous_stats = (
+            Field.objects.filter(pk=instance.pk).values_list('sport', 'price', 'rating').first()
+        )
+
+
+@receiver(post_save, sender=Field)
+def update_stats_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_stats', None)
+    if previous:
+        stats.add_field(*previous, sign=-1)
+    stats.add_field(instance.sport, instance.price, instance.rating)
+
+
+@receiver(post_delete, sender=Field)
+def update_stats_on_delete(sender, instance, **kwargs):
+    stats.add_field(instance.sport, instance.price, instance.rating, sign=-1)
@@ -0,0 +1,65 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from fields.models import Field, FieldStats
+
+
+def apply_delta(sport, count, price, rating):
+    """
+    Tambahkan selisih (jumlah, harga, rating) ke baris statistik sport secara atomic.
+    """
+    updated = FieldStats.objects.filter(sport=sport).update(
+        field_count=F('field_count') + count,
+        price_sum=F('price_sum') + price,
+        rating_sum=F('rating_sum') + rating,
+    )
+    if updated:
+        return
+
+    # Baris sport belum ada; jika dibuat bersamaan oleh request lain, ulangi update
+    try:
+        with transaction.atomic():
+            FieldStats.objects.create(sport=sport, field_count=count, price_sum=price, rating_sum=rating)
+    except IntegrityError:
+        apply_delta(sport, count, price, rating)
+
+
+def add_field(sport, price, rating, sign=1):
+    apply_delta(sport, sign, sign * int(price), sign * float(rating))
+
+
+@transaction.atomic
+def rebuild_field_stats():
+    """
+    Hitung ulang seluruh statistik dari tabel Field (untuk bulk write atau perbaikan data).
+    """
+    rows = Field.objects.order_by().values('sport').annotate(
+        field_count=Count('id'), price_sum=Sum('price'), rating_sum=Sum('rating')
+    )
+    FieldStats.objects.all().delete()
+    FieldStats.objects.bulk_create([FieldStats(**row) for row in rows])
+
+
+def get_catalog_stats():
+    """
+    Statistik seluruh katalog dari tabel FieldStats (satu query kecil, tanpa membaca Field).
+    Mengembalikan dict: total, avg_price, avg_rating, dan rincian per sport.
+    """
+    total = price_sum = rating_sum = 0
+    sports = {}
+    for row in FieldStats.objects.filter(field_count__gt=0):
+        total += row.field_count
+        price_sum += row.price_sum
+        rating_sum += row.rating_sum
+        sports[row.sport] = {
+            'total': row.field_count,
+            'avg_price': round(row.price_sum / row.field_count, 2),
+            'avg_rating': round(row.rating_sum / row.field_count, 2),
+        }
+
+    return {
+        'total': total,
+        'avg_price': round(price_sum / total, 2) if total else 0,
+        'avg_rating': round(rating_sum / total, 2) if total else 0,
+        'sports': sports,
+    }
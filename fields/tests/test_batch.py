@@ -0,0 +1,162 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from fields.batch import BATCH_MAX_OPERATIONS, BatchConflict, FieldBatch
+from fields.models import Field, Facility
+from fields.stats import get_catalog_stats
+
+
+def field_data(name, **extra):
+    return {
+        "name": name, "image": "img.jpg", "price": 100000, "rating": 4.0,
+        "location": "Kota Depok, Jawa Barat", "sport": "futsal",
+        "url": f"https://example.com/{name}", **extra,
+    }
+
+
+class FieldBatchApiTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="password123", is_staff=True)
+        self.client.force_login(self.admin)
+        self.toilet = Facility.objects.create(name="Toilet")
+        self.parkir = Facility.objects.create(name="Parkir")
+        self.existing = Field.objects.create(**field_data("Lama"))
+        self.existing.facilities.set([self.toilet])
+        self.doomed = Field.objects.create(**field_data("Hapus", sport="padel", price=300000))
+        self.url = reverse("api_fields:batch")
+
+    def post(self, operations):
+        return self.client.post(self.url, {"operations": operations}, content_type="application/json")
+
+    def test_mixed_operations(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post([
+                {"action": "create", "data": field_data("Baru", facilities=[self.toilet.id, self.parkir.id])},
+                {"action": "update", "id": self.existing.id, "data": {"price": 200000, "facilities": [self.parkir.id]}},
+                {"action": "delete", "id": self.doomed.id},
+            ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["data"]["results"]
+        self.assertEqual([result["status"] for result in results], ["success"] * 3)
+        self.assertEqual([result["action"] for result in results], ["create", "update", "delete"])
+
+        created = Field.objects.get(name="Baru")
+        self.assertEqual(results[0]["id"], created.id)
+        self.assertEqual(results[0]["data"]["facilities"], [
+            {"id": self.toilet.id, "name": "Toilet"}, {"id": self.parkir.id, "name": "Parkir"},
+        ])
+        self.assertEqual((created.latitude, created.longitude), (-6.4025, 106.7942))
+
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.price, 200000)
+        self.assertEqual(self.existing.name, "Lama")
+        self.assertEqual(list(self.existing.facilities.all()), [self.parkir])
+        self.assertFalse(Field.objects.filter(id=self.doomed.id).exists())
+
+        stats = get_catalog_stats()
+        self.assertEqual(stats["total"], 2)
+        self.assertEqual(stats["avg_price"], 150000)
+        self.assertNotIn("padel", stats["sports"])
+
+    def test_invalid_item_rolls_back_everything(self):
+        response = self.post([
+            {"action": "create", "data": field_data("Baru")},
+            {"action": "update", "id": self.existing.id, "data": {"rating": 9}},
+            {"action": "create", "data": field_data("Lain", facilities=[999])},
+            {"action": "delete", "id": 12345},
+            {"action": "rename"},
+        ])
+        self.assertEqual(response.status_code, 400)
+        results = response.json()["data"]["results"]
+        self.assertNotIn("status", results[0])
+        self.assertIn("rating", results[1]["errors"])
+        self.assertIn("facilities", results[2]["errors"])
+        self.assertIn("id", results[3]["errors"])
+        self.assertIn("action", results[4]["errors"])
+        self.assertEqual(Field.objects.count(), 2)
+        self.assertEqual(Field.objects.get(id=self.existing.id).rating, 4.0)
+
+    def test_update_keeps_concurrent_edits(self):
+        batch = FieldBatch([{"action": "update", "id": self.existing.id, "data": {"price": 200000}}])
+        self.assertTrue(batch.validate())
+        # Diubah request lain di antara validasi dan penulisan
+        Field.objects.filter(id=self.existing.id).update(name="Diubah", rating=4.5)
+        batch.apply()
+
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.price, 200000)
+        self.assertEqual(self.existing.name, "Diubah")
+        self.assertEqual(self.existing.rating, 4.5)
+
+    def test_target_deleted_after_validation_rolls_back_everything(self):
+        for action in ("update", "delete"):
+            target = Field.objects.create(**field_data(f"Target {action}"))
+            operation = {"action": action, "id": target.id}
+            if action == "update":
+                operation["data"] = {"price": 1}
+            batch = FieldBatch([
+                {"action": "create", "data": field_data(f"Baru {action}")},
+                {"action": "update", "id": self.existing.id, "data": {"price": 200000}},
+                operation,
+            ])
+            self.assertTrue(batch.validate())
+            # Dihapus request lain di antara validasi dan penulisan
+            target.delete()
+            with self.assertRaises(BatchConflict):
+                batch.apply()
+
+            self.assertIn("id", batch.results[2]["errors"])
+            self.assertFalse(Field.objects.filter(name=f"Baru {action}").exists())
+            self.assertEqual(Field.objects.get(id=self.existing.id).price, 100000)
+
+    def test_conflict_returns_409_with_results(self):
+        real_apply = FieldBatch.apply
+
+        def apply_after_delete(batch):
+            Field.objects.filter(id=self.doomed.id).delete()
+            return real_apply(batch)
+
+        with mock.patch.object(FieldBatch, "apply", apply_after_delete):
+            response = self.post([
+                {"action": "update", "id": self.existing.id, "data": {"price": 200000}},
+                {"action": "delete", "id": self.doomed.id},
+            ])
+        self.assertEqual(response.status_code, 409)
+        results = response.json()["data"]["results"]
+        self.assertNotIn("status", results[0])
+        self.assertEqual(results[1]["status"], "error")
+        self.assertEqual(Field.objects.get(id=self.existing.id).price, 100000)
+
+    def test_duplicate_target_is_rejected(self):
+        response = self.post([
+            {"action": "update", "id": self.existing.id, "data": {"price": 1}},
+            {"action": "delete", "id": self.existing.id},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("id", response.json()["data"]["results"][1]["errors"])
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        def run(count):
+            operations = [
+                {"action": "create", "data": field_data(f"Baru {count} {i}", facilities=[self.toilet.id])}
+                for i in range(count)
+            ]
+            with self.assertNumQueries(10):
+                self.assertEqual(self.post(operations).status_code, 200)
+
+        # session, user, facility lookup, savepoint, insert field, insert facilities,
+        # update statistik, release, read back + map facilities
+        run(5)
+        run(50)
+
+    def test_limits_and_permissions(self):
+        self.assertEqual(self.post([]).status_code, 400)
+        too_many = [{"action": "delete", "id": self.doomed.id}] * (BATCH_MAX_OPERATIONS + 1)
+        self.assertEqual(self.post(too_many).status_code, 400)
+
+        user = User.objects.create_user(username="user", password="password123")
+        self.client.force_login(user)
+        self.assertEqual(self.post([{"action": "delete", "id": self.doomed.id}]).status_code, 403)
+        self.assertTrue(Field.objects.filter(id=self.doomed.id).exists())
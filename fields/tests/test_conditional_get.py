@@ -0,0 +1,111 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from fields.importer import FieldImporter
+from fields.models import Field, Facility
+
+
+class CatalogConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username="user", password="password123")
+        self.client.force_login(user)
+        self.field = Field.objects.create(
+            name="Lapangan A", image="img.jpg", price=100000, rating=4.0,
+            location="Kota Depok, Jawa Barat", sport="futsal", url="https://example.com/a",
+        )
+
+    def assertConditional(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn("Last-Modified", response)
+
+        # 304 tanpa query katalog (hanya session + user untuk autentikasi)
+        with self.assertNumQueries(2):
+            response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        return etag
+
+    def test_list_detail_facilities_and_facets(self):
+        self.assertConditional(reverse("api_fields:list"), {"category": "futsal"})
+        self.assertConditional(reverse("api_fields:detail", args=[self.field.pk]))
+        self.assertConditional(reverse("api_fields:facility-list"))
+        self.assertConditional(reverse("api_fields:facets"))
+
+    def test_etag_depends_on_query_params(self):
+        url = reverse("api_fields:list")
+        etag = self.assertConditional(url, {"page": 1, "category": "futsal"})
+        same = self.client.get(url, {"category": "futsal", "page": 1})["ETag"]
+        other = self.client.get(url, {"category": "padel"})["ETag"]
+        self.assertEqual(etag, same)
+        self.assertNotEqual(etag, other)
+
+    def test_catalog_write_changes_etag(self):
+        url = reverse("api_fields:list")
+        etag = self.assertConditional(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.field.price = 150000
+            self.field.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Facility.objects.create(name="Shower")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_writes_ignore_replayed_etag(self):
+        admin = User.objects.create_user(username="admin", password="password123", is_staff=True)
+        self.client.force_login(admin)
+        url = reverse("api_fields:detail", args=[self.field.pk])
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.post(url, {"price": 150000}, content_type="application/json", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.field.refresh_from_db()
+        self.assertEqual(self.field.price, 150000)
+
+        response = self.client.post(
+            reverse("api_fields:list"), {"name": "Lapangan B"}, content_type="application/json", HTTP_IF_NONE_MATCH="*",
+        )
+        self.assertNotEqual(response.status_code, 412)
+
+    def test_unauthenticated_request_is_rejected(self):
+        etag = self.client.get(reverse("api_fields:list"))["ETag"]
+        self.client.logout()
+        response = self.client.get(reverse("api_fields:list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 403)
+
+
+class UpdatedAtTest(TestCase):
+    def test_save_and_import_touch_updated_at(self):
+        row = {
+            "name": "A", "image": "img.jpg", "price": "1000", "rating": "4.5",
+            "location": "·Kota Depok, Jawa Barat", "sport": "Futsal",
+            "url": "https://example.com/a", "facilities": ["Toilet"],
+        }
+        FieldImporter().run([row])
+        field = Field.objects.get()
+        created_at = field.updated_at
+        self.assertIsNotNone(created_at)
+        self.assertIsNotNone(Facility.objects.get().updated_at)
+
+        # Baris yang tidak berubah tidak menyentuh updated_at
+        FieldImporter().run([row])
+        field.refresh_from_db()
+        self.assertEqual(field.updated_at, created_at)
+
+        FieldImporter().run([{**row, "facilities": []}])
+        field.refresh_from_db()
+        self.assertGreater(field.updated_at, created_at)
+
+        previous = field.updated_at
+        field.price = 2000
+        field.save()
+        self.assertGreater(field.updated_at, previous)
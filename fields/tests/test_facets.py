@@ -0,0 +1,107 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import QueryDict
+from django.test import TestCase
+from django.urls import reverse
+from fields.cache import get_catalog_version
+from fields.facets import get_facets, normalize_filters
+from fields.models import Field, Facility
+
+
+class FieldFacetsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.toilet = Facility.objects.create(name="Toilet")
+        self.parkir = Facility.objects.create(name="Parkir")
+
+        self.futsal = self.make_field("Futsal A", "futsal", 40000, [self.toilet, self.parkir])
+        self.make_field("Futsal B", "futsal", 150000, [self.toilet])
+        self.make_field("Padel Depok", "padel", 600000, [])
+
+    def make_field(self, name, sport, price, facilities):
+        field = Field.objects.create(
+            name=name, image="img.jpg", price=price, rating=4.0,
+            location="Depok", sport=sport, url=f"https://example.com/{name}",
+        )
+        field.facilities.set(facilities)
+        return field
+
+    def facets(self, query=""):
+        return get_facets(QueryDict(query))
+
+    def sport_count(self, facets, sport):
+        return next(item["count"] for item in facets["sports"] if item["value"] == sport)
+
+    def test_counts_without_filter(self):
+        facets = self.facets()
+        self.assertEqual(self.sport_count(facets, "futsal"), 2)
+        self.assertEqual(self.sport_count(facets, "padel"), 1)
+        self.assertEqual(self.sport_count(facets, "golf"), 0)
+        self.assertEqual([bucket["count"] for bucket in facets["price_buckets"]], [1, 0, 1, 0, 1])
+        self.assertEqual(
+            {item["name"]: item["count"] for item in facets["facilities"]},
+            {"Toilet": 2, "Parkir": 1},
+        )
+
+    def test_facet_ignores_its_own_filter(self):
+        facets = self.facets("category=futsal&max_price=100000")
+        # Hitungan sport tidak dibatasi kategori, tapi tetap dibatasi harga
+        self.assertEqual(self.sport_count(facets, "futsal"), 1)
+        self.assertEqual(self.sport_count(facets, "padel"), 0)
+        # Histogram harga tidak dibatasi harga, tapi tetap dibatasi kategori
+        self.assertEqual([bucket["count"] for bucket in facets["price_buckets"]], [1, 0, 1, 0, 0])
+        self.assertEqual({item["name"]: item["count"] for item in facets["facilities"]}, {"Toilet": 1, "Parkir": 1})
+
+    def test_search_filter(self):
+        facets = self.facets("search=padel&facility=%d" % self.toilet.id)
+        self.assertEqual(self.sport_count(facets, "padel"), 0)
+        self.assertEqual({item["name"]: item["count"] for item in facets["facilities"]}, {"Toilet": 0, "Parkir": 0})
+
+    def test_equivalent_filters_share_cache_key(self):
+        self.assertEqual(
+            normalize_filters(QueryDict("category=Futsal&search=  Arena  Depok&page=3&facility=2&facility=1")),
+            normalize_filters(QueryDict("facility=1&facility=2&search=arena depok&category=futsal")),
+        )
+
+    def test_cached_until_catalog_changes(self):
+        with self.assertNumQueries(3):
+            self.facets("category=futsal")
+        with self.assertNumQueries(0):
+            self.facets("category=futsal")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.futsal.sport = "padel"
+            self.futsal.save()
+        with self.assertNumQueries(3):
+            facets = self.facets("category=futsal")
+        self.assertEqual(self.sport_count(facets, "padel"), 2)
+
+    def test_facility_write_invalidates_cache(self):
+        self.facets()
+        with self.captureOnCommitCallbacks(execute=True):
+            Facility.objects.create(name="Shower")
+        self.assertIn("Shower", [item["name"] for item in self.facets()["facilities"]])
+
+    def test_catalog_version_bumped_only_after_commit(self):
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.futsal.price = 45000
+            self.futsal.save()
+            self.futsal.facilities.remove(self.parkir)
+            Facility.objects.create(name="Shower")
+            # Selama transaksi belum commit, versi katalog tidak boleh berubah
+            self.assertEqual(get_catalog_version(), version)
+        self.assertEqual(get_catalog_version(), version)
+
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_catalog_version(), version)
+
+    def test_facets_endpoint(self):
+        user = User.objects.create_user(username="user", password="password123")
+        self.client.force_login(user)
+        response = self.client.get(reverse("api_fields:facets"), {"category": "padel"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual(self.sport_count(data, "futsal"), 2)
+        self.assertEqual([bucket["count"] for bucket in data["price_buckets"]], [0, 0, 0, 0, 1])
@@ -0,0 +1,134 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from fields.geo import cell_for, cells_within, geocode_location, haversine_km, parse_near
+from fields.importer import FieldImporter
+from fields.models import Field
+
+# Titik di Jakarta Selatan untuk query "near me"
+JAKSEL = (-6.2615, 106.8106)
+
+
+def make_field(name, location):
+    return Field.objects.create(
+        name=name, image="img.jpg", price=100000, rating=4.0,
+        location=location, sport="futsal", url=f"https://example.com/{name}",
+    )
+
+
+class GeoHelperTest(TestCase):
+    def test_geocode_location(self):
+        self.assertEqual(geocode_location("Kota Depok, Jawa Barat"), (-6.4025, 106.7942))
+        self.assertEqual(geocode_location("·kota depok, Jawa Barat"), (-6.4025, 106.7942))
+        self.assertIsNone(geocode_location("Atlantis"))
+
+    def test_haversine(self):
+        # Jakarta Selatan - Depok sekitar 16 km
+        distance = haversine_km(*JAKSEL, -6.4025, 106.7942)
+        self.assertAlmostEqual(distance, 15.8, delta=0.5)
+
+    def test_cells_cover_radius(self):
+        cells = cells_within(*JAKSEL, 20)
+        self.assertIn(cell_for(*JAKSEL), cells)
+        self.assertIn(cell_for(-6.4025, 106.7942), cells)
+        self.assertNotIn(cell_for(-6.9175, 107.6191), cells)
+
+    def test_parse_near(self):
+        self.assertEqual(parse_near("-6.2,106.8", "5"), (-6.2, 106.8, 5.0))
+        self.assertEqual(parse_near("-6.2,106.8")[2], 10)
+        for near, radius in [("abc", None), ("-6.2", None), ("95,106", None), ("-6.2,106.8", "0"), ("-6.2,106.8", "1000")]:
+            with self.assertRaises(ValueError):
+                parse_near(near, radius)
+
+
+class FieldCoordinatesTest(TestCase):
+    def test_save_assigns_coordinates(self):
+        field = make_field("A", "Kota Depok, Jawa Barat")
+        self.assertEqual((field.latitude, field.longitude), (-6.4025, 106.7942))
+        self.assertEqual(field.geo_cell, cell_for(-6.4025, 106.7942))
+
+        field.location = "Kota Bandung, Jawa Barat"
+        field.save(update_fields=["location"])
+        field.refresh_from_db()
+        self.assertEqual((field.latitude, field.longitude), (-6.9175, 107.6191))
+
+    def test_unknown_location_keeps_manual_coordinates(self):
+        field = Field(
+            name="A", image="img.jpg", price=1, rating=4.0, location="Atlantis",
+            sport="futsal", url="a", latitude=-6.3, longitude=106.9,
+        )
+        field.save()
+        self.assertEqual(field.geo_cell, cell_for(-6.3, 106.9))
+
+    def test_location_changed_to_unknown_clears_coordinates(self):
+        make_field("A", "Kota Depok, Jawa Barat")
+        field = Field.objects.get(name="A")
+        field.location = "Atlantis"
+        field.save()
+        field.refresh_from_db()
+        self.assertIsNone(field.latitude)
+        self.assertIsNone(field.longitude)
+        self.assertIsNone(field.geo_cell)
+
+    def test_deferred_location_keeps_manual_coordinates(self):
+        field = make_field("A", "Atlantis")
+        Field.objects.filter(pk=field.pk).update(latitude=-6.3, longitude=106.9)
+        for queryset in (Field.objects.defer("location"), Field.objects.only("price", "latitude", "longitude")):
+            field = queryset.get(pk=field.pk)
+            field.price = 2
+            field.save()
+            field = Field.objects.get(pk=field.pk)
+            self.assertEqual((field.latitude, field.longitude), (-6.3, 106.9))
+            self.assertEqual(field.geo_cell, cell_for(-6.3, 106.9))
+
+    def test_import_assigns_coordinates(self):
+        FieldImporter().run([{
+            "name": "A", "image": "img.jpg", "price": "1000", "rating": "4.5",
+            "location": "·Kota Surabaya, Jawa Timur", "sport": "Futsal",
+            "url": "https://example.com/a", "facilities": [],
+        }])
+        field = Field.objects.get()
+        self.assertEqual((field.latitude, field.longitude), (-7.2575, 112.7521))
+        self.assertEqual(field.geo_cell, cell_for(-7.2575, 112.7521))
+
+
+class NearbyFieldApiTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="user", password="password123")
+        self.client.force_login(user)
+        self.depok = make_field("Depok Arena", "Kota Depok, Jawa Barat")
+        self.jaksel = make_field("Jaksel Arena", "Kota Jakarta Selatan, DKI Jakarta")
+        self.bandung = make_field("Bandung Arena", "Kota Bandung, Jawa Barat")
+        make_field("Unknown Arena", "Atlantis")
+
+    def get(self, **params):
+        return self.client.get(reverse("api_fields:list"), params)
+
+    def test_sorted_by_distance_within_radius(self):
+        response = self.get(near="%s,%s" % JAKSEL, radius_km=30)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual([item["name"] for item in data["fields"]], ["Jaksel Arena", "Depok Arena"])
+        self.assertEqual(data["fields"][0]["distance_km"], 0)
+        self.assertAlmostEqual(data["fields"][1]["distance_km"], 15.8, delta=0.5)
+        self.assertEqual(data["meta"]["total_data"], 2)
+        self.assertNotIn("geo_cell", data["fields"][0])
+
+    def test_radius_bounds_results(self):
+        data = self.get(near="%s,%s" % JAKSEL, radius_km=5).json()["data"]
+        self.assertEqual([item["name"] for item in data["fields"]], ["Jaksel Arena"])
+
+    def test_combined_with_filters_and_pages(self):
+        data = self.get(near="%s,%s" % JAKSEL, radius_km=100, search="arena", per_page=1, page=2).json()["data"]
+        self.assertEqual([item["name"] for item in data["fields"]], ["Depok Arena"])
+        self.assertEqual(data["meta"]["total_pages"], 2)
+
+    def test_invalid_near(self):
+        response = self.get(near="jakarta")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["status"], "error")
+
+    def test_query_count(self):
+        # session, user, kandidat lewat geo_cell, halaman, prefetch facilities
+        with self.assertNumQueries(5):
+            self.get(near="%s,%s" % JAKSEL, radius_km=50)
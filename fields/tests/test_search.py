@@ -0,0 +1,91 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from fields.checks import check_search_triggers
+from fields.models import Field
+from fields.search import IContainsSearchBackend, SQLiteSearchBackend, get_search_backend, search_fields, tokenize
+
+
+def make_field(name, location="Kota Depok, Jawa Barat", **kwargs):
+    defaults = dict(image="img.jpg", price=100000, rating=4.5, sport="futsal", url=f"https://example.com/{name}")
+    defaults.update(kwargs)
+    return Field.objects.create(name=name, location=location, **defaults)
+
+
+class TokenizeTest(TestCase):
+    def test_strips_syntax_characters(self):
+        self.assertEqual(tokenize('Futsal "AND" OR* (Depok)'), ["futsal", "and", "or", "depok"])
+
+    def test_empty_query(self):
+        self.assertEqual(tokenize("  -- "), [])
+
+
+class FieldSearchTest(TestCase):
+    def setUp(self):
+        self.arena = make_field("Arena Futsal Senayan", location="Kota Jakarta Selatan, Daerah Khusus Ibukota Jakarta")
+        self.depok = make_field("Depok Badminton Hall", sport="badminton")
+        self.padel = make_field("Padel Club", location="Kota Bandung, Jawa Barat")
+
+    def names(self, query):
+        return [field.name for field in search_fields(Field.objects.all(), query)]
+
+    def test_sqlite_uses_fts_backend(self):
+        self.assertIsInstance(get_search_backend(), SQLiteSearchBackend)
+
+    def test_triggers_exist_after_migrate(self):
+        self.assertEqual(check_search_triggers(None, databases=["default"]), [])
+
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER fields_field_fts_update")
+        errors = check_search_triggers(None, databases=["default"])
+        self.assertEqual([error.id for error in errors], ["fields.E001"])
+        self.assertIn("fields_field_fts_update", errors[0].msg)
+
+    def test_matches_name_and_location(self):
+        self.assertEqual(self.names("senayan"), ["Arena Futsal Senayan"])
+        self.assertEqual(self.names("bandung"), ["Padel Club"])
+
+    def test_prefix_match_for_as_you_type(self):
+        self.assertEqual(self.names("bad"), ["Depok Badminton Hall"])
+        self.assertEqual(self.names("jakarta sel"), ["Arena Futsal Senayan"])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self.names("padel jakarta"), [])
+
+    def test_ranked_by_relevance(self):
+        # "Depok" muncul di nama dan lokasi, sehingga lebih relevan dari field lain di Depok
+        make_field("Lapangan Mini Soccer")
+        self.assertEqual(self.names("depok")[0], "Depok Badminton Hall")
+
+    def test_index_follows_update_and_delete(self):
+        self.padel.name = "Pickleball Center"
+        self.padel.save()
+        self.assertEqual(self.names("padel"), [])
+        self.assertEqual(self.names("pickle"), ["Pickleball Center"])
+
+        self.padel.delete()
+        self.assertEqual(self.names("pickle"), [])
+
+    def test_icontains_fallback_matches_same_fields(self):
+        results = IContainsSearchBackend().search(Field.objects.all(), "arena sel")
+        self.assertEqual([field.name for field in results], ["Arena Futsal Senayan"])
+
+
+class FieldSearchViewsTest(TestCase):
+    def setUp(self):
+        make_field("Arena Futsal Senayan", location="Kota Jakarta Selatan, Daerah Khusus Ibukota Jakarta")
+        make_field("Padel Club", location="Kota Bandung, Jawa Barat", sport="padel")
+        self.user = User.objects.create_user(username="user", password="password123")
+        self.client.force_login(self.user)
+
+    def test_api_search(self):
+        response = self.client.get(reverse("api_fields:list"), {"search": "band"})
+        fields = response.json()["data"]["fields"]
+        self.assertEqual([field["name"] for field in fields], ["Padel Club"])
+        self.assertEqual(response.json()["data"]["meta"]["total_data"], 1)
+
+    def test_main_search_fields(self):
+        response = self.client.get(reverse("main:search_fields"), {"q": "arena"})
+        self.assertContains(response, "Arena Futsal Senayan")
+        self.assertNotContains(response, "Padel Club")
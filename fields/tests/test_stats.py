@@ -0,0 +1,91 @@
+import io
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from fields.models import Field, FieldStats
+from fields.stats import get_catalog_stats
+
+
+def make_field(name, sport="futsal", price=100000, rating=4.0):
+    return Field.objects.create(
+        name=name, image="img.jpg", price=price, rating=rating,
+        location="Jakarta", sport=sport, url=f"https://example.com/{name}",
+    )
+
+
+class FieldStatsTest(TestCase):
+    def assertStatsMatchTable(self):
+        stats = get_catalog_stats()
+        fields = list(Field.objects.all())
+        self.assertEqual(stats["total"], len(fields))
+        if fields:
+            self.assertAlmostEqual(stats["avg_price"], sum(f.price for f in fields) / len(fields), places=2)
+            self.assertAlmostEqual(stats["avg_rating"], sum(f.rating for f in fields) / len(fields), places=2)
+
+    def test_create_updates_stats(self):
+        make_field("A", price=100000, rating=4.0)
+        make_field("B", price=200000, rating=5.0)
+        make_field("C", sport="padel", price=300000, rating=3.0)
+
+        stats = get_catalog_stats()
+        self.assertEqual(stats["total"], 3)
+        self.assertEqual(stats["avg_price"], 200000)
+        self.assertEqual(stats["avg_rating"], 4.0)
+        self.assertEqual(stats["sports"]["futsal"], {"total": 2, "avg_price": 150000, "avg_rating": 4.5})
+        self.assertEqual(stats["sports"]["padel"]["total"], 1)
+
+    def test_update_moves_values_between_sports(self):
+        field = make_field("A", price=100000, rating=4.0)
+        make_field("B", sport="padel", price=300000, rating=2.0)
+
+        field.sport = "padel"
+        field.price = 500000
+        field.save()
+
+        stats = get_catalog_stats()
+        self.assertNotIn("futsal", stats["sports"])
+        self.assertEqual(stats["sports"]["padel"], {"total": 2, "avg_price": 400000, "avg_rating": 3.0})
+        self.assertStatsMatchTable()
+
+    def test_delete_updates_stats(self):
+        field = make_field("A")
+        make_field("B", price=300000)
+        field.delete()
+        self.assertEqual(get_catalog_stats()["avg_price"], 300000)
+        self.assertStatsMatchTable()
+
+    def test_empty_catalog(self):
+        self.assertEqual(get_catalog_stats(), {"total": 0, "avg_price": 0, "avg_rating": 0, "sports": {}})
+
+    def test_rebuild_command(self):
+        make_field("A")
+        make_field("B", sport="padel")
+        FieldStats.objects.update(field_count=99, price_sum=0)
+
+        out = io.StringIO()
+        call_command("rebuild_field_stats", stdout=out)
+        self.assertIn("2 fields in 2 sports", out.getvalue())
+        self.assertStatsMatchTable()
+
+
+class FieldListMetaStatsTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="user", password="password123")
+        self.client.force_login(user)
+        make_field("A", price=100000, rating=4.0)
+        make_field("B", sport="padel", price=200000, rating=5.0)
+
+    def test_unfiltered_meta_reads_stats_table(self):
+        # Statistik yang sengaja dibuat berbeda membuktikan meta dibaca dari FieldStats
+        FieldStats.objects.filter(sport="padel").update(price_sum=400000)
+        meta = self.client.get(reverse("api_fields:list")).json()["data"]["meta"]
+        self.assertEqual(meta["total_data"], 2)
+        self.assertEqual(meta["avg_price"], 250000)
+
+    def test_filtered_meta_uses_aggregate(self):
+        FieldStats.objects.filter(sport="padel").update(price_sum=400000)
+        meta = self.client.get(reverse("api_fields:list"), {"category": "padel"}).json()["data"]["meta"]
+        self.assertEqual(meta["total_data"], 1)
+        self.assertEqual(meta["avg_price"], 200000)
@@ -0,0 +1,104 @@
+import io
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from fields.models import Field, Facility
+from fields.serializers import FieldSerializer
+
+
+class FieldListApiTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user", password="password123")
+        self.client.force_login(self.user)
+        self.toilet = Facility.objects.create(name="Toilet")
+        self.parkir = Facility.objects.create(name="Parkir")
+
+        # 25 field dengan nama berurutan; dua field terakhir punya nama yang sama
+        for i in range(25):
+            field = Field.objects.create(
+                name=f"Lapangan {min(i, 23):02d}",
+                image="img.jpg",
+                price=10000 * (i + 1),
+                rating=4.0,
+                location="Jakarta",
+                sport="futsal",
+                url=f"https://example.com/{i}",
+            )
+            field.facilities.set([self.toilet, self.parkir])
+
+        self.url = reverse("api_fields:list")
+
+    def get(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["data"]
+
+    def test_meta_shape_and_values(self):
+        meta = self.get(per_page=10, page=2)["meta"]
+        self.assertEqual(meta["total_data"], 25)
+        self.assertEqual(meta["total_pages"], 3)
+        self.assertEqual(meta["current_page"], 2)
+        self.assertEqual(meta["avg_price"], 130000)
+        self.assertEqual(meta["avg_rating"], 4.0)
+        self.assertIsNotNone(meta["next_cursor"])
+
+    def test_out_of_range_page_returns_last_page(self):
+        data = self.get(per_page=10, page=99)
+        self.assertEqual(data["meta"]["current_page"], 3)
+        self.assertEqual(len(data["fields"]), 5)
+        self.assertIsNone(data["meta"]["next_cursor"])
+
+    def test_invalid_page_returns_first_page(self):
+        data = self.get(per_page=10, page="abc")
+        self.assertEqual(data["meta"]["current_page"], 1)
+        self.assertEqual(data["fields"][0]["name"], "Lapangan 00")
+
+    def test_facilities_are_serialized(self):
+        field = self.get(per_page=1)["fields"][0]
+        self.assertEqual({facility["name"] for facility in field["facilities"]}, {"Toilet", "Parkir"})
+
+    def test_query_count_is_constant(self):
+        # session + user + aggregate + page + map facilities
+        with self.assertNumQueries(5):
+            self.get(per_page=20)
+
+    def test_matches_field_serializer_output(self):
+        fields = self.get(per_page=25)["fields"]
+        expected = FieldSerializer(Field.objects.order_by("name", "id"), many=True).data
+        self.assertEqual(fields, [dict(item) for item in expected])
+        self.assertEqual(list(fields[0]), list(expected[0]))
+
+    def test_sparse_fieldset(self):
+        field = self.get(per_page=1, fields="name,image,price,rating,unknown")["fields"][0]
+        self.assertEqual(list(field), ["id", "name", "image", "price", "rating"])
+        # Tanpa facilities tidak ada query map facilities
+        with self.assertNumQueries(4):
+            self.get(per_page=20, fields="name,price")
+        # Cursor tetap berfungsi walau name tidak diminta
+        data = self.get(per_page=20, fields="price")
+        self.assertEqual(len(self.get(per_page=20, fields="price", cursor=data["meta"]["next_cursor"])["fields"]), 5)
+
+    def test_benchmark_command(self):
+        out = io.StringIO()
+        call_command("benchmark_field_serializers", per_page=10, repeat=1, stdout=out)
+        self.assertIn("Benchmarked 10 fields/page", out.getvalue())
+
+    def test_cursor_walks_all_rows_without_duplicates(self):
+        seen = []
+        data = self.get(per_page=7)
+        seen += [field["id"] for field in data["fields"]]
+        while data["meta"]["next_cursor"]:
+            with self.assertNumQueries(5):
+                data = self.get(per_page=7, cursor=data["meta"]["next_cursor"])
+            self.assertIsNone(data["meta"]["current_page"])
+            seen += [field["id"] for field in data["fields"]]
+
+        expected = list(Field.objects.order_by("name", "id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_falls_back_to_page(self):
+        data = self.get(per_page=10, cursor="not-a-cursor")
+        self.assertEqual(data["meta"]["current_page"], 1)
+        self.assertEqual(len(data["fields"]), 10)
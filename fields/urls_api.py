@@ -6,5 +6,7 @@ app_name = 'api_fields'
 urlpatterns = [
     path('', views_api.field_list_api, name='list'),
     path('facilities/', views_api.facility_list_api, name='facility-list'),
+    path('facets/', views_api.field_facets_api, name='facets'),
+    path('batch/', views_api.field_batch_api, name='batch'),
     path('<int:pk>/', views_api.field_detail_api, name='detail'),
 ]
\ No newline at end of file
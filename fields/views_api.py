@@ -1,13 +1,26 @@
-from django.db.models import Q, Avg
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+import base64
+import hashlib
+import json
+import math
+from functools import wraps
+from django.db.models import Avg, Count, Q
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition
 from fields.models import Field, Facility
-from fields.serializers import FieldSerializer, FacilitySerializer
+from fields.serializers import (
+    FieldSerializer, FacilitySerializer, FIELD_READ_COLUMNS, parse_sparse_fields, serialize_field_rows,
+)
+from fields.search import search_fields
+from fields.facets import get_facets
+from fields.stats import get_catalog_stats
+from fields.geo import nearby, parse_near
+from fields.cache import get_catalog_last_modified, get_catalog_version
+from fields.batch import BATCH_MAX_OPERATIONS, BatchConflict, FieldBatch
 
 # ==== CUSTOM CLASS UNTUK BYPASS CSRF =====
 class CsrfExemptSessionAuthentication(SessionAuthentication):
@@ -16,19 +29,54 @@ class CsrfExemptSessionAuthentication(SessionAuthentication):
     
 # ===== HELPER METHOD =====
 
+# Conditional GET (ETag / Last-Modified)
+def catalog_etag(request, *args, **kwargs):
+    """
+    Strong ETag dari versi katalog + path + query params + Accept.
+    Hanya membaca cache, sehingga If-None-Match bisa dijawab 304 tanpa query katalog.
+    """
+    params = sorted(request.GET.lists())
+    raw = json.dumps([
+        get_catalog_version(), request.path, params, request.META.get('HTTP_ACCEPT', ''),
+    ])
+    return '"%s"' % hashlib.md5(raw.encode()).hexdigest()
+
+def catalog_last_modified(request, *args, **kwargs):
+    return get_catalog_last_modified()
+
+# Dipasang di bawah decorator DRF agar autentikasi tetap dicek sebelum 304
+def catalog_condition(view_func):
+    """
+    ETag/Last-Modified hanya untuk GET/HEAD. condition() juga mengevaluasi If-Match/If-None-Match
+    untuk POST, sehingga klien yang mengirim ulang ETag cache-nya saat menulis akan mendapat 412.
+    """
+    conditional_view = condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified)(view_func)
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return conditional_view(request, *args, **kwargs)
+        return view_func(request, *args, **kwargs)
+    return wrapper
+
 # Filtering dan Searching
+FILTER_PARAMS = ('search', 'category', 'min_price', 'max_price', 'facility')
+
+def has_field_filters(params):
+    """
+    True jika request memakai salah satu filter apply_field_filters.
+    """
+    return any(params.get(key) for key in FILTER_PARAMS)
+
 def apply_field_filters(queryset, params):
     """
-    Menangani semua logika filtering (Search, Category, Price).
+    Menangani semua logika filtering (Search, Category, Price, Facility).
     params: request.GET
     """
-    # Search (nama & lokasi)
+    # Search (nama & lokasi) lewat index full-text, hasil diurutkan berdasarkan relevansi
     search_query = params.get('search', '')
     if search_query:
-        queryset = queryset.filter(
-            Q(name__icontains=search_query) | 
-            Q(location__icontains=search_query)
-        )
+        queryset = search_fields(queryset, search_query)
 
     # Filter category
     selected_category = params.get('category')
@@ -46,37 +94,123 @@ def apply_field_filters(queryset, params):
     except ValueError:
         pass
 
+    # Filter facility (boleh lebih dari satu, field harus punya semuanya)
+    for facility_id in params.getlist('facility'):
+        if facility_id.isdigit():
+            queryset = queryset.filter(facilities__id=int(facility_id))
+
     return queryset
 
 # Pagination dan Meta Data
-def get_pagination_data(queryset, page_number, per_page):
+KEYSET_ORDERING = ('name', 'id')
+
+def encode_cursor(row):
     """
-    Menangani Paginator dan menghitung rata-rata (Aggregation).
-    Mengembalikan tuple: (page_obj, meta_dict)
+    Cursor keyset berisi (name, id) dari baris terakhir di halaman.
+    """
+    raw = json.dumps([row['name'], row['id']]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor):
+    """
+    Kebalikan encode_cursor. Mengembalikan None jika cursor tidak valid.
     """
-    # Aggregation (Hitung rata-rata)
-    total_fields = queryset.count()
-    aggregates = queryset.aggregate(avg_price=Avg('price'), avg_rating=Avg('rating'))
-    
-    # Setup paginator
-    paginator = Paginator(queryset, per_page)
     try:
-        page_obj = paginator.page(page_number)
-    except PageNotAnInteger:
-        page_obj = paginator.page(1)
-    except EmptyPage:
-        page_obj = paginator.page(paginator.num_pages)
+        name, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(name), int(pk)
+    except (ValueError, TypeError):
+        return None
+
+def get_pagination_data(queryset, page_number, per_page, cursor=None, aggregates=None, columns=FIELD_READ_COLUMNS):
+    """
+    Menangani paginasi dan menghitung total + rata-rata dalam satu query aggregate.
+    Jika `aggregates` (total, avg_price, avg_rating) sudah diketahui, query aggregate dilewati.
+    Baris halaman diambil sebagai dict (.values(*columns)) untuk serialize_field_rows.
+
+    Jika `cursor` diberikan dan queryset terurut (name, id), halaman diambil dengan
+    keyset pagination (tanpa OFFSET) sehingga halaman dalam tetap cepat.
+    Mengembalikan tuple: (list dict baris di halaman, meta_dict)
+    """
+    # Aggregation (total dan rata-rata sekaligus)
+    if aggregates is None:
+        aggregates = queryset.aggregate(
+            total=Count('id'), avg_price=Avg('price'), avg_rating=Avg('rating')
+        )
+    total_fields = aggregates['total']
+    num_pages = max(1, math.ceil(total_fields / per_page))
+    # name dan id selalu diambil untuk cursor
+    page_queryset = queryset.values(*dict.fromkeys(['id', 'name', *columns]))
+
+    keyset = decode_cursor(cursor) if cursor else None
+    if keyset and tuple(queryset.query.order_by) == KEYSET_ORDERING:
+        # Keyset: ambil baris setelah (name, id) terakhir, +1 baris untuk cek halaman berikutnya
+        name, pk = keyset
+        rows = list(page_queryset.filter(Q(name__gt=name) | Q(name=name, id__gt=pk))[:per_page + 1])
+        current_page = None
+    else:
+        # Offset: nomor halaman tidak valid -> halaman 1, melebihi batas -> halaman terakhir
+        try:
+            current_page = min(max(int(page_number), 1), num_pages)
+        except (TypeError, ValueError):
+            current_page = 1
+        offset = (current_page - 1) * per_page
+        rows = list(page_queryset[offset:offset + per_page + 1])
+
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
 
     # Susun metadata untuk Flutter
     meta_data = {
         "total_data": total_fields,
-        "total_pages": paginator.num_pages,
-        "current_page": page_obj.number,
+        "total_pages": num_pages,
+        "current_page": current_page,
         "avg_price": round(aggregates['avg_price'] or 0, 2),
-        "avg_rating": round(aggregates['avg_rating'] or 0, 2)
+        "avg_rating": round(aggregates['avg_rating'] or 0, 2),
+        # Cursor hanya berlaku untuk urutan default (tanpa search)
+        "next_cursor": (
+            encode_cursor(rows[-1])
+            if has_next and tuple(queryset.query.order_by) == KEYSET_ORDERING else None
+        ),
     }
 
-    return page_obj, meta_data
+    return rows, meta_data
+
+def get_nearby_data(queryset, latitude, longitude, radius_km, page_number, per_page, columns=FIELD_READ_COLUMNS):
+    """
+    Paginasi untuk query "near me": hasil diurutkan dari jarak terdekat.
+    Kandidat (id, jarak, harga, rating) diambil dalam satu query lewat index geo_cell,
+    sehingga total dan rata-rata dihitung tanpa query aggregate tambahan.
+    Mengembalikan tuple: (list dict baris di halaman + distance_km, meta_dict)
+    """
+    results = nearby(queryset, latitude, longitude, radius_km, columns=('price', 'rating'))
+    total_fields = len(results)
+    num_pages = max(1, math.ceil(total_fields / per_page))
+    try:
+        current_page = min(max(int(page_number), 1), num_pages)
+    except (TypeError, ValueError):
+        current_page = 1
+
+    offset = (current_page - 1) * per_page
+    page_results = results[offset:offset + per_page]
+    rows_by_id = {
+        row['id']: row
+        for row in Field.objects.filter(id__in=[field_id for _, field_id, *_ in page_results])
+        .values('id', *columns)
+    }
+    rows = []
+    for distance, field_id, *_ in page_results:
+        rows.append({**rows_by_id[field_id], 'distance_km': round(distance, 2)})
+
+    meta_data = {
+        "total_data": total_fields,
+        "total_pages": num_pages,
+        "current_page": current_page,
+        "avg_price": round(sum(row[2] for row in results) / total_fields, 2) if results else 0,
+        "avg_rating": round(sum(row[3] for row in results) / total_fields, 2) if results else 0,
+        "next_cursor": None,
+        "radius_km": radius_km,
+    }
+    return rows, meta_data
 
 # Validasi Input dan Save
 def handle_validation_and_save(serializer, success_status=status.HTTP_200_OK):
@@ -105,6 +239,7 @@ def handle_validation_and_save(serializer, success_status=status.HTTP_200_OK):
 @api_view(['GET', 'POST'])
 @authentication_classes([CsrfExemptSessionAuthentication])
 @permission_classes([IsAuthenticated])
+@catalog_condition
 def field_list_api(request):
     """
     GET: Tampilkan semua fields (JSON)
@@ -112,23 +247,52 @@ def field_list_api(request):
     """
     # GET boleh diakses user biasa (Sudah login)
     if request.method == 'GET':
-        # 1. Base query
-        queryset = Field.objects.all().order_by('name')
+        # 1. Base query (id sebagai tie-breaker agar urutan stabil untuk cursor)
+        queryset = Field.objects.all().order_by(*KEYSET_ORDERING)
 
         # 2. Melakukan filtering
         queryset = apply_field_filters(queryset, request.GET)
 
-        # 3. Melakukan paginasi dan mendapatkan metadata
-        per_page = int(request.GET.get('per_page', 20))
+        # 3. Melakukan paginasi (offset atau cursor) dan mendapatkan metadata
+        try:
+            per_page = max(int(request.GET.get('per_page', 20)), 1)
+        except ValueError:
+            per_page = 20
         page_number = request.GET.get('page', 1)
-        page_obj, meta_data = get_pagination_data(queryset, page_number, per_page)
+        # Sparse fieldset (?fields=name,image,price), hanya kolom yang diminta yang di-query
+        fields = parse_sparse_fields(request.GET.get('fields'))
+        columns = [name for name in FIELD_READ_COLUMNS if name in fields]
+
+        # Query "near me": hasil dalam radius, diurutkan dari yang terdekat
+        if near := request.GET.get('near'):
+            try:
+                latitude, longitude, radius_km = parse_near(near, request.GET.get('radius_km'))
+            except ValueError as error:
+                return Response(
+                    {"status": "error", "message": str(error)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            rows, meta_data = get_nearby_data(
+                queryset, latitude, longitude, radius_km, page_number, per_page, columns
+            )
+            return Response({
+                "status": "success",
+                "data": {
+                    "fields": serialize_field_rows(rows, fields + ['distance_km']),
+                    "meta": meta_data
+                }
+            })
 
-        # 4. Serialize dan return Response
-        serializer = FieldSerializer(page_obj.object_list, many=True)
+        cursor = request.GET.get('cursor')
+        # Tanpa filter, total dan rata-rata dibaca dari tabel statistik katalog
+        aggregates = None if has_field_filters(request.GET) else get_catalog_stats()
+        rows, meta_data = get_pagination_data(queryset, page_number, per_page, cursor, aggregates, columns)
+
+        # 4. Serialize (read path ringan, lihat serializers.py) dan return Response
         return Response({
             "status": "success",
             "data": {
-                "fields": serializer.data,
+                "fields": serialize_field_rows(rows, fields),
                 "meta": meta_data
             }
         })
@@ -147,6 +311,7 @@ def field_list_api(request):
 @api_view(['GET', 'POST'])
 @authentication_classes([CsrfExemptSessionAuthentication])
 @permission_classes([IsAuthenticated])
+@catalog_condition
 def field_detail_api(request, pk):
     """
     GET: Ambil satu field detail
@@ -182,9 +347,79 @@ def field_detail_api(request, pk):
         return handle_validation_and_save(serializer)
     
 
+@api_view(['POST'])
+@authentication_classes([CsrfExemptSessionAuthentication])
+@permission_classes([IsAuthenticated])
+def field_batch_api(request):
+    """
+    POST: Create/update/delete banyak field sekaligus (JSON)
+    Body: {"operations": [{"action": "create", "data": {...}},
+                          {"action": "update", "id": 1, "data": {...}},
+                          {"action": "delete", "id": 2}]}
+    Semua operasi divalidasi dulu; jika ada yang gagal, tidak ada yang disimpan (400).
+    Target yang terhapus request lain sebelum ditulis membatalkan seluruh batch (409).
+    """
+    if not request.user.is_staff:
+        return Response(
+            {"status": "error", "message": "Hanya admin yang boleh mengubah data!"},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    operations = request.data.get('operations') if isinstance(request.data, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return Response(
+            {"status": "error", "message": "Field operations harus berupa list yang tidak kosong."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        return Response(
+            {"status": "error", "message": f"Maksimal {BATCH_MAX_OPERATIONS} operasi per batch."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    batch = FieldBatch(operations)
+    if not batch.validate():
+        return Response({
+            "status": "error",
+            "message": "Data tidak valid! Tidak ada operasi yang disimpan.",
+            "data": {"results": batch.results}
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        results = batch.apply()
+    except BatchConflict:
+        return Response({
+            "status": "error",
+            "message": "Sebagian field sudah dihapus! Tidak ada operasi yang disimpan.",
+            "data": {"results": batch.results}
+        }, status=status.HTTP_409_CONFLICT)
+
+    return Response({
+        "status": "success",
+        "message": f"{len(operations)} operasi berhasil disimpan!",
+        "data": {"results": results}
+    })
+
+
+@api_view(['GET'])
+@authentication_classes([CsrfExemptSessionAuthentication])
+@permission_classes([IsAuthenticated])
+@catalog_condition
+def field_facets_api(request):
+    """
+    GET: Hitungan per sport, histogram harga, dan hitungan per facility
+    untuk filter yang sedang aktif (parameter sama dengan list API)
+    """
+    return Response({
+        "status": "success",
+        "data": get_facets(request.GET)
+    })
+
+
 @api_view(['GET'])
 @authentication_classes([CsrfExemptSessionAuthentication])
 @permission_classes([IsAuthenticated])
+@catalog_condition
 def facility_list_api(request):
     """
     GET: Tampilkan semua fasilitas (untuk pilihan di form)
@@ -1,59 +1,25 @@
-from django.utils import timezone
 from django.shortcuts import render
 from django.template.loader import render_to_string
 from django.http import HttpResponse
 from fields.models import Field
-from django.db.models import Q
-from matches.models import Match
+from fields import search as field_search
+from matches.services import get_joinable_page
 
 
 def show_main(request):
     query = request.GET.get("q", "")
     
     if query:
-        field_list = Field.objects.filter(
-            Q(name__icontains=query) | 
-            Q(location__icontains=query) |
-            Q(category__name__icontains=query)
-        ).distinct()
+        field_list = field_search.search_fields(Field.objects.all(), query)
     else:
         field_list = Field.objects.all().order_by("name")
 
-    now = timezone.now()
-    available_matches_qs = Match.objects.filter(
-        status="Pending",
-        match_date__gte=now.date()
-    ).exclude(
-        match_date=now.date(), end_time__lte=now.time()
-    ).select_related("organizer", "field").prefetch_related("matchplayer_set")
-
-    if query:
-        available_matches_qs = available_matches_qs.filter(
-            Q(field__name__icontains=query) |
-            Q(sport__icontains=query) |
-            Q(field__location__icontains=query)
-        ).distinct()
-
-    matches_to_display = []
-    for match in available_matches_qs:
-        current_player_count = match.matchplayer_set.count()
-        is_full = current_player_count >= match.max_players
-
-        if not is_full:
-            match.current_player_count = current_player_count
-            match.spots_left = max(0, match.max_players - current_player_count)
-            match.is_full = is_full
-            
-            if match.max_players > 0:
-                match.progress_percentage = (current_player_count / match.max_players) * 100
-            else:
-                match.progress_percentage = 0
-            
-            matches_to_display.append(match)
+    # halaman pertama match yang bisa di-join, di-cache bersama antar pengunjung
+    matches = get_joinable_page(query=query, sport=request.GET.get("sport", ""), user=request.user)
 
     context = {
         "fields": field_list,
-        "matches": matches_to_display,
+        "matches": matches,
         "query": query
     }
 
@@ -63,16 +29,12 @@ def search_fields(request):
     query = request.GET.get("q", "")
     
     if query:
-        field_list = Field.objects.filter(
-            Q(name__icontains=query) | 
-            Q(location__icontains=query) |
-            Q(category__name__icontains=query)
-        ).distinct()
+        field_list = field_search.search_fields(Field.objects.all(), query)
     else:
         field_list = Field.objects.all().order_by("name")
 
     context = {
-        "field_list": field_list,
+        "fields": field_list,
         "request": request,
     }
     
@@ -83,40 +45,10 @@ def search_fields(request):
 def search_matches(request):
     query = request.GET.get("q", "")
 
-    now = timezone.now()
-    available_matches_qs = Match.objects.filter(
-        status="Pending",
-        match_date__gte=now.date()
-    ).exclude(
-        match_date=now.date(), end_time__lte=now.time()
-    ).select_related("organizer", "field").prefetch_related("matchplayer_set")
-
-    if query:
-        available_matches_qs = available_matches_qs.filter(
-            Q(field__name__icontains=query) |
-            Q(sport__icontains=query) |
-            Q(field__location__icontains=query)
-        ).distinct()
-
-    matches_to_display = []
-    for match in available_matches_qs:
-        current_player_count = match.matchplayer_set.count()
-        is_full = current_player_count >= match.max_players
-
-        if not is_full:
-            match.current_player_count = current_player_count
-            match.spots_left = max(0, match.max_players - current_player_count)
-            match.is_full = is_full
-            
-            if match.max_players > 0:
-                match.progress_percentage = (current_player_count / match.max_players) * 100
-            else:
-                match.progress_percentage = 0
-            
-            matches_to_display.append(match)
+    matches = get_joinable_page(query=query, sport=request.GET.get("sport", ""), user=request.user)
 
     context = {
-        "matches": matches_to_display,
+        "matches": matches,
         "user": request.user,
     }
     
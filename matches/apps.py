@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MatchesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'matches'
+
+    def ready(self):
+        # Daftarkan signal penghitung pemain (Match.player_count)
+        from matches import signals  # noqa: F401
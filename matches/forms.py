@@ -2,13 +2,7 @@ from django import forms
 from .models import Match, Field
 from django.utils import timezone
 import datetime
-
-SLOT_CHOICES = (
-    ("10:00-11:00", "10:00-11:00"),
-    ("11:00-12:00", "11:00-12:00"),
-    ("12:00-13:00", "12:00-13:00"),
-    ("13:00-14:00", "13:00-14:00"),
-)
+from bookings.forms import clean_time_slot
 
 class CreateMatchForm(forms.Form):
     field = forms.ModelChoiceField(
@@ -32,8 +26,8 @@ class CreateMatchForm(forms.Form):
         initial=timezone.now().date
     )
 
-    time_slot = forms.ChoiceField(
-        choices=SLOT_CHOICES,
+    # slot diisi lewat get_match_slots (grid per field), divalidasi di clean()
+    time_slot = forms.CharField(
         widget=forms.RadioSelect,
         label="Select Time Slot",
         required=True
@@ -65,4 +59,9 @@ class CreateMatchForm(forms.Form):
         required=False,
         label="Description",
         help_text="Add any extra details, e.g., 'Mixed skill levels, just have fun!'"
-    )
\ No newline at end of file
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        clean_time_slot(self, cleaned_data.get("field"), cleaned_data.get("match_date"))
+        return cleaned_data
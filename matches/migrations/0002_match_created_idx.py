@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fields', '0007_updated_at'),
+        ('matches', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['created_at', 'id'], name='match_created_idx'),
+        ),
+    ]
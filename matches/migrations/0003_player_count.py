@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:24
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_player_count(apps, schema_editor):
+    Match = apps.get_model('matches', 'Match')
+    MatchPlayer = apps.get_model('matches', 'MatchPlayer')
+
+    counts = MatchPlayer.objects.filter(match=OuterRef('pk')).values('match').annotate(total=Count('id')).values('total')
+    Match.objects.update(player_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fields', '0007_updated_at'),
+        ('matches', '0002_match_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='player_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_player_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['status', 'match_date', 'start_time'], name='match_open_idx'),
+        ),
+    ]
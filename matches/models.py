@@ -36,6 +36,9 @@ class Match(models.Model):
     description = models.TextField(blank=True, null=True)
     price_per_person = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default="Pending")
+    # Jumlah MatchPlayer, dijaga dengan F() oleh matches/signals.py dan join_match.
+    # UPDATE dari save() tidak pernah menulis kolom ini (lihat _do_update)
+    player_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     players = models.ManyToManyField(
         settings.AUTH_USER_MODEL,
@@ -47,13 +50,33 @@ class Match(models.Model):
     def __str__(self):
         return f"Match at {self.field.name} on {self.match_date}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Kapasitas saat dimuat, untuk mendeteksi max_players yang dinaikkan (matches/signals.py)
+        instance._loaded_max_players = instance.__dict__.get("max_players")
+        return instance
+
     def save(self, *args, **kwargs):
         if self.field:
             self.sport = self.field.get_sport_display()
         super().save(*args, **kwargs)
+        self._loaded_max_players = self.max_players
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # player_count dikeluarkan dari UPDATE agar instance yang basi tidak menimpa counter.
+        # save() tetap insert-or-update seperti biasa: INSERT (baris baru/terhapus) menyertakannya
+        values = [value for value in values if value[0].attname != "player_count"]
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
 
     class Meta:
         ordering = ["match_date", "start_time"]
+        indexes = [
+            # Scan inkremental rollup okupansi dari high-water mark (bookings/rollups.py)
+            models.Index(fields=["created_at", "id"], name="match_created_idx"),
+            # Daftar match yang masih bisa di-join (matches/services.py)
+            models.Index(fields=["status", "match_date", "start_time"], name="match_open_idx"),
+        ]
         verbose_name = "Match"
         verbose_name_plural = "Matches"
 
@@ -69,3 +92,27 @@ class MatchPlayer(models.Model):
 
     def __str__(self):
         return f"{self.user.username} joined {self.match.field.name} on {self.match.match_date}"
+
+
+class WaitlistEntry(models.Model):
+    """
+    Antrean FIFO (created_at, id) untuk match yang penuh. Kepala antrean dipromosikan
+    menjadi MatchPlayer ketika ada pemain yang keluar (matches/services.py).
+    """
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name="waitlist")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="match_waitlist_entries")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["match", "user"], name="unique_waitlist_entry")
+        ]
+        indexes = [
+            # Kepala antrean + posisi user dalam antrean
+            models.Index(fields=["match", "created_at", "id"], name="waitlist_queue_idx")
+        ]
+        ordering = ["created_at", "id"]
+        verbose_name_plural = "Waitlist entries"
+
+    def __str__(self):
+        return f"{self.user.username} waiting for match {self.match_id}"
@@ -0,0 +1,234 @@
+import bisect
+import heapq
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from bookings.models import Booking
+from fields.cache import bump_version, get_version
+from matches.models import Match, MatchPlayer
+from matches.services import joinable_matches
+
+# Bobot tiap fitur dalam skor (total 1.0)
+SPORT_WEIGHT = 0.4
+HOUR_WEIGHT = 0.25
+SKILL_WEIGHT = 0.2
+FIELD_WEIGHT = 0.15
+# Match "All Levels" cocok untuk siapa saja, tapi tidak sekuat level yang biasa dimainkan
+ALL_LEVELS_SKILL_SCORE = 0.5
+# Jam mulai yang berjarak kurang dari ini dari jam main user masih mendapat skor sebagian
+HOUR_SPREAD = 3
+
+DEFAULT_RECOMMENDATIONS = 10
+MAX_RECOMMENDATIONS = 50
+# Kandidat diambil lebih banyak dari k untuk menutup baris index yang sudah basi (penuh/batal)
+CANDIDATE_FACTOR = 3
+
+PROFILE_CACHE_KEY = "matches:profile:{user_id}"
+# Di-invalidate juga oleh signal MatchPlayer/Booking user (matches/signals.py)
+PROFILE_CACHE_TIMEOUT = 60 * 60
+# Index dibangun ulang penuh secara berkala untuk membuang match yang penuh/batal
+INDEX_REBUILD_INTERVAL = 60 * 10
+# Naik setiap match yang sudah ada diubah (jadwal, field, skill level); index di semua
+# proses dibangun ulang pada refresh berikutnya (matches/signals.py)
+INDEX_VERSION_KEY = "matches:index_version"
+
+
+def build_profile(user_id):
+    """
+    Profil bermain user dari riwayat MatchPlayer + Booking: bobot ternormalisasi per
+    sport, field, jam mulai dan skill level. Empat query GROUP BY kecil.
+    """
+    sports, fields, hours, skills = Counter(), Counter(), Counter(), Counter()
+    played = MatchPlayer.objects.filter(user_id=user_id)
+    for sport, field_id, start, count in played.values_list(
+        "match__field__sport", "match__field_id", "match__start_time"
+    ).annotate(count=Count("id")).order_by():
+        sports[sport] += count
+        fields[field_id] += count
+        hours[start.hour] += count
+    for level, count in played.values_list("match__skill_level").annotate(count=Count("id")).order_by():
+        skills[level] += count
+
+    booked = Booking.objects.filter(user_id=user_id)
+    for sport, field_id, start, count in booked.values_list(
+        "field__sport", "field_id", "start_time"
+    ).annotate(count=Count("id")).order_by():
+        sports[sport] += count
+        fields[field_id] += count
+        hours[start.hour] += count
+
+    def normalize(counter):
+        total = sum(counter.values())
+        return {key: count / total for key, count in counter.items()} if total else {}
+
+    return {
+        "sports": normalize(sports),
+        "fields": normalize(fields),
+        "hours": normalize(hours),
+        "skills": normalize(skills),
+    }
+
+
+def get_profile(user_id):
+    key = PROFILE_CACHE_KEY.format(user_id=user_id)
+    profile = cache.get(key)
+    if profile is None:
+        profile = build_profile(user_id)
+        cache.set(key, profile, PROFILE_CACHE_TIMEOUT)
+    return profile
+
+
+def invalidate_profile(user_id):
+    cache.delete(PROFILE_CACHE_KEY.format(user_id=user_id))
+
+
+def hour_affinity(hours):
+    """
+    Skor 0..1 untuk tiap jam 0-23: jam yang sering dimainkan bernilai penuh,
+    jam di sekitarnya menurun linear sampai HOUR_SPREAD.
+    """
+    affinity = [0.0] * 24
+    for played_hour, weight in hours.items():
+        for hour in range(24):
+            distance = abs(hour - played_hour)
+            if distance < HOUR_SPREAD:
+                affinity[hour] += weight * (1 - distance / HOUR_SPREAD)
+    peak = max(affinity)
+    return [value / peak for value in affinity] if peak else affinity
+
+
+def start_key(date, start_time):
+    return date.toordinal() * 1440 + start_time.hour * 60 + start_time.minute
+
+
+class MatchIndex:
+    """
+    Index fitur match yang bisa di-join, disimpan per proses. Match dikelompokkan per
+    vektor fitur (sport, field, jam, skill); skor hanya bergantung pada vektor itu, jadi
+    ranking cukup menghitung skor per kelompok (ratusan) alih-alih per match (puluhan ribu).
+    Tiap kelompok berisi (start_key, match_id) terurut, sehingga match yang lebih dekat
+    waktunya didahulukan di antara skor yang sama.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        # Build ulang penuh pada refresh berikutnya
+        self.groups = {}
+        self.built_at = None
+        self.watermark = None
+        self.version = None
+
+    def add(self, rows):
+        for match_id, sport, field_id, date, start, skill, created_at in rows:
+            group = self.groups.setdefault((sport, field_id, start.hour, skill), [])
+            bisect.insort(group, (start_key(date, start), match_id))
+            if self.watermark is None or (created_at, match_id) > self.watermark:
+                self.watermark = (created_at, match_id)
+
+    def refresh(self, now):
+        """
+        Bangun ulang penuh jika sudah lewat INDEX_REBUILD_INTERVAL atau ada match lama yang
+        diubah (INDEX_VERSION_KEY naik), selain itu hanya tambahkan match yang dibuat sejak
+        watermark (created_at, id). Query inkremental
+        hanya berupa range created_at (index match_created_idx); syarat joinable untuk
+        segelintir baris baru dicek di Python.
+        """
+        columns = ("id", "field__sport", "field_id", "match_date", "start_time", "skill_level", "created_at")
+        version = get_version(INDEX_VERSION_KEY)
+        with self.lock:
+            if (
+                self.built_at is None or self.version != version
+                or time.monotonic() - self.built_at > INDEX_REBUILD_INTERVAL
+            ):
+                self.groups, self.watermark = {}, None
+                self.add(joinable_matches(now).order_by().values_list(*columns).iterator())
+                self.built_at, self.version = time.monotonic(), version
+                return
+
+            new_matches = Match.objects.order_by()
+            if self.watermark is not None:
+                new_matches = new_matches.filter(created_at__gte=self.watermark[0])
+            self.add(
+                row[:-3] for row in new_matches.values_list(*columns, "status", "player_count", "max_players")
+                if (self.watermark is None or (row[6], row[0]) > self.watermark)
+                and row[-3] == "Pending" and row[-2] < row[-1] and row[3] >= now.date()
+            )
+
+    def ranked(self, profile, now):
+        """
+        Iterasi (skor, match_id) dari skor tertinggi; match yang sudah mulai dilewati.
+        """
+        sports, fields, skills = profile["sports"], profile["fields"], profile["skills"]
+        hours = hour_affinity(profile["hours"])
+        now_key = start_key(now.date(), now.time())
+
+        with self.lock:
+            scored = []
+            for (sport, field_id, hour, skill), group in self.groups.items():
+                skill_score = ALL_LEVELS_SKILL_SCORE if skill == "All Levels" else skills.get(skill, 0.0)
+                score = (
+                    SPORT_WEIGHT * sports.get(sport, 0.0)
+                    + FIELD_WEIGHT * fields.get(field_id, 0.0)
+                    + HOUR_WEIGHT * hours[hour]
+                    + SKILL_WEIGHT * skill_score
+                )
+                scored.append((round(score, 6), group))
+
+        # Skor sama -> gabungkan kelompoknya menurut waktu mulai; match yang sudah mulai
+        # dilewati (kelompok terurut waktu). Kelompok baru disalin saat benar-benar dibaca.
+        scored.sort(key=lambda item: item[0], reverse=True)
+        position = 0
+        while position < len(scored):
+            score = scored[position][0]
+            same = []
+            while position < len(scored) and scored[position][0] == score:
+                group = scored[position][1]
+                same.append(group[bisect.bisect_left(group, (now_key, 0)):])
+                position += 1
+            for _, match_id in heapq.merge(*same):
+                yield score, match_id
+
+
+_index = MatchIndex()
+
+
+def invalidate_index():
+    bump_version(INDEX_VERSION_KEY)
+
+
+def recommend_matches(user, k=DEFAULT_RECOMMENDATIONS, now=None):
+    """
+    Top-k match yang bisa di-join untuk user, diurutkan menurut kecocokan dengan profilnya.
+    Kandidat dari index diverifikasi ke database per batch (masih Pending, belum penuh,
+    user belum join). Mengembalikan list Match dengan atribut `score`.
+    """
+    now = now or timezone.now()
+    _index.refresh(now)
+    ranked = _index.ranked(get_profile(user.pk), now)
+
+    results = []
+    while len(results) < k:
+        batch = {}
+        for score, match_id in ranked:
+            batch[match_id] = score
+            if len(batch) >= k * CANDIDATE_FACTOR:
+                break
+        if not batch:
+            break
+        valid = {
+            match.id: match
+            for match in joinable_matches(now).filter(id__in=batch).exclude(matchplayer__user=user)
+        }
+        for match_id, score in batch.items():
+            if match_id in valid and len(results) < k:
+                valid[match_id].score = score
+                results.append(valid[match_id])
+    return results
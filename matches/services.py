@@ -0,0 +1,280 @@
+import datetime
+import hashlib
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.core.paginator import Page, Paginator
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from fields.cache import bump_version, get_version
+from matches.models import Match, MatchPlayer, WaitlistEntry
+
+# Jumlah kartu match per halaman di show_matches dan homepage
+MATCHES_PER_PAGE = 12
+# Hasil daftar match dibagi antar pengunjung; TTL pendek + bucket menit agar match
+# yang sudah lewat cepat hilang walau tidak ada penulisan
+JOINABLE_CACHE_TIMEOUT = 60
+JOINABLE_VERSION_KEY = "matches:joinable_version"
+
+
+def get_joinable_version():
+    return get_version(JOINABLE_VERSION_KEY)
+
+
+def bump_joinable_version():
+    """
+    Dipanggil setelah commit setiap match dibuat/diubah/dihapus atau ada pemain join/keluar
+    (matches/signals.py).
+    """
+    return bump_version(JOINABLE_VERSION_KEY)
+
+
+def with_player_stats(queryset):
+    """
+    Anotasi yang dipakai match_card.html, dihitung di SQL dari player_count:
+    current_player_count, spots_left, progress_percentage dan is_full.
+    """
+    return queryset.annotate(
+        current_player_count=F("player_count"),
+        spots_left=Greatest(F("max_players") - F("player_count"), Value(0)),
+        progress_percentage=Case(
+            When(max_players__gt=0, then=F("player_count") * 100.0 / F("max_players")),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+        is_full=Case(When(player_count__gte=F("max_players"), then=Value(True)), default=Value(False)),
+    )
+
+
+def joinable_matches(now, query="", sport="", include_full=False):
+    """
+    Match Pending yang belum selesai dan belum penuh, terurut waktu mulai, dengan
+    pencarian teks (venue, sport, lokasi) dan filter sport (kode Field.SPORT_CATEGORY) opsional.
+    Filter penuh/tidak dilakukan di database (index match_open_idx). include_full=True ikut
+    menampilkan match yang penuh (untuk masuk antrean).
+    """
+    queryset = Match.objects.filter(
+        status="Pending",
+        match_date__gte=now.date(),
+    ).exclude(
+        match_date=now.date(), end_time__lte=now.time()
+    )
+    if not include_full:
+        queryset = queryset.filter(player_count__lt=F("max_players"))
+    if query:
+        queryset = queryset.filter(
+            Q(field__name__icontains=query) |
+            Q(sport__icontains=query) |
+            Q(field__location__icontains=query)
+        )
+    if sport:
+        queryset = queryset.filter(field__sport=sport)
+    return with_player_stats(queryset.select_related("organizer", "field").order_by("match_date", "start_time", "id"))
+
+
+def joinable_cache_key(query, sport, page, per_page, now, include_full=False):
+    key_data = [query, sport, str(page), per_page, now.strftime("%Y%m%d%H%M"), include_full]
+    digest = hashlib.md5(json.dumps(key_data).encode()).hexdigest()
+    return f"matches:joinable:{get_joinable_version()}:{digest}"
+
+
+def mark_joined(matches, user):
+    """
+    Set match.user_joined dan match.waitlist_position (None jika tidak mengantre) untuk user
+    ini; satu query untuk seluruh halaman. Antrean hanya ada pada match yang penuh, jadi
+    query antrean (dan posisi per match yang diantre) hanya dijalankan jika halaman memuat
+    match penuh. Dipisah dari hasil yang di-cache karena bergantung pada user.
+    """
+    joined, waiting = set(), set()
+    if user is not None and user.is_authenticated and matches:
+        joined = set(MatchPlayer.objects.filter(
+            user=user, match_id__in=[match.id for match in matches]
+        ).values_list("match_id", flat=True))
+        full = [match.id for match in matches if match.is_full and match.id not in joined]
+        if full:
+            waiting = set(WaitlistEntry.objects.filter(user=user, match_id__in=full).values_list("match_id", flat=True))
+    for match in matches:
+        match.user_joined = match.id in joined
+        match.waitlist_position = waitlist_position(match.id, user) if match.id in waiting else None
+
+
+def get_joinable_page(page=1, query="", sport="", user=None, per_page=MATCHES_PER_PAGE, now=None, include_full=False):
+    """
+    Satu halaman match yang bisa di-join (include_full: termasuk yang penuh). Total, nomor
+    halaman dan id match di-cache per (query, sport, halaman, menit); baris match (beserta
+    organizer & field) dimuat ulang per request lewat primary key, sehingga cache tidak
+    menyimpan data user. Cache hit tidak menjalankan COUNT maupun query halaman.
+    """
+    now = now or timezone.now()
+    query, sport = query.strip(), sport.strip()
+    paginator = Paginator(joinable_matches(now, query, sport, include_full), per_page)
+    key = joinable_cache_key(query, sport, page, per_page, now, include_full)
+
+    cached = cache.get(key)
+    if cached is None:
+        page_obj = paginator.get_page(page)
+        matches = list(page_obj.object_list)
+        number = page_obj.number
+        cache.set(key, (paginator.count, number, [match.id for match in matches]), JOINABLE_CACHE_TIMEOUT)
+    else:
+        count, number, ids = cached
+        # Total dari cache, Paginator tidak perlu menjalankan COUNT lagi
+        paginator.count = count
+        position = {match_id: index for index, match_id in enumerate(ids)}
+        matches = sorted(
+            with_player_stats(Match.objects.filter(id__in=ids).select_related("organizer", "field")),
+            key=lambda match: position[match.id],
+        )
+
+    mark_joined(matches, user)
+    return Page(matches, number, paginator)
+
+
+class JoinRejected(Exception):
+    """
+    Join ditolak. `reason`: "unavailable" (bukan Pending lagi), "full", "already_joined",
+    atau untuk leave_match: "not_joined" / "organizer" / "unavailable" (bukan Pending atau
+    sudah mulai).
+    """
+
+    def __init__(self, reason):
+        self.reason = reason
+        super().__init__(f"Cannot join match: {reason}")
+
+
+@transaction.atomic
+def join_match(match, user):
+    """
+    Tambahkan user ke match tanpa pernah melewati max_players.
+    Kursi diambil dengan UPDATE bersyarat pada player_count (player_count < max_players),
+    yang dikunci per baris oleh database (PostgreSQL maupun SQLite), jadi dua join
+    bersamaan tidak bisa sama-sama lolos cek "belum penuh". Jika insert MatchPlayer gagal
+    (sudah join), seluruh transaksi termasuk kursinya di-rollback.
+    Mengembalikan jumlah pemain setelah join.
+    """
+    claimed = Match.objects.filter(
+        pk=match.pk, status="Pending", player_count__lt=F("max_players")
+    ).update(player_count=F("player_count") + 1)
+    if not claimed:
+        status = Match.objects.filter(pk=match.pk).values_list("status", flat=True).first()
+        if status != "Pending":
+            raise JoinRejected("unavailable")
+        if MatchPlayer.objects.filter(match=match, user=user).exists():
+            raise JoinRejected("already_joined")
+        raise JoinRejected("full")
+
+    player = MatchPlayer(match=match, user=user)
+    # Kursi sudah dihitung di atas, signal tidak perlu menaikkan player_count lagi
+    player._counted = True
+    try:
+        with transaction.atomic():
+            player.save()
+    except IntegrityError:
+        raise JoinRejected("already_joined")
+    return Match.objects.filter(pk=match.pk).values_list("player_count", flat=True).get()
+
+
+def waitlist_position(match_id, user):
+    """
+    Posisi user di antrean (1 = berikutnya), atau None jika tidak mengantre.
+    Dua lookup kecil di atas unique_waitlist_entry dan waitlist_queue_idx,
+    tanpa memuat daftar match.
+    """
+    entry = WaitlistEntry.objects.filter(match_id=match_id, user=user).values_list("created_at", "id").first()
+    if entry is None:
+        return None
+    created_at, entry_id = entry
+    ahead = WaitlistEntry.objects.filter(
+        Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=entry_id), match_id=match_id,
+    ).count()
+    return ahead + 1
+
+
+@transaction.atomic
+def join_waitlist(match, user):
+    """
+    Masukkan user ke antrean match yang penuh; mengantre dua kali tidak mengubah posisi.
+    Baris match dikunci selama mengantre, lalu antrean langsung dipromosikan: kursi yang
+    kosong di antara penolakan "full" dan masuknya entri tidak meninggalkan user di antrean.
+    Mengembalikan posisi user di antrean, atau None jika user langsung mendapat kursi.
+    """
+    Match.objects.select_for_update().filter(pk=match.pk).values_list("pk", flat=True).first()
+    if MatchPlayer.objects.filter(match=match, user=user).exists():
+        raise JoinRejected("already_joined")
+    WaitlistEntry.objects.get_or_create(match=match, user=user)
+    fill_from_waitlist(match)
+    return waitlist_position(match.pk, user)
+
+
+def leave_waitlist(match, user):
+    WaitlistEntry.objects.filter(match=match, user=user).delete()
+
+
+def promote_waitlist(match):
+    """
+    Isi kursi kosong dari kepala antrean (FIFO). Setiap percobaan berjalan dalam savepoint:
+    entri diambil dengan delete() (dua promosi bersamaan tidak memakai entri yang sama)
+    lalu kursinya diambil lewat join_match. Jika kursi sudah terisi lagi atau match tidak
+    Pending, entri tetap di antrean. Mengembalikan id user yang dipromosikan, atau None.
+    """
+    User = get_user_model()
+    while True:
+        head = WaitlistEntry.objects.filter(match=match).order_by("created_at", "id").values_list("id", "user_id").first()
+        if head is None:
+            return None
+        entry_id, user_id = head
+        try:
+            with transaction.atomic():
+                deleted, _ = WaitlistEntry.objects.filter(pk=entry_id).delete()
+                if deleted:
+                    join_match(match, User(pk=user_id))
+        except JoinRejected as error:
+            if error.reason != "already_joined":
+                return None
+            # Sudah menjadi pemain lewat jalur lain, entrinya dibuang
+            WaitlistEntry.objects.filter(pk=entry_id).delete()
+            continue
+        if deleted:
+            return user_id
+
+
+def fill_from_waitlist(match):
+    """
+    Promosikan antrean sampai kursi penuh atau antrean habis (kursi bisa bertambah lebih
+    dari satu, mis. max_players dinaikkan). Mengembalikan daftar id user yang dipromosikan.
+    """
+    promoted = []
+    while (user_id := promote_waitlist(match)) is not None:
+        promoted.append(user_id)
+    return promoted
+
+
+def schedule_waitlist_promotion(match_id):
+    """
+    Isi kursi kosong dari antrean setelah commit. Dipanggil matches/signals.py setiap kali
+    kursi dilepas di luar leave_match (admin, cascade) atau max_players dinaikkan.
+    """
+    transaction.on_commit(lambda: fill_from_waitlist(Match(pk=match_id)))
+
+
+@transaction.atomic
+def leave_match(match, user):
+    """
+    Keluarkan user dari match dan, dalam transaksi yang sama, promosikan kepala antrean
+    ke kursi yang kosong. Organizer tidak bisa keluar dari match-nya sendiri, dan pemain
+    hanya bisa keluar dari match yang masih Pending dan belum mulai.
+    Mengembalikan id user yang dipromosikan (atau None).
+    """
+    if match.organizer_id == user.pk:
+        raise JoinRejected("organizer")
+    starts_at = timezone.make_aware(datetime.datetime.combine(match.match_date, match.start_time))
+    if match.status != "Pending" or starts_at <= timezone.now():
+        raise JoinRejected("unavailable")
+    deleted, _ = MatchPlayer.objects.filter(match=match, user=user).delete()
+    if not deleted:
+        raise JoinRejected("not_joined")
+    return promote_waitlist(match)
@@ -0,0 +1,71 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bookings.models import Booking
+from matches.models import Match, MatchPlayer
+from matches.recommendations import invalidate_index, invalidate_profile
+from matches.services import bump_joinable_version, schedule_waitlist_promotion
+
+
+@receiver(post_save, sender=MatchPlayer)
+def increment_player_count(sender, instance, created=False, raw=False, **kwargs):
+    # Update atomik di database, tidak membaca-lalu-menulis jumlah pemain.
+    # join_match (matches/services.py) sudah menaikkan counternya sendiri.
+    if not created or raw:
+        return
+    if getattr(instance, "_counted", False):
+        instance._counted = False
+        return
+    Match.objects.filter(pk=instance.match_id).update(player_count=F("player_count") + 1)
+
+
+@receiver(post_delete, sender=MatchPlayer)
+def decrement_player_count(sender, instance, **kwargs):
+    Match.objects.filter(pk=instance.match_id, player_count__gt=0).update(player_count=F("player_count") - 1)
+    # Kursi yang dilepas lewat jalur mana pun (admin, cascade) diisi dari antrean;
+    # leave_match sudah mempromosikan dalam transaksinya, promosi ulang di sini no-op
+    schedule_waitlist_promotion(instance.match_id)
+
+
+@receiver(post_save, sender=Match)
+def promote_on_capacity_increase(sender, instance, created=False, raw=False, **kwargs):
+    # max_players dinaikkan -> kursi baru diisi dari antrean. Nilai saat dimuat tidak
+    # diketahui (instance baru / kolom di-defer) -> promosi tetap dijadwalkan, hasilnya no-op
+    if created or raw:
+        return
+    loaded = getattr(instance, "_loaded_max_players", None)
+    if loaded is None or instance.max_players > loaded:
+        schedule_waitlist_promotion(instance.pk)
+
+
+@receiver(post_save, sender=Match)
+@receiver(post_delete, sender=Match)
+@receiver(post_save, sender=MatchPlayer)
+@receiver(post_delete, sender=MatchPlayer)
+def invalidate_joinable_matches(sender, raw=False, **kwargs):
+    # Match dibuat/diubah atau ada yang join -> daftar match yang di-cache basi. Versi naik
+    # setelah commit agar pembaca yang bersamaan tidak meng-cache daftar lama di versi baru
+    if not raw:
+        transaction.on_commit(bump_joinable_version)
+
+
+@receiver(post_save, sender=MatchPlayer)
+@receiver(post_delete, sender=MatchPlayer)
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_recommendation_profile(sender, instance, raw=False, **kwargs):
+    # Riwayat main user berubah -> profil rekomendasinya dihitung ulang (setelah commit,
+    # agar pembaca yang bersamaan tidak meng-cache profil dari data sebelum commit)
+    if not raw:
+        user_id = instance.user_id
+        transaction.on_commit(lambda: invalidate_profile(user_id))
+
+
+@receiver(post_save, sender=Match)
+def invalidate_recommendation_index(sender, created=False, raw=False, **kwargs):
+    # Match baru ikut lewat watermark; match lama yang dijadwal ulang (tanggal, jam, field,
+    # skill level) perlu index dibangun ulang agar fitur dan urutannya tidak basi
+    if not created and not raw:
+        transaction.on_commit(invalidate_index)
@@ -1,3 +1,432 @@
-from django.test import TestCase
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from fields.models import Field
+from bookings.models import Booking
+from bookings.testing import make_field, make_match
+from matches import recommendations
+from matches.models import Match, MatchPlayer, WaitlistEntry
+from matches.recommendations import build_profile, recommend_matches
+from matches.services import (
+    MATCHES_PER_PAGE, JoinRejected, get_joinable_page, join_match, join_waitlist, joinable_cache_key, joinable_matches,
+    leave_match, waitlist_position,
+)
+
+
+class PlayerCountTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user(username="organizer", password="pw")
+        self.player = User.objects.create_user(username="player", password="pw")
+        self.field = make_field()
+        self.date = timezone.localdate() + datetime.timedelta(days=2)
+
+    def test_count_follows_join_and_leave(self):
+        match = make_match(self.organizer, self.field, self.date, 10)
+        joined = MatchPlayer.objects.create(match=match, user=self.player)
+        match.refresh_from_db()
+        self.assertEqual(match.player_count, 2)
+
+        joined.delete()
+        match.refresh_from_db()
+        self.assertEqual(match.player_count, 1)
+
+    def test_stale_save_keeps_count(self):
+        match = make_match(self.organizer, self.field, self.date, 10)
+        stale = Match.objects.get(pk=match.pk)
+        MatchPlayer.objects.create(match=match, user=self.player)
+
+        stale.description = "Bawa sepatu futsal"
+        stale.save()
+        match.refresh_from_db()
+        self.assertEqual(match.player_count, 2)
+        self.assertEqual(match.description, "Bawa sepatu futsal")
+
+    def test_save_keeps_default_semantics(self):
+        match = make_match(self.organizer, self.field, self.date, 10)
+        deleted = Match.objects.get(pk=match.pk)
+        Match.objects.filter(pk=match.pk).delete()
+        # Baris yang sudah dihapus dimasukkan ulang, bukan DatabaseError dari update_fields
+        deleted.save()
+        self.assertTrue(Match.objects.filter(pk=match.pk).exists())
+
+    def test_open_matches_filters_full_in_sql(self):
+        open_match = make_match(self.organizer, self.field, self.date, 10, max_players=4)
+        full = make_match(self.organizer, self.field, self.date, 11, max_players=2)
+        MatchPlayer.objects.create(match=full, user=self.player)
+        make_match(self.organizer, self.field, self.date, 12, status="Cancelled")
+
+        matches = list(joinable_matches(timezone.now()))
+        self.assertEqual([match.id for match in matches], [open_match.id])
+        self.assertEqual(matches[0].current_player_count, 1)
+        self.assertEqual(matches[0].spots_left, 3)
+        self.assertEqual(matches[0].progress_percentage, 25.0)
+        self.assertFalse(matches[0].is_full)
+
+    def test_show_matches_loads_only_visible_page(self):
+        for hour in range(6, 6 + MATCHES_PER_PAGE + 3):
+            make_match(self.organizer, self.field, self.date, hour)
+        self.client.force_login(self.organizer)
+
+        # session + user + count + halaman + user_joined, tanpa query per match
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("matches:show_matches"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["match_count"], MATCHES_PER_PAGE + 3)
+        self.assertEqual(len(response.context["matches"]), MATCHES_PER_PAGE)
+        self.assertContains(response, "Already Joined", count=MATCHES_PER_PAGE)
+
+        response = self.client.get(reverse("matches:show_matches"), {"page": 2})
+        self.assertEqual(len(response.context["matches"]), 3)
+
+
+class JoinableMatchesServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user(username="organizer", password="pw")
+        self.player = User.objects.create_user(username="player", password="pw")
+        self.futsal = make_field("Futsal Senayan")
+        self.padel = Field.objects.create(
+            name="Padel Kemang", image="img.jpg", price=200000, rating=4.5,
+            location="Jakarta Selatan", sport="padel", url="https://example.com/padel",
+        )
+        self.date = timezone.localdate() + datetime.timedelta(days=2)
+        self.futsal_match = make_match(self.organizer, self.futsal, self.date, 10)
+        self.padel_match = make_match(self.organizer, self.padel, self.date, 11)
+
+    def ids(self, page):
+        return [match.id for match in page]
+
+    def test_search_and_sport_filter(self):
+        self.assertEqual(self.ids(get_joinable_page(query="kemang")), [self.padel_match.id])
+        self.assertEqual(self.ids(get_joinable_page(sport="futsal")), [self.futsal_match.id])
+        self.assertEqual(self.ids(get_joinable_page(query="kemang", sport="futsal")), [])
+
+    def test_cached_page_is_shared_and_invalidated_on_join(self):
+        get_joinable_page(user=self.organizer)
+        # Cache hit: baris match lewat primary key + query user_joined, tanpa COUNT
+        with self.assertNumQueries(2):
+            page = get_joinable_page(user=self.player)
+        self.assertEqual(self.ids(page), [self.futsal_match.id, self.padel_match.id])
+        self.assertEqual(page[0].organizer.username, "organizer")
+        self.assertFalse(any(match.user_joined for match in page))
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            MatchPlayer.objects.create(match=self.futsal_match, user=self.player)
+            # Sebelum commit versi belum naik, tapi baris match selalu dimuat ulang
+            self.assertEqual(get_joinable_page(user=self.player)[0].current_player_count, 2)
+        for callback in callbacks:
+            callback()
+        page = get_joinable_page(user=self.player)
+        self.assertEqual(page[0].current_player_count, 2)
+        self.assertTrue(page[0].user_joined)
+
+    def test_cache_holds_only_ids(self):
+        now = timezone.now()
+        get_joinable_page(now=now)
+        cached = cache.get(joinable_cache_key("", "", 1, MATCHES_PER_PAGE, now))
+        # Tanpa instance Match/User (hash password, email) di cache
+        self.assertEqual(cached, (2, 1, [self.futsal_match.id, self.padel_match.id]))
+
+    def test_new_match_invalidates(self):
+        self.assertEqual(get_joinable_page().paginator.count, 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_match(self.organizer, self.futsal, self.date, 12)
+        self.assertEqual(get_joinable_page().paginator.count, 3)
+
+    def test_homepage_and_search_use_service(self):
+        response = self.client.get(reverse("main:show_main"))
+        self.assertContains(response, "Futsal Senayan")
+        response = self.client.get(reverse("main:search_matches"), {"q": "padel"})
+        self.assertContains(response, "Padel Kemang")
+        self.assertNotContains(response, "Futsal Senayan")
+
+
+class JoinMatchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user(username="organizer", password="pw")
+        self.player = User.objects.create_user(username="player", password="pw")
+        self.field = make_field()
+        self.date = timezone.localdate() + datetime.timedelta(days=2)
+        self.match = make_match(self.organizer, self.field, self.date, 10, max_players=2)
+
+    def test_join_until_full(self):
+        self.assertEqual(join_match(self.match, self.player), 2)
+        late = User.objects.create_user(username="late", password="pw")
+        with self.assertRaises(JoinRejected) as raised:
+            join_match(self.match, late)
+        self.assertEqual(raised.exception.reason, "full")
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.player_count, 2)
+
+    def test_already_joined_rolls_back_seat(self):
+        with self.assertRaises(JoinRejected) as raised:
+            join_match(self.match, self.organizer)
+        self.assertEqual(raised.exception.reason, "already_joined")
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.player_count, 1)
+
+    def test_view_messages(self):
+        self.client.force_login(self.player)
+        url = reverse("matches:show_join_match", args=[self.match.id])
+        response = self.client.post(url, follow=True)
+        self.assertContains(response, "Successfully joined the match")
+        self.assertContains(response, "The match is now full!")
+        response = self.client.post(url, follow=True)
+        self.assertContains(response, "You have already joined this match.")
+        self.assertEqual(MatchPlayer.objects.filter(match=self.match).count(), 2)
+
+
+class WaitlistTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user(username="organizer", password="pw")
+        self.player = User.objects.create_user(username="player", password="pw")
+        self.first = User.objects.create_user(username="first", password="pw")
+        self.second = User.objects.create_user(username="second", password="pw")
+        self.match = make_match(
+            self.organizer, make_field(), timezone.localdate() + datetime.timedelta(days=2), 10, max_players=2,
+        )
+        join_match(self.match, self.player)
+
+    def test_fifo_positions(self):
+        self.assertEqual(join_waitlist(self.match, self.first), 1)
+        self.assertEqual(join_waitlist(self.match, self.second), 2)
+        # Mengantre ulang tidak mengubah posisi
+        self.assertEqual(join_waitlist(self.match, self.first), 1)
+        with self.assertNumQueries(2):
+            self.assertEqual(waitlist_position(self.match.id, self.second), 2)
+        self.assertIsNone(waitlist_position(self.match.id, self.player))
+        with self.assertRaises(JoinRejected):
+            join_waitlist(self.match, self.player)
+
+    def test_leave_promotes_head(self):
+        join_waitlist(self.match, self.first)
+        join_waitlist(self.match, self.second)
+
+        self.assertEqual(leave_match(self.match, self.player), self.first.id)
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.player_count, 2)
+        self.assertEqual(
+            set(MatchPlayer.objects.filter(match=self.match).values_list("user_id", flat=True)),
+            {self.organizer.id, self.first.id},
+        )
+        self.assertEqual(waitlist_position(self.match.id, self.second), 1)
+
+    def test_leave_without_waitlist_frees_seat(self):
+        self.assertIsNone(leave_match(self.match, self.player))
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.player_count, 1)
+
+    def test_join_waitlist_takes_seat_freed_before_queueing(self):
+        # Kursi kosong di antara penolakan "full" dan masuk antrean
+        MatchPlayer.objects.filter(match=self.match, user=self.player).delete()
+        self.assertIsNone(join_waitlist(self.match, self.first))
+        self.assertTrue(MatchPlayer.objects.filter(match=self.match, user=self.first).exists())
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_removal_outside_leave_match_promotes_head(self):
+        join_waitlist(self.match, self.first)
+        join_waitlist(self.match, self.second)
+        # Dihapus lewat admin / queryset, bukan leave_match
+        with self.captureOnCommitCallbacks(execute=True):
+            MatchPlayer.objects.filter(match=self.match, user=self.player).delete()
+        self.assertTrue(MatchPlayer.objects.filter(match=self.match, user=self.first).exists())
+        self.assertEqual(waitlist_position(self.match.id, self.second), 1)
+
+        # Akun pemain dihapus -> MatchPlayer ikut terhapus (cascade)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.delete()
+        self.assertTrue(MatchPlayer.objects.filter(match=self.match, user=self.second).exists())
+        self.assertFalse(WaitlistEntry.objects.exists())
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.player_count, 2)
+
+    def test_raising_max_players_promotes_queue(self):
+        join_waitlist(self.match, self.first)
+        join_waitlist(self.match, self.second)
+        match = Match.objects.get(pk=self.match.pk)
+        match.description = "Tanpa perubahan kapasitas"
+        with mock.patch("matches.signals.schedule_waitlist_promotion") as schedule:
+            match.save()
+        schedule.assert_not_called()
+
+        match.max_players = 4
+        with self.captureOnCommitCallbacks(execute=True):
+            match.save()
+        self.assertFalse(WaitlistEntry.objects.exists())
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.player_count, 4)
+
+    def test_organizer_cannot_leave(self):
+        with self.assertRaises(JoinRejected) as raised:
+            leave_match(self.match, self.organizer)
+        self.assertEqual(raised.exception.reason, "organizer")
+
+    def test_only_pending_upcoming_matches_can_be_left(self):
+        self.match.status = "Confirmed"
+        self.match.save()
+        with self.assertRaises(JoinRejected) as raised:
+            leave_match(self.match, self.player)
+        self.assertEqual(raised.exception.reason, "unavailable")
+
+        started = make_match(self.organizer, make_field("Lapangan B"), timezone.localdate() - datetime.timedelta(days=1), 10)
+        MatchPlayer.objects.create(match=started, user=self.player)
+        with self.assertRaises(JoinRejected):
+            leave_match(started, self.player)
+        self.assertEqual(MatchPlayer.objects.filter(user=self.player).count(), 2)
+
+    def test_full_match_card_offers_waitlist(self):
+        url = reverse("matches:show_matches")
+        self.client.force_login(self.first)
+        self.assertContains(self.client.get(url), "Join Waitlist")
+
+        self.client.post(reverse("matches:show_join_match", args=[self.match.id]))
+        response = self.client.get(url)
+        self.assertContains(response, "Waitlist #<span data-waitlist-position>1</span>", html=False)
+        self.assertContains(response, reverse("matches:show_leave_waitlist", args=[self.match.id]))
+        self.assertContains(response, reverse("matches:waitlist_position_json", args=[self.match.id]))
+
+        # Pemain match yang penuh tetap bisa keluar (dan mempromosikan antrean)
+        self.client.force_login(self.player)
+        self.assertContains(self.client.get(url), reverse("matches:show_leave_match", args=[self.match.id]))
+
+    def test_views(self):
+        self.client.force_login(self.first)
+        response = self.client.post(reverse("matches:show_join_match", args=[self.match.id]), follow=True)
+        self.assertContains(response, "You are #1 on the waitlist")
+        response = self.client.get(reverse("matches:waitlist_position_json", args=[self.match.id]))
+        self.assertEqual(response.json(), {"status": "success", "position": 1, "joined": False})
+
+        self.client.force_login(self.player)
+        self.client.post(reverse("matches:show_leave_match", args=[self.match.id]))
+
+        self.client.force_login(self.first)
+        response = self.client.get(reverse("matches:waitlist_position_json", args=[self.match.id]))
+        self.assertEqual(response.json(), {"status": "success", "position": None, "joined": True})
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+
+class RecommendationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        recommendations._index.reset()
+        self.user = User.objects.create_user(username="player", password="pw")
+        self.organizer = User.objects.create_user(username="organizer", password="pw")
+        self.futsal = make_field("Futsal Senayan")
+        self.padel = Field.objects.create(
+            name="Padel Kemang", image="img.jpg", price=200000, rating=4.5,
+            location="Jakarta Selatan", sport="padel", url="https://example.com/padel",
+        )
+        self.past = timezone.localdate() - datetime.timedelta(days=7)
+        self.date = timezone.localdate() + datetime.timedelta(days=3)
+        # Riwayat: padel sore hari, level Intermediate
+        Booking.objects.create(
+            user=self.user, field=self.padel, booking_date=self.past,
+            start_time=datetime.time(18, 0), end_time=datetime.time(19, 0),
+        )
+        history = make_match(self.organizer, self.padel, self.past, 19)
+        history.skill_level = "Intermediate"
+        history.save()
+        MatchPlayer.objects.create(match=history, user=self.user)
+
+    def test_profile(self):
+        profile = build_profile(self.user.id)
+        self.assertEqual(profile["sports"], {"padel": 1.0})
+        self.assertEqual(profile["hours"], {18: 0.5, 19: 0.5})
+        self.assertEqual(profile["skills"], {"Intermediate": 1.0})
+
+    def test_ranks_by_profile_and_skips_joined_and_full(self):
+        morning_futsal = make_match(self.organizer, self.futsal, self.date, 8)
+        evening_padel = make_match(self.organizer, self.padel, self.date, 18)
+        full_padel = make_match(self.organizer, self.padel, self.date, 19, max_players=1)
+        joined_padel = make_match(self.organizer, self.padel, self.date + datetime.timedelta(days=1), 18)
+        MatchPlayer.objects.create(match=joined_padel, user=self.user)
+
+        ranked = recommend_matches(self.user, k=5)
+        self.assertEqual([match.id for match in ranked], [evening_padel.id, morning_futsal.id])
+        self.assertNotIn(full_padel.id, [match.id for match in ranked])
+        self.assertGreater(ranked[0].score, ranked[1].score)
+
+    def test_new_matches_added_incrementally(self):
+        self.assertEqual(recommend_matches(self.user), [])
+        built_at = recommendations._index.built_at
+        match = make_match(self.organizer, self.padel, self.date, 18)
+        self.assertEqual([m.id for m in recommend_matches(self.user)], [match.id])
+        self.assertEqual(recommendations._index.built_at, built_at)
+
+    def test_rescheduled_match_is_reindexed(self):
+        evening = make_match(self.organizer, self.padel, self.date + datetime.timedelta(days=1), 18)
+        morning = make_match(self.organizer, self.padel, self.date, 8)
+        self.assertEqual([m.id for m in recommend_matches(self.user)], [evening.id, morning.id])
+
+        # Dipindah ke jam yang biasa dimainkan user -> skor sama, mulai lebih dulu
+        with self.captureOnCommitCallbacks(execute=True):
+            morning.start_time, morning.end_time = datetime.time(18, 0), datetime.time(19, 0)
+            morning.save()
+        self.assertEqual([m.id for m in recommend_matches(self.user)], [morning.id, evening.id])
+
+    def test_stale_index_rows_are_backfilled(self):
+        matches = [make_match(self.organizer, self.padel, self.date, hour) for hour in range(8, 20)]
+        recommend_matches(self.user, k=1)
+        # Match teratas dibatalkan setelah masuk index
+        Match.objects.filter(pk=matches[10].pk).update(status="Cancelled")
+        ranked = recommend_matches(self.user, k=1)
+        self.assertEqual(len(ranked), 1)
+        self.assertNotEqual(ranked[0].id, matches[10].id)
+
+    def test_endpoint(self):
+        make_match(self.organizer, self.padel, self.date, 18)
+        self.assertEqual(self.client.get(reverse("matches:recommended_matches_json")).status_code, 401)
+        self.client.force_login(self.user)
+        data = self.client.get(reverse("matches:recommended_matches_json"), {"limit": 3}).json()
+        self.assertEqual(data["status"], "success")
+        self.assertEqual(data["matches"][0]["field"], "Padel Kemang")
+        self.assertEqual(data["matches"][0]["start_time"], "18:00")
+
+
+class JoinMatchStressTest(TransactionTestCase):
+    """
+    Ratusan join bersamaan ke satu match: jumlah pemain akhir tepat max_players.
+    """
+    JOINS = 200
+    WORKERS = 16
+    MAX_PLAYERS = 10
+
+    def test_concurrent_joins_never_exceed_capacity(self):
+        cache.clear()
+        organizer = User.objects.create_user(username="organizer", password="pw")
+        match = make_match(organizer, make_field(), timezone.localdate() + datetime.timedelta(days=2), 10,
+                           max_players=self.MAX_PLAYERS)
+        users = User.objects.bulk_create([User(username=f"user{index}") for index in range(self.JOINS)])
+        barrier = threading.Barrier(self.WORKERS)
+
+        def join(index):
+            if index < self.WORKERS:
+                barrier.wait()
+            try:
+                join_match(match, users[index])
+                return "joined"
+            except JoinRejected as error:
+                return error.reason
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as executor:
+            results = list(executor.map(join, range(self.JOINS)))
+
+        self.assertEqual(results.count("joined"), self.MAX_PLAYERS - 1)
+        self.assertEqual(results.count("full"), self.JOINS - self.MAX_PLAYERS + 1)
+        match.refresh_from_db()
+        self.assertEqual(match.player_count, self.MAX_PLAYERS)
+        self.assertEqual(MatchPlayer.objects.filter(match=match).count(), self.MAX_PLAYERS)
@@ -1,6 +1,9 @@
 from django.urls import path
 
-from matches.views import get_match_slots_ajax, show_create_match, show_join_match, show_matches
+from matches.views import (
+    get_match_slots_ajax, show_create_match, show_join_match, show_leave_match, show_leave_waitlist, show_matches,
+    recommended_matches_json, waitlist_position_json,
+)
 
 app_name = "matches"
 
@@ -8,5 +11,9 @@ urlpatterns = [
     path("", show_matches, name="show_matches"),
     path("create/", show_create_match, name="show_create_match"),
     path("join/<int:match_id>/", show_join_match, name="show_join_match"),
+    path("leave/<int:match_id>/", show_leave_match, name="show_leave_match"),
+    path("waitlist/<int:match_id>/leave/", show_leave_waitlist, name="show_leave_waitlist"),
+    path("waitlist/<int:match_id>/position/", waitlist_position_json, name="waitlist_position_json"),
+    path("recommended/", recommended_matches_json, name="recommended_matches_json"),
     path("get_slots/<int:field_id>/", get_match_slots_ajax, name="get_match_slots_ajax"),
 ]
@@ -6,47 +6,33 @@ from django.contrib import messages
 from django.utils import timezone
 from .models import Match, MatchPlayer
 from .forms import CreateMatchForm
-from django.db import IntegrityError
+from .recommendations import DEFAULT_RECOMMENDATIONS, MAX_RECOMMENDATIONS, recommend_matches
+from .services import (
+    JoinRejected, get_joinable_page, join_match, join_waitlist, leave_match, leave_waitlist, waitlist_position,
+)
 import datetime
 from fields.models import Field 
-from bookings.models import Booking
+from bookings.reservations import SlotUnavailable, reserve_match
+from bookings.availability import MAX_DAYS_AHEAD, get_day_slots
 
 @login_required
 def show_matches(request):
-    # get date now
-    now = timezone.now()
-
-    # get available matches to join
-    available_matches_qs = Match.objects.filter(
-        status="Pending",
-        match_date__gte=now.date()
-    ).exclude(
-        # exclude those with today's date and less than current time
-        match_date=now.date(), end_time__lte=now.time()
-    ).select_related("organizer", "field").prefetch_related("matchplayer_set")
-
-    matches_to_display = []
-    # get matches to display
-    for match in available_matches_qs:
-        current_player_count = match.matchplayer_set.count()
-        is_full = current_player_count >= match.max_players
-
-        if not is_full:
-            match.current_player_count = current_player_count
-            match.spots_left = max(0, match.max_players - current_player_count)
-            match.is_full = is_full
-            
-            if match.max_players > 0:
-                match.progress_percentage = (current_player_count / match.max_players) * 100
-            else:
-                match.progress_percentage = 0
-            
-            matches_to_display.append(match)
+    # match yang bisa di-join (di-cache, matches/services.py), termasuk yang penuh agar
+    # user bisa masuk antrean dan pemainnya tetap bisa keluar
+    query = request.GET.get("q", "")
+    sport = request.GET.get("sport", "")
+    page_obj = get_joinable_page(
+        page=request.GET.get("page", 1), query=query, sport=sport, user=request.user, include_full=True,
+    )
 
     # pass it to context
     context = {
-        "matches": matches_to_display,
-        "match_count": len(matches_to_display)
+        "matches": page_obj,
+        "page_obj": page_obj,
+        "match_count": page_obj.paginator.count,
+        "query": query,
+        "selected_sport": sport,
+        "sport_categories": Field.SPORT_CATEGORY,
     }
 
     return render(request, "match_list.html", context)
@@ -59,11 +45,9 @@ def show_create_match(request):
         if form.is_valid():
             field = form.cleaned_data["field"]
             match_date = form.cleaned_data["match_date"]
-            time_slot_str = form.cleaned_data["time_slot"]
-            
-            start_time_str, end_time_str = time_slot_str.split("-")
-            start_time = datetime.datetime.strptime(start_time_str, "%H:%M").time()
-            end_time = datetime.datetime.strptime(end_time_str, "%H:%M").time()
+            # sudah divalidasi terhadap grid slot field di form.clean()
+            start_time = form.cleaned_data["start_time"]
+            end_time = form.cleaned_data["end_time"]
 
             now = timezone.localtime(timezone.now())
 
@@ -71,28 +55,26 @@ def show_create_match(request):
             if match_date < now.date() or (match_date == now.date() and start_time < now.time()):
                 messages.error(request, "Cannot create a match for a time slot that has already passed.")
             
-            elif Booking.objects.filter(field=field, booking_date=match_date, start_time=start_time).exists():
-                messages.error(request, "This time slot is already booked directly. Please select another.")
-
-            elif Match.objects.filter(field=field, match_date=match_date, start_time=start_time, status__in=["Pending", "Confirmed"]).exists():
-                messages.error(request, "This time slot is already taken by another match. Please select another.")
-            
-            # create match if there is no errors
+            # create match if there is no errors (slot diklaim atomik bersama booking)
             else:
-                match = Match.objects.create(
-                    organizer=request.user,
-                    field=field,
-                    match_date=match_date,
-                    start_time=start_time,
-                    end_time=end_time,
-                    skill_level=form.cleaned_data["skill_level"],
-                    max_players=form.cleaned_data["max_players"],
-                    price_per_person=form.cleaned_data["price_per_person"],
-                    description=form.cleaned_data["description"],
-                    status="Pending"
-                )
-                
-                MatchPlayer.objects.create(match=match, user=request.user)
+                try:
+                    match = reserve_match(
+                        request.user,
+                        field,
+                        match_date,
+                        start_time,
+                        end_time,
+                        skill_level=form.cleaned_data["skill_level"],
+                        max_players=form.cleaned_data["max_players"],
+                        price_per_person=form.cleaned_data["price_per_person"],
+                        description=form.cleaned_data["description"],
+                    )
+                except SlotUnavailable as error:
+                    if error.taken_by == "match":
+                        messages.error(request, "This time slot is already taken by another match. Please select another.")
+                    else:
+                        messages.error(request, "This time slot is already booked directly. Please select another.")
+                    return render(request, "create_match_form.html", { "form": form })
 
                 messages.success(request, f"Match room created successfully for {match.field.name} on {match.match_date}.")
                 return redirect("matches:show_matches")
@@ -111,15 +93,13 @@ def show_create_match(request):
 @login_required
 @require_POST
 def show_join_match(request, match_id):
-    match = get_object_or_404(Match.objects.prefetch_related("matchplayer_set"), pk=match_id)
+    match = get_object_or_404(Match.objects.select_related("field"), pk=match_id)
 
     now = timezone.now()
     match_end_datetime = timezone.make_aware(
         datetime.datetime.combine(match.match_date, match.end_time)
     )
     is_past = match_end_datetime < now
-    current_player_count = match.matchplayer_set.count()
-    is_full = current_player_count >= match.max_players
 
     # cannot join completed matches
     if match.status != "Pending":
@@ -128,31 +108,107 @@ def show_join_match(request, match_id):
     if is_past:
         messages.error(request, "This match has already passed.")
         return redirect("matches:show_matches")
-    if is_full:
-        messages.error(request, "This match is already full.")
+
+    try:
+        # kapasitas dicek & kursi diambil atomik di database (aman untuk join bersamaan)
+        player_count = join_match(match, request.user)
+    except JoinRejected as error:
+        if error.reason == "already_joined":
+            messages.warning(request, "You have already joined this match.")
+        elif error.reason == "full":
+            # masuk antrean; kursi diisi otomatis saat ada pemain yang keluar
+            position = join_waitlist(match, request.user)
+            if position is None:
+                # kursi kosong tepat saat mengantre, langsung dipromosikan
+                messages.success(request, f"Successfully joined the match at {match.field.name}.")
+            else:
+                messages.info(request, f"This match is already full. You are #{position} on the waitlist and will join automatically when a spot opens.")
+        else:
+            messages.error(request, "This match is no longer available to join.")
         return redirect("matches:show_matches")
 
+    messages.success(request, f"Successfully joined the match at {match.field.name}.")
+    if player_count >= match.max_players:
+        messages.info(request, "The match is now full!")
+
+    return redirect("matches:show_matches")
+
+@login_required
+@require_POST
+def show_leave_match(request, match_id):
+    match = get_object_or_404(Match.objects.select_related("field"), pk=match_id)
+
     try:
-        # try to create a MatchPlayer object
-        MatchPlayer.objects.create(match=match, user=request.user)
-        messages.success(request, f"Successfully joined the match at {match.field.name}.")
-        
-        if (current_player_count + 1) >= match.max_players:
-            messages.info(request, "The match is now full!")
-    except IntegrityError:
-        messages.warning(request, "You have already joined this match.")
-    except Exception as e:
-        messages.error(request, f"An error occurred while joining: {e}")
+        # kursi yang kosong langsung diisi kepala antrean dalam transaksi yang sama
+        leave_match(match, request.user)
+    except JoinRejected as error:
+        if error.reason == "organizer":
+            messages.error(request, "Organizers cannot leave their own match.")
+        elif error.reason == "unavailable":
+            messages.error(request, "You can only leave a pending match before it starts.")
+        else:
+            messages.warning(request, "You are not a player in this match.")
+        return redirect("matches:show_matches")
 
+    messages.success(request, f"You left the match at {match.field.name}.")
     return redirect("matches:show_matches")
 
+@login_required
+@require_POST
+def show_leave_waitlist(request, match_id):
+    match = get_object_or_404(Match, pk=match_id)
+    leave_waitlist(match, request.user)
+    messages.success(request, "You left the waitlist.")
+    return redirect("matches:show_matches")
+
+def waitlist_position_json(request, match_id):
+    """
+    Posisi antrean user untuk satu match (query kecil ber-index), pengganti polling daftar match.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({ "status": "error", "message": "Authentication required" }, status=401)
+
+    position = waitlist_position(match_id, request.user)
+    joined = position is None and MatchPlayer.objects.filter(match_id=match_id, user=request.user).exists()
+    return JsonResponse({ "status": "success", "position": position, "joined": joined })
+
+def recommended_matches_json(request):
+    """
+    Top-k match yang cocok dengan riwayat main user (sport, field, jam, skill level).
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({ "status": "error", "message": "Authentication required" }, status=401)
+
+    try:
+        limit = min(max(int(request.GET.get("limit", DEFAULT_RECOMMENDATIONS)), 1), MAX_RECOMMENDATIONS)
+    except ValueError:
+        limit = DEFAULT_RECOMMENDATIONS
+
+    matches = recommend_matches(request.user, limit)
+    data = [
+        {
+            "id": match.id,
+            "sport": match.sport,
+            "field": match.field.name,
+            "location": match.field.location,
+            "match_date": match.match_date.isoformat(),
+            "start_time": match.start_time.strftime("%H:%M"),
+            "end_time": match.end_time.strftime("%H:%M"),
+            "skill_level": match.skill_level,
+            "spots_left": match.spots_left,
+            "score": match.score,
+        }
+        for match in matches
+    ]
+    return JsonResponse({ "status": "success", "matches": data })
+
 def get_match_slots_ajax(request, field_id):
     date_str = request.GET.get("date")
 
     booking_date = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
 
     today = timezone.now().date()
-    max_date = today + datetime.timedelta(days=30)
+    max_date = today + datetime.timedelta(days=MAX_DAYS_AHEAD)
 
     if booking_date > max_date:
         return JsonResponse({ "error": "Cannot check availability more than 30 days in advance.", "slots": [] }, status=400)
@@ -160,47 +216,5 @@ def get_match_slots_ajax(request, field_id):
     if not Field.objects.filter(pk=field_id).exists():
         return JsonResponse({"error": "Field not found."}, status=404)
 
-    booked_times = set(
-        Booking.objects.filter(field_id=field_id, booking_date=booking_date).values_list("start_time", flat=True)
-    )
-    
-    match_times = set(
-        Match.objects.filter(
-            field_id=field_id, 
-            match_date=booking_date, 
-            status__in=["Pending", "Confirmed"]
-        ).values_list("start_time", flat=True)
-    )
-    
-    unavailable_times = booked_times.union(match_times)
-    
-    slots = [
-        (datetime.time(10, 0), datetime.time(11, 0)),
-        (datetime.time(11, 0), datetime.time(12, 0)),
-        (datetime.time(12, 0), datetime.time(13, 0)),
-        (datetime.time(13, 0), datetime.time(14, 0)),
-    ]
-
-    slots_with_status = []
-    now_time = timezone.localtime(timezone.now()).time()
-
-    for start, end in slots:
-        is_unavailable = start in unavailable_times
-        is_past = (booking_date < today) or (booking_date == today and start < now_time)
-
-        status = "available"
-        if is_past:
-            status = "past"
-        elif is_unavailable:
-            if start in booked_times:
-                status = "booked"
-            else:
-                status = "match_created"
-        
-        slots_with_status.append({
-            "start": start.strftime("%H:%M"),
-            "end": end.strftime("%H:%M"),
-            "status": status
-        })
-
-    return JsonResponse({ "slots": slots_with_status })
+    # slot status from the shared availability engine (same as bookings)
+    return JsonResponse({ "slots": get_day_slots(field_id, booking_date) })
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches_flutter', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='match',
+            name='time_slot',
+            field=models.CharField(max_length=20),
+        ),
+    ]
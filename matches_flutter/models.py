@@ -4,17 +4,11 @@ from django.contrib.auth.models import User
 from fields.models import Field
 
 class Match(models.Model):
-    TIME_SLOTS = [
-        ("10.00-11.00", "10.00 - 11.00"),
-        ("11.00-12.00", "11.00 - 12.00"),
-        ("12.00-13.00", "12.00 - 13.00"),
-        ("13.00-14.00", "13.00 - 14.00"),
-    ]
-
     field = models.ForeignKey(Field, on_delete=models.CASCADE)
     creator = models.ForeignKey(User, on_delete=models.CASCADE)
     date = models.DateField()
-    time_slot = models.CharField(max_length=20, choices=TIME_SLOTS)
+    # Label kanonik "HH:MM-HH:MM" dari grid slot field (bookings/schedule.py)
+    time_slot = models.CharField(max_length=20)
     
     price = models.IntegerField(default=0)
     current_players = models.IntegerField(default=1)
@@ -1,3 +1,47 @@
+import datetime
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from fields.models import Field
+from matches_flutter.models import Match
+
+
+class MatchListApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="user", password="password123")
+        self.client.login(username="user", password="password123")
+        self.field = Field.objects.create(
+            name="Lapangan A", image="img.jpg", price=100000, rating=4.0,
+            location="Jakarta", sport="futsal", url="https://example.com/lapangan-a",
+        )
+        self.date = timezone.localdate() + datetime.timedelta(days=1)
+        self.url = reverse("matches_flutter:match_list_api")
+
+    def post(self, time_slot):
+        payload = {"field_id": self.field.id, "date": self.date.isoformat(), "time_slot": time_slot}
+        return self.client.post(self.url, json.dumps(payload), content_type="application/json")
+
+    def test_slot_spellings_are_the_same_slot(self):
+        response = self.post("10:00-11:00")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["data"]["time_slot"], "10:00-11:00")
+
+        response = self.post("10.00-11.00")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["message"], "This time slot is already booked.")
+        self.assertEqual(Match.objects.count(), 1)
+
+    def test_stores_canonical_label(self):
+        self.assertEqual(self.post("10.00-11.00").status_code, 201)
+        self.assertEqual(Match.objects.get().time_slot, "10:00-11:00")
+        self.assertEqual(self.post("10:00-11:00").status_code, 400)
 
-# Create your tests here.
+    def test_unknown_slot_rejected(self):
+        self.assertEqual(self.post("10:15-11:15").status_code, 400)
+        self.assertFalse(Match.objects.exists())
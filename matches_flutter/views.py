@@ -1,7 +1,9 @@
+import datetime
 import json
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
 from django.contrib.auth.models import User
+from bookings.schedule import resolve_slot, slot_label
 from fields.models import Field
 from matches_flutter.models import Match
 
@@ -32,18 +34,35 @@ def match_list_api(request):
         field_id = data.get("field_id")
         time_slot = data.get("time_slot")
         date_str = data.get("date")
-        
-        if Match.objects.filter(field_id=field_id, date=date_str, time_slot=time_slot).exists():
-            return JsonResponse(
-                {"status": "error", "message": "This time slot is already booked."},
-                status=400
-            )
+
+        try:
+            match_date = datetime.date.fromisoformat(str(date_str))
+        except ValueError:
+            return JsonResponse({"status": "error", "message": "date must be YYYY-MM-DD"}, status=400)
 
         try:
             field = Field.objects.get(id=field_id)
         except Field.DoesNotExist:
             return JsonResponse({"status": "error", "message": "Field not found"}, status=404)
 
+        slot = resolve_slot(field.id, match_date, time_slot)
+        if slot is None:
+            return JsonResponse(
+                {"status": "error", "message": "This time slot is not available for the selected date."},
+                status=400
+            )
+
+        # Simpan label kanonik "HH:MM-HH:MM" agar "10.00-11.00" dan "10:00-11:00" dianggap slot yang sama
+        # (baris lama yang masih memakai titik tetap ikut dicek)
+        time_slot = slot_label(*slot)
+        if Match.objects.filter(
+            field=field, date=match_date, time_slot__in=[time_slot, time_slot.replace(":", ".")]
+        ).exists():
+            return JsonResponse(
+                {"status": "error", "message": "This time slot is already booked."},
+                status=400
+            )
+
         creator_user = request.user
         if not creator_user.is_authenticated:
             creator_user = User.objects.first()
@@ -54,7 +73,7 @@ def match_list_api(request):
             match = Match.objects.create(
                 field=field,
                 creator=creator_user,
-                date=date_str,
+                date=match_date,
                 time_slot=time_slot,
                 price=data.get("price", 50000),
                 max_players=data.get("max_players", 10)
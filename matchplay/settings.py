@@ -116,6 +116,49 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # Transaksi tulis mengambil write lock di BEGIN, request yang bersamaan
+                # menunggu (timeout, detik) alih-alih gagal "database is locked"
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 20,
+            },
+            # Test DB di file, bukan in-memory shared cache: lock shared cache tidak
+            # menunggu busy timeout, sehingga test konkurensi gagal "table is locked"
+            'TEST': {
+                'NAME': BASE_DIR / 'test_db.sqlite3',
+            },
+        }
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Default Django (300 entri, buang 1/3 saat penuh) terlalu kecil: kalender & ETag per user,
+# profil rekomendasi per user, halaman daftar match dan fragmen dashboard akan saling
+# mengusir, termasuk key versi (fields/cache.py) yang membuat semua turunannya basi.
+# ~3 key per user aktif + halaman/fragmen bersama; bisa diatur lewat CACHE_MAX_ENTRIES.
+# CULL_FREQUENCY 10: saat penuh hanya 1/10 entri yang dibuang.
+CACHE_OPTIONS = {
+    'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 20000)),
+    'CULL_FREQUENCY': 10,
+}
+
+if PRODUCTION:
+    # File-based agar semua worker gunicorn berbagi cache (dan invalidasinya)
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', '/tmp/matchplay-cache'),
+            'OPTIONS': CACHE_OPTIONS,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'matchplay',
+            'OPTIONS': CACHE_OPTIONS,
         }
     }
 